@@ -12,7 +12,7 @@ class BlockchainHandler:
 
     def get_transaction_history(self, bank_id: str = None) -> List[Dict]:
         """Returns transaction history"""
-        return self.central_bank.get_transaction_history(bank_id)
+        return list(self.central_bank.get_transaction_history(bank_id))
 
     def create_smart_contract(self, contract_id: str, creator: str, storage: Dict) -> Dict:
         """Creates new smart contract"""
@@ -19,12 +19,15 @@ class BlockSchema(BaseModel):
     previous_hash: str = Field(..., example="000...000")
     nonce: int = Field(..., example=12345)
     hash: str = Field(..., example="a1b2c3d4e5f6...")
+    qc: Optional[Dict] = Field(None, example={"block_hash": "a1b2c3...", "view": 0,
+                                              "signers": "7", "signature": "d4e5f6..."})
 
 class BlockchainInfoSchema(BaseModel):
     length: int = Field(..., example=5)
     last_block: Optional[BlockSchema] = None
     pending_transactions: int = Field(..., example=2)
     difficulty: int = Field(..., example=2)
+    consensus: str = Field(..., example="hotstuff")
     valid: bool = Field(..., example=True)
 
 class SmartContractSchema(BaseModel):
@@ -6,6 +6,17 @@ WALLET_CONFIG = {
     'expiry_days': 14,  # Срок действия оффлайн-кошелька (дней)
     'max_balance': 1000000,  # Максимальный баланс оффлайн-кошелька
     'min_transaction': 0.01,  # Минимальная сумма транзакции
+    'history_in_memory': 1000,  # Последних записей истории и хешей блоков в памяти кошелька
+    'history_dir': 'data/wallet_history',  # Файлы вытесненной истории кошельков
+    'history_shards': 64,  # Количество файлов вытесненной истории
+    'history_page_size': 500,  # Записей на странице при чтении истории
+    'store_dir': 'data/wallets',  # Каталог двоичных файлов кошельков
+    'store_files': 16,  # Количество файлов каталога кошельков
+}
+
+# Настройки планировщика истечения сроков оффлайн-кошельков
+EXPIRY_CONFIG = {
+    'resolution': 1.0,  # Ширина слота времени (секунды): точность срабатывания
 }
 
 # Настройки HotStuff консенсуса
@@ -14,6 +25,84 @@ HOTSTUFF_CONFIG = {
     'timeout': 5,  # Таймаут для ответа узлов (секунды)
     'block_size_limit': 1000,  # Максимальное количество транзакций в блоке
     'rotation_interval': 10,  # Интервал ротации лидеров (в блоках)
+    'block_cache_size': 1024,  # Максимальное количество блоков в кэше узла
+    'sync_chunk_size': 128,  # Блоков в одном запросе синхронизации
+    'sync_max_chunk_bytes': 1024 * 1024,  # Ограничение размера ответа синхронизации
+    'sync_pipeline_depth': 4,  # Одновременных запросов синхронизации
+    'sync_window': 4096,  # Закоммиченных блоков, которые узел хранит для синхронизации пиров
+    'wal_durability': 'group',  # Надежность журнала консенсуса: none, async, group
+    'wal_flush_interval': 0.005,  # Период fsync в режиме async (секунды)
+    'lane_count': 4,  # Количество параллельных линий упорядочивания
+}
+
+# Настройки блокчейна
+BLOCKCHAIN_CONFIG = {
+    'consensus': 'hotstuff',  # Способ финализации блоков: 'hotstuff' (кворум узлов) или 'pow'
+    'difficulty': 2,  # Количество ведущих нулей в хэше для режима 'pow'
+}
+
+# Настройки параллельной обработки операций
+CONCURRENCY_CONFIG = {
+    'lock_stripes': 256,  # Количество полос блокировок счетов
+}
+
+# Настройки генератора идентификаторов
+ID_CONFIG = {
+    'node_id': 0,  # Номер узла (0-31), уникальный для каждого процесса, выдающего ID
+    'epoch_ms': 1704067200000,  # Начало отсчета времени в ID: 2024-01-01 UTC
+}
+
+# Настройки пакетного проведения эмиссий
+EMISSION_CONFIG = {
+    'batch_size': 256,  # Максимум эмиссий в одном блоке
+    'batch_window': 0.05,  # Максимальное ожидание формирования пачки (секунды)
+}
+
+# Настройки сверки оффлайн-транзакций
+RECONCILIATION_CONFIG = {
+    'batch_size': 1000,  # Оффлайн-транзакций в одном блоке при сверке
+    'bloom_capacity': 1_000_000,  # Ожидаемое число проведенных транзакций в фильтре Блума
+    'bloom_error_rate': 0.001,  # Доля ложных срабатываний фильтра
+}
+
+# Настройки проверки денежной массы
+SUPPLY_CHECK_CONFIG = {
+    'tolerance': 1e-6,  # Допустимое расхождение сумм из-за округления (рубли)
+    'relative_tolerance': 1e-12,  # Относительный допуск для итоговых сумм
+}
+
+# Настройки восстановления состояния из реестра
+REPLAY_CONFIG = {
+    'partitions': 4,  # Разделов счетов (процессов) при параллельном воспроизведении
+    'parallel_threshold': 100_000,  # Минимум транзакций для запуска пула процессов
+}
+
+# Настройки генератора нагрузки (python -m loadgen)
+LOADGEN_CONFIG = {
+    'user_cash': 'lognormal:9,0.5',  # Наличные пользователя при создании (медиана ~8 тыс. руб.)
+    'bank_reserve': 1_000_000_000,  # Эмиссия в резерв каждого банка при создании
+    'initial_digital_share': 0.5,  # Доля наличных, обмениваемая на цифровые рубли при создании
+    'mix': {'exchange': 0.2, 'online': 0.5, 'offline': 0.15, 'emission': 0.05, 'contract': 0.1},
+    'amounts': {
+        'exchange': 'lognormal:7,0.8',
+        'online': 'lognormal:6,1',
+        'offline': 'lognormal:5,0.7',
+        'emission': 'uniform:100000,1000000',
+        'contract': 'lognormal:6,0.5',
+    },
+    'burst_factor': 5,  # Во сколько раз интенсивность всплеска выше средней
+    'burst_fraction': 0.1,  # Доля времени во всплесках
+    'burst_cycle': 1.0,  # Средняя длительность цикла всплеск+затишье (секунды)
+    'block_interval': 0.1,  # Период формирования блоков драйвером (секунды)
+    'reconcile_interval': 1.0,  # Период сверки оффлайн-транзакций (секунды)
+    'offline_topup': 5,  # Пополнение оффлайн-кошелька, кратное сумме платежа
+}
+
+# Настройки хранилища реестра центрального банка
+STORAGE_CONFIG = {
+    'backend': 'memory',  # 'memory' (списки в памяти) или 'sqlite' (встроенная база)
+    'sqlite_path': 'data/ledger.db',  # Файл базы для режима 'sqlite'
+    'batch_size': 500,  # Записей в одной транзакции пакетной вставки
 }
 
 # Пути к файлам
@@ -30,7 +119,27 @@ LOGGING_CONFIG = {
     'format': '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
     'file': FILE_PATHS['logs'],
     'max_size': 10 * 1024 * 1024,  # 10 MB
-    'backup_count': 5
+    'backup_count': 5,
+    'console': False,  # Дублировать записи в консоль
+    'binary_file': None,  # Двоичный структурированный лог (например, 'logs/app.bin')
+}
+
+# Настройки журнала аудита центрального банка
+AUDIT_CONFIG = {
+    'sink': 'ledger',  # 'ledger' (таблица реестра) или 'file' (NDJSON с ротацией)
+    'file': 'logs/audit.ndjson',
+    'max_size': LOGGING_CONFIG['max_size'],  # Размер файла до ротации
+    'backup_count': LOGGING_CONFIG['backup_count'],  # Количество архивных файлов
+    'queue_size': 10000,  # Записей в очереди до блокировки вызывающего
+    'flush_interval': 0.2,  # Период сброса буфера на диск (секунды)
+    'flush_timeout': 30.0,  # Предельное ожидание flush (секунды)
+}
+
+# Настройки записи и воспроизведения трасс операций центрального банка
+TRACE_CONFIG = {
+    'file': 'logs/trace.ndjson.gz',  # Трасса; расширение .gz включает сжатие
+    'compress_level': 6,  # Уровень сжатия gzip
+    'mode': 'fast',  # Воспроизведение: 'fast' (без пауз) или 'realtime' (по записанным моментам)
 }
 
 # Настройки интерфейса
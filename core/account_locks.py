@@ -0,0 +1,52 @@
+import threading
+import zlib
+from contextlib import contextmanager
+from typing import Iterator, List, Optional
+from config import CONCURRENCY_CONFIG
+
+class StripedLocks:
+    """Блокировки счетов, разбитые на полосы.
+
+    Счет отображается на одну из stripe_count блокировок по CRC32
+    идентификатора. Операция над несколькими счетами захватывает их
+    полосы в порядке возрастания номера, поэтому взаимная блокировка
+    невозможна, а операции над непересекающимися счетами идут
+    параллельно.
+    """
+
+    def __init__(self, stripe_count: Optional[int] = None):
+        self.stripe_count = stripe_count or CONCURRENCY_CONFIG['lock_stripes']
+        self._locks: List[threading.Lock] = [threading.Lock() for _ in range(self.stripe_count)]
+
+    def stripe_for(self, account_id: str) -> int:
+        """Возвращает номер полосы счета"""
+        return zlib.crc32(account_id.encode()) % self.stripe_count
+
+    def stripes_for(self, *account_ids: str) -> List[int]:
+        """Возвращает упорядоченные номера полос для набора счетов"""
+        return sorted({self.stripe_for(account_id) for account_id in account_ids})
+
+    @contextmanager
+    def hold(self, *account_ids: str) -> Iterator[None]:
+        """Захватывает блокировки счетов в согласованном порядке"""
+        stripes = self.stripes_for(*account_ids)
+        acquired = []
+        try:
+            for stripe in stripes:
+                self._locks[stripe].acquire()
+                acquired.append(stripe)
+            yield
+        finally:
+            for stripe in reversed(acquired):
+                self._locks[stripe].release()
+
+    @contextmanager
+    def hold_all(self) -> Iterator[None]:
+        """Захватывает все полосы (согласованный снимок всех счетов)"""
+        for lock in self._locks:
+            lock.acquire()
+        try:
+            yield
+        finally:
+            for lock in reversed(self._locks):
+                lock.release()
@@ -0,0 +1,336 @@
+import math
+import threading
+from array import array
+from collections import Counter
+from collections.abc import MutableMapping
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from core.account_locks import StripedLocks
+
+try:
+    import numpy as np
+except ImportError:  # NumPy необязателен: без него агрегаты считаются циклом по array
+    np = None
+
+_MISSING = object()
+
+class AccountRecord(MutableMapping):
+    """Словарное представление одной строки хранилища счетов.
+
+    Чтение и запись идут напрямую в колонки, поэтому существующий код
+    вида users[user_id]["digital_balance"] -= amount продолжает работать.
+    """
+
+    __slots__ = ("_store", "_account_id")
+
+    def __init__(self, store: 'AccountStore', account_id: str):
+        self._store = store
+        self._account_id = account_id
+
+    def __getitem__(self, field: str) -> Any:
+        return self._store.get_field(self._account_id, field)
+
+    def __setitem__(self, field: str, value: Any):
+        self._store.set_field(self._account_id, field, value)
+
+    def __delitem__(self, field: str):
+        raise TypeError("Account fields cannot be deleted")
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._store.fields_of(self._account_id))
+
+    def __len__(self) -> int:
+        return len(self._store.fields_of(self._account_id))
+
+    def __repr__(self) -> str:
+        return f"AccountRecord({self.to_dict()!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Копирует запись в обычный словарь"""
+        return {field: self[field] for field in self}
+
+class AccountStore(MutableMapping):
+    """Колоночное хранилище счетов с плотной нумерацией.
+
+    Денежные поля хранятся в array('d'), статусы - кодами в array('H')
+    со словарем значений, прочие поля - в списках. Идентификатор счета
+    отображается в плотный индекс строки, что позволяет выполнять
+    массовые операции (начисление всем, общий объем, гистограммы)
+    векторно через NumPy, если он установлен.
+
+    Инвариант блокировок:
+      lock      - структура хранилища: добавление и удаление строк,
+                  перезапись строки целиком, массовые операции над
+                  колонками (колонки не перевыделяются, пока заняты);
+      row_locks - полосы строк: обращение к одному полю берет только
+                  полосу своего счета. Номер строки счета меняется лишь
+                  при удалении другого счета с переносом последней
+                  строки, а удаление держит полосы обоих счетов, поэтому
+                  чтение поля не видит наполовину перенесенную строку;
+      _schema_lock - словари категорий и состав колонок объектов.
+    Порядок захвата: lock, затем полосы строк, затем _schema_lock.
+    Атомарность изменений балансов (чтение-изменение-запись) по-прежнему
+    обеспечивают полосы StripedLocks CentralBank, а не эти блокировки.
+    """
+
+    def __init__(self, id_field: str, numeric_fields: Sequence[str],
+                 category_fields: Sequence[str] = ()):
+        self.id_field = id_field
+        self._ids: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._numeric: Dict[str, array] = {field: array('d') for field in numeric_fields}
+        self._categories: Dict[str, array] = {field: array('H') for field in category_fields}
+        self._vocab: Dict[str, List[Any]] = {field: [None] for field in category_fields}
+        self._codes: Dict[str, Dict[Any, int]] = {field: {None: 0} for field in category_fields}
+        self._objects: Dict[str, List[Any]] = {}
+        self.lock = threading.Lock()  # структурная блокировка (см. инвариант выше)
+        self.row_locks = StripedLocks()
+        self._schema_lock = threading.RLock()
+
+    # --- Интерфейс словаря ---
+
+    def __getitem__(self, account_id: str) -> AccountRecord:
+        if account_id not in self._index:
+            raise KeyError(account_id)
+        return AccountRecord(self, account_id)
+
+    def __setitem__(self, account_id: str, record: Dict[str, Any]):
+        if isinstance(record, AccountRecord):
+            record = record.to_dict()
+        with self.lock:
+            if account_id in self._index:
+                with self.row_locks.hold(account_id):
+                    self._write_row(self._index[account_id], record)
+            else:
+                self._add_accounts([record], [account_id])
+
+    def __delitem__(self, account_id: str):
+        with self.lock:
+            if account_id not in self._index:
+                raise KeyError(account_id)
+            moved_id = self._ids[-1]
+            with self.row_locks.hold(account_id, moved_id), self._schema_lock:
+                index = self._index.pop(account_id)
+                last = len(self._ids) - 1
+                # Перемещаем последнюю строку на место удаленной, сохраняя плотность
+                for column in self._columns():
+                    column[index] = column[last]
+                    column.pop()
+                self._ids.pop()
+                if index != last:
+                    self._ids[index] = moved_id
+                    self._index[moved_id] = index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._ids)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, account_id: object) -> bool:
+        return account_id in self._index
+
+    def _columns(self) -> Iterator:
+        yield from self._numeric.values()
+        yield from self._categories.values()
+        yield from self._objects.values()
+
+    # --- Доступ к полям ---
+
+    def index_of(self, account_id: str) -> int:
+        """Возвращает плотный номер счета (действителен, пока удерживается lock)"""
+        return self._index[account_id]
+
+    def id_at(self, index: int) -> str:
+        """Возвращает идентификатор счета по плотному номеру (действителен, пока удерживается lock)"""
+        return self._ids[index]
+
+    def get_field(self, account_id: str, field: str) -> Any:
+        """Читает одно поле счета"""
+        with self.row_locks.hold(account_id):
+            index = self._index[account_id]
+            if field in self._numeric:
+                return self._numeric[field][index]
+            if field in self._categories:
+                return self._vocab[field][self._categories[field][index]]
+            if field == self.id_field:
+                return account_id
+            value = self._objects[field][index] if field in self._objects else _MISSING
+        if value is _MISSING:
+            raise KeyError(field)
+        return value
+
+    def set_field(self, account_id: str, field: str, value: Any):
+        """Записывает одно поле счета"""
+        with self.row_locks.hold(account_id):
+            self._set(self._index[account_id], field, value)
+
+    def fields_of(self, account_id: str) -> List[str]:
+        """Возвращает список полей, заданных у счета"""
+        with self.row_locks.hold(account_id), self._schema_lock:
+            index = self._index[account_id]
+            fields = [self.id_field, *self._numeric, *self._categories]
+            fields.extend(f for f, column in self._objects.items() if column[index] is not _MISSING)
+        return fields
+
+    def _encode(self, field: str, value: Any) -> int:
+        code = self._codes[field].get(value)
+        if code is not None:
+            return code
+        with self._schema_lock:
+            codes = self._codes[field]
+            code = codes.get(value)
+            if code is None:
+                code = len(self._vocab[field])
+                self._vocab[field].append(value)
+                codes[value] = code
+            return code
+
+    def _set(self, index: int, field: str, value: Any):
+        if field in self._numeric:
+            self._numeric[field][index] = value
+        elif field in self._categories:
+            self._categories[field][index] = self._encode(field, value)
+        elif field == self.id_field:
+            if value != self._ids[index]:
+                raise ValueError("Account ID cannot be changed")
+        else:
+            if field not in self._objects:
+                with self._schema_lock:
+                    if field not in self._objects:
+                        self._objects[field] = [_MISSING] * len(self._ids)
+            self._objects[field][index] = value
+
+    def _write_row(self, index: int, record: Dict[str, Any]):
+        for field in self._numeric:
+            self._numeric[field][index] = record.get(field, 0.0)
+        for field in self._categories:
+            self._categories[field][index] = self._encode(field, record.get(field))
+        with self._schema_lock:
+            for field, column in self._objects.items():
+                column[index] = record.get(field, _MISSING)
+            for field, value in record.items():
+                if field not in self._objects:
+                    self._set(index, field, value)
+
+    # --- Массовые операции ---
+
+    def add_accounts(self, records: Iterable[Dict[str, Any]],
+                     account_ids: Optional[Sequence[str]] = None) -> int:
+        """Добавляет счета пачкой, расширяя колонки за один проход"""
+        records = list(records)
+        if account_ids is None:
+            account_ids = [record[self.id_field] for record in records]
+        with self.lock:
+            return self._add_accounts(records, account_ids)
+
+    def _add_accounts(self, records: List[Dict[str, Any]], account_ids: Sequence[str]) -> int:
+        if len(set(account_ids)) != len(account_ids) or any(a in self._index for a in account_ids):
+            raise ValueError("Duplicate account ID")
+
+        start = len(self._ids)
+        numeric = {field: array('d', (record.get(field, 0.0) for record in records))
+                   for field in self._numeric}
+        categories = {field: array('H', (self._encode(field, record.get(field)) for record in records))
+                      for field in self._categories}
+
+        for field, values in numeric.items():
+            self._numeric[field].extend(values)
+        for field, codes in categories.items():
+            self._categories[field].extend(codes)
+
+        extra_fields = {f for record in records for f in record
+                        if f not in self._numeric and f not in self._categories and f != self.id_field}
+        with self._schema_lock:
+            for field in extra_fields:
+                self._objects.setdefault(field, [_MISSING] * start)
+            for field, column in self._objects.items():
+                column.extend(record.get(field, _MISSING) for record in records)
+            # Новая колонка объектов создается по len(self._ids), поэтому длина меняется вместе с колонками
+            for offset, account_id in enumerate(account_ids):
+                self._index[account_id] = start + offset
+            self._ids.extend(account_ids)
+        return len(records)
+
+    def column(self, field: str):
+        """Возвращает числовую колонку (ndarray без копирования, если есть NumPy).
+
+        Пока на колонку есть ссылка, добавлять счета нельзя: array не
+        меняет размер при экспортированном буфере. Вызывающий код держит
+        lock, пока работает с колонкой.
+        """
+        column = self._numeric[field]
+        if np is not None:
+            if not column:
+                return np.zeros(0, dtype=np.float64)
+            return np.frombuffer(column, dtype=np.float64)
+        return column
+
+    def snapshot(self, fields: Sequence[str]) -> Tuple[List[str], Dict[str, array]]:
+        """Согласованная копия идентификаторов и числовых колонок.
+
+        Колонки копируются срезом array (memcpy), поэтому lock
+        удерживается только на время копирования.
+        """
+        with self.lock:
+            return list(self._ids), {field: self._numeric[field][:] for field in fields}
+
+    def total(self, field: str) -> float:
+        """Сумма числового поля по всем счетам"""
+        with self.lock:
+            if np is not None:
+                return float(self.column(field).sum())
+            return math.fsum(self._numeric[field])
+
+    def credit_all(self, field: str, amount: float):
+        """Начисляет сумму всем счетам"""
+        with self.lock:
+            if np is not None:
+                self.column(field)[:] += amount
+                return
+            column = self._numeric[field]
+            for i in range(len(column)):
+                column[i] += amount
+
+    def histogram(self, field: str, bins: int = 10) -> Tuple[List[int], List[float]]:
+        """Гистограмма значений числового поля: (counts, границы интервалов)"""
+        with self.lock:
+            if np is not None:
+                counts, edges = np.histogram(self.column(field), bins=bins)
+                return counts.tolist(), edges.tolist()
+            values = array('d', self._numeric[field])
+
+        if not values:
+            return [0] * bins, [0.0] * (bins + 1)
+        low, high = min(values), max(values)
+        if low == high:
+            low, high = low - 0.5, high + 0.5
+        width = (high - low) / bins
+        counts = [0] * bins
+        for value in values:
+            counts[min(int((value - low) / width), bins - 1)] += 1
+        return counts, [low + i * width for i in range(bins + 1)]
+
+    def count_by(self, field: str) -> Dict[Any, int]:
+        """Количество счетов по значениям категориального поля"""
+        with self.lock:
+            codes = self._categories[field]
+            vocab = list(self._vocab[field])
+            if np is not None and codes:
+                counts = np.bincount(np.frombuffer(codes, dtype=np.uint16), minlength=len(vocab))
+            else:
+                counter = Counter(codes)
+                counts = [counter.get(code, 0) for code in range(len(vocab))]
+        return {value: int(counts[code]) for code, value in enumerate(vocab) if counts[code]}
+
+USER_NUMERIC_FIELDS = ("cash_balance", "digital_balance", "offline_balance")
+USER_CATEGORY_FIELDS = ("user_type", "digital_wallet_status", "offline_wallet_status")
+BANK_NUMERIC_FIELDS = ("balance", "cash_balance")
+BANK_CATEGORY_FIELDS = ("status",)
+
+def create_user_store() -> AccountStore:
+    """Создает хранилище пользователей"""
+    return AccountStore("user_id", USER_NUMERIC_FIELDS, USER_CATEGORY_FIELDS)
+
+def create_bank_store() -> AccountStore:
+    """Создает хранилище банков"""
+    return AccountStore("bank_id", BANK_NUMERIC_FIELDS, BANK_CATEGORY_FIELDS)
@@ -0,0 +1,202 @@
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+from config import AUDIT_CONFIG
+
+_STOP = object()
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+class AuditSink:
+    """Журнал аудита только на добавление, записываемый фоновым потоком.
+
+    Записи сериализуются в NDJSON и ставятся в ограниченную очередь:
+    при переполнении append блокируется, пока писатель не освободит
+    место. Писатель сбрасывает буфер раз в flush_interval и
+    переключает файлы по размеру (path, path.1, ... path.N), как
+    RotatingFileHandler, поэтому записи не накапливаются в памяти.
+
+    Ошибка записи (например, OSError при записи или ротации)
+    останавливает писателя; она сохраняется и повторно выбрасывается из
+    append, flush и close, а ожидающие flush освобождаются.
+    """
+
+    def __init__(self, path: Optional[str] = None, max_bytes: Optional[int] = None,
+                 backup_count: Optional[int] = None, queue_size: Optional[int] = None,
+                 flush_interval: Optional[float] = None):
+        self.path = path or AUDIT_CONFIG['file']
+        self.max_bytes = max_bytes if max_bytes is not None else AUDIT_CONFIG['max_size']
+        self.backup_count = backup_count if backup_count is not None else AUDIT_CONFIG['backup_count']
+        self.flush_interval = flush_interval if flush_interval is not None else AUDIT_CONFIG['flush_interval']
+        self.rotations = 0
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(self.path, "ab", buffering=256 * 1024)
+        self._size = self._file.tell()
+
+        self._queue: queue.Queue = queue.Queue(maxsize=queue_size or AUDIT_CONFIG['queue_size'])
+        self._closed = False
+        self._error: Optional[BaseException] = None
+        self._writer = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+        self._writer.start()
+
+    def append(self, record: Dict[str, Any]):
+        """Ставит запись в очередь (блокируется, если очередь заполнена)"""
+        if self._closed:
+            raise ValueError("Audit sink is closed")
+        self._raise_error()
+        line = json.dumps(record, ensure_ascii=False, default=_json_default) + "\n"
+        self._put(line.encode())
+
+    def _raise_error(self):
+        if self._error is not None:
+            raise self._error
+
+    def _put(self, item: Any):
+        # Очередь может быть полна, когда писатель уже остановлен ошибкой
+        while True:
+            try:
+                self._queue.put(item, timeout=self.flush_interval)
+                return
+            except queue.Full:
+                self._raise_error()
+
+    def _run(self):
+        try:
+            self._loop()
+        except BaseException as error:
+            self._error = error
+            self._release_waiters()
+
+    def _release_waiters(self):
+        """Освобождает ожидающие flush после остановки писателя"""
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if isinstance(item, threading.Event):
+                item.set()
+            self._queue.task_done()
+
+    def _loop(self):
+        last_flush = time.monotonic()
+        while True:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                self._file.flush()
+                last_flush = time.monotonic()
+                continue
+
+            items = [item]
+            while len(items) < 1024:
+                try:
+                    items.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            for i, item in enumerate(items):
+                try:
+                    if isinstance(item, threading.Event):
+                        self._file.flush()
+                        item.set()
+                    elif item is _STOP:
+                        self._file.flush()
+                        self._file.close()
+                        self._queue.task_done()
+                        return
+                    else:
+                        self._write(item)
+                except BaseException:
+                    # Необработанные записи пачки уже сняты с очереди: освобождаем их ожидающих
+                    for pending in items[i:]:
+                        if isinstance(pending, threading.Event):
+                            pending.set()
+                        self._queue.task_done()
+                    raise
+                self._queue.task_done()
+
+            if time.monotonic() - last_flush >= self.flush_interval:
+                self._file.flush()
+                last_flush = time.monotonic()
+
+    def _write(self, data: bytes):
+        if self.max_bytes and self._size and self._size + len(data) > self.max_bytes:
+            self._rotate()
+        self._file.write(data)
+        self._size += len(data)
+
+    def _rotate(self):
+        """Переключает файл: path -> path.1 -> ... -> path.backup_count"""
+        self._file.close()
+        if self.backup_count > 0:
+            for i in range(self.backup_count - 1, 0, -1):
+                source = f"{self.path}.{i}"
+                if os.path.exists(source):
+                    os.replace(source, f"{self.path}.{i + 1}")
+            os.replace(self.path, f"{self.path}.1")
+            self._file = open(self.path, "ab", buffering=256 * 1024)
+        else:
+            self._file = open(self.path, "wb", buffering=256 * 1024)
+        self._size = 0
+        self.rotations += 1
+
+    def flush(self, timeout: Optional[float] = None):
+        """Ждет записи всех поставленных в очередь записей на диск"""
+        if self._closed:
+            self._raise_error()
+            return
+        self._raise_error()
+        timeout = timeout if timeout is not None else AUDIT_CONFIG['flush_timeout']
+        deadline = time.monotonic() + timeout
+        done = threading.Event()
+        self._put(done)
+        while not done.wait(min(self.flush_interval, max(deadline - time.monotonic(), 0.0))):
+            self._raise_error()
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Audit log was not flushed within {timeout} s")
+        self._raise_error()
+
+    def close(self):
+        """Дописывает очередь и закрывает файл"""
+        if self._closed:
+            return
+        self._closed = True
+        if self._error is None:
+            self._put(_STOP)
+        self._writer.join()
+        if not self._file.closed:
+            self._file.close()
+        self._raise_error()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def files(self) -> List[str]:
+        """Файлы журнала от самого старого к текущему"""
+        backups = [f"{self.path}.{i}" for i in range(self.backup_count, 0, -1)]
+        return [path for path in backups + [self.path] if os.path.exists(path)]
+
+    def read(self) -> Iterator[Dict[str, Any]]:
+        """Последовательно читает все записи журнала в порядке записи"""
+        self.flush()
+        for path in self.files():
+            with open(path, "rb", buffering=1024 * 1024) as f:
+                for line in f:
+                    yield json.loads(line)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return self.read()
@@ -2,16 +2,17 @@
 import hashlib
 import json
 from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 class Block:
     def __init__(self, index: int, transactions: List[Dict], timestamp: float,
-                 previous_hash: str, nonce: int = 0):
+                 previous_hash: str, nonce: int = 0, qc: Optional[Dict] = None):
         self.index = index
         self.transactions = transactions
         self.timestamp = timestamp
         self.previous_hash = previous_hash
         self.nonce = nonce
+        self.qc = qc  # Сертификат кворума HotStuff; в хэш блока не входит
 
     def compute_hash(self) -> str:
         """Вычисляет хэш блока"""
@@ -32,7 +33,8 @@ class Block:
             "timestamp": self.timestamp,
             "previous_hash": self.previous_hash,
             "nonce": self.nonce,
-            "hash": self.compute_hash()
+            "hash": self.compute_hash(),
+            "qc": self.qc
         }
 
     @classmethod
@@ -43,5 +45,6 @@ class Block:
             transactions=data["transactions"],
             timestamp=data["timestamp"],
             previous_hash=data["previous_hash"],
-            nonce=data.get("nonce", 0)
+            nonce=data.get("nonce", 0),
+            qc=data.get("qc")
         )
@@ -1,16 +1,38 @@
 # core/blockchain/blockchain.py
 import hashlib
 import json
-import time
-from typing import List, Dict, Optional, Any
+import threading
+from typing import List, Dict, Optional, Any, Callable, Tuple
+from config import BLOCKCHAIN_CONFIG, HOTSTUFF_CONFIG
+from core.utils.clock import Clock, get_clock
+from hotstuff_consensus.block import Block as LaneBlock
+from hotstuff_consensus.cluster import LocalCluster
+from hotstuff_consensus.quorum_certificate import QuorumCertificate
 from .block import Block
 from .transaction import BlockchainTransaction
 
+CONSENSUS_MODES = ("pow", "hotstuff")
+
 class Blockchain:
-    def __init__(self):
+    def __init__(self, consensus: Optional[str] = None, cluster: Optional[LocalCluster] = None,
+                 clock: Optional[Clock] = None,
+                 lane_verifier: Optional[Callable[[List[Dict]], bool]] = None):
         self.chain: List[Block] = []
+        self.clock = clock or get_clock()
         self.current_transactions: List[Dict] = []
-        self.difficulty = 2  # Количество ведущих нулей в хэше
+        # Очередь меняется только под этой блокировкой: ее берут все производители через add_transaction
+        self._pool_lock = threading.Lock()
+        self.consensus = consensus or BLOCKCHAIN_CONFIG['consensus']
+        if self.consensus not in CONSENSUS_MODES:
+            raise ValueError(f"Unknown consensus mode: {self.consensus}")
+
+        # Количество ведущих нулей в хэше (только для proof-of-work)
+        self.difficulty = BLOCKCHAIN_CONFIG['difficulty'] if self.consensus == "pow" else 0
+        self.cluster: Optional[LocalCluster] = None
+        # Проверка сертификатов блоков, слитых из параллельных линий консенсуса
+        self.lane_verifier = lane_verifier
+        if self.consensus == "hotstuff":
+            self.cluster = cluster or LocalCluster(HOTSTUFF_CONFIG['node_count'])
         self.create_genesis_block()
 
     def create_genesis_block(self):
@@ -18,10 +40,11 @@ class Blockchain:
         genesis_block = Block(
             index=0,
             transactions=[],
-            timestamp=time.time(),
+            timestamp=self.clock.time(),
             previous_hash="0"
         )
-        genesis_block.nonce = self.proof_of_work(genesis_block)
+        if self.consensus == "pow":
+            genesis_block.nonce = self.proof_of_work(genesis_block)
         self.chain.append(genesis_block)
 
     def add_transaction(self, sender: str, recipient: str, amount: float,
@@ -32,33 +55,80 @@ class Blockchain:
             "recipient": recipient,
             "amount": amount,
             "transaction_type": transaction_type,
-            "timestamp": time.time(),
+            "timestamp": self.clock.time(),
             "metadata": metadata or {}
         }
-        self.current_transactions.append(transaction)
+        with self._pool_lock:
+            self.current_transactions.append(transaction)
         return len(self.chain)  # Индекс следующего блока
 
-    def mine_block(self) -> Block:
-        """Создает новый блок"""
-        if not self.current_transactions:
+    def mine_block(self) -> Optional[Block]:
+        """Создает новый блок.
+
+        В режиме 'pow' блок добывается перебором nonce, в режиме 'hotstuff'
+        добавляется в цепочку только после сертификата кворума узлов.
+        """
+        with self._pool_lock:
+            transactions = self.current_transactions.copy()
+        if not transactions:
             return None
 
         last_block = self.last_block
 
         new_block = Block(
             index=len(self.chain),
-            transactions=self.current_transactions.copy(),
-            timestamp=time.time(),
+            transactions=transactions,
+            timestamp=self.clock.time(),
             previous_hash=last_block.compute_hash()
         )
 
-        # Добыча блока
-        new_block.nonce = self.proof_of_work(new_block)
+        if self.consensus == "pow":
+            # Добыча блока
+            new_block.nonce = self.proof_of_work(new_block)
+        elif not self.finalize_block(new_block):
+            return None
 
-        self.chain.append(new_block)
-        self.current_transactions = []
+        with self._pool_lock:
+            self.chain.append(new_block)
+            # Транзакции, добавленные во время формирования блока, остаются в очереди
+            del self.current_transactions[:len(new_block.transactions)]
         return new_block
 
+    def discard_transactions(self, transaction_ids: List[str]):
+        """Убирает из очереди транзакции с указанными metadata.transaction_id"""
+        discarded = set(transaction_ids)
+        with self._pool_lock:
+            self.current_transactions[:] = [
+                tx for tx in self.current_transactions
+                if tx["metadata"].get("transaction_id") not in discarded
+            ]
+
+    def pending_snapshot(self) -> Tuple[int, List[Dict]]:
+        """Согласованные длина цепочки и копия очереди транзакций"""
+        with self._pool_lock:
+            return len(self.chain), list(self.current_transactions)
+
+    def append_finalized(self, transactions: List[Dict], qc: Dict) -> Block:
+        """Добавляет блок, уже финализированный внешним консенсусом (например, линиями HotStuff)"""
+        block = Block(
+            index=len(self.chain),
+            transactions=transactions,
+            timestamp=self.clock.time(),
+            previous_hash=self.last_block.compute_hash(),
+            qc=qc
+        )
+        with self._pool_lock:
+            self.chain.append(block)
+        return block
+
+    def finalize_block(self, block: Block) -> bool:
+        """Проводит блок через раунд HotStuff и прикрепляет сертификат кворума"""
+        result = self.cluster.run_round(block.to_dict())
+        if result["status"] != "success":
+            return False
+        block.qc = result["qc"]
+        return True
+
     def proof_of_work(self, block: Block) -> int:
         """Простой алгоритм proof-of-work"""
         computed_hash = block.compute_hash()
@@ -79,6 +149,7 @@ class Blockchain:
             "last_block": self.last_block.to_dict() if self.chain else None,
             "pending_transactions": len(self.current_transactions),
             "difficulty": self.difficulty,
+            "consensus": self.consensus,
             "valid": self.validate_chain()
         }
 
@@ -88,8 +159,8 @@ class Blockchain:
             current_block = self.chain[i]
             previous_block = self.chain[i-1]
 
-            # Проверка хэша блока
-            if current_block.compute_hash() != current_block.compute_hash():
+            # Проверка печати блока: proof-of-work или сертификат кворума
+            if not self._is_sealed(current_block):
                 return False
 
             # Проверка связи с предыдущим блоком
@@ -97,3 +168,33 @@ class Blockchain:
                 return False
 
         return True
+
+    def _is_sealed(self, block: Block) -> bool:
+        """Проверяет, что блок добыт или финализирован кворумом"""
+        if block.qc and "lanes" in block.qc:
+            certificates = block.qc["lanes"]
+            return self.lane_verifier is not None \
+                and self._matches_lane_blocks(block, certificates) \
+                and self.lane_verifier(certificates)
+
+        if self.consensus == "pow":
+            return block.compute_hash().startswith('0' * self.difficulty)
+
+        if not block.qc or block.qc["block_hash"] != block.compute_hash():
+            return False
+        return self.cluster.leader.consensus.verify_qc(QuorumCertificate.from_dict(block.qc))
+
+    @staticmethod
+    def _matches_lane_blocks(block: Block, certificates: List[Dict]) -> bool:
+        """Проверяет, что транзакции слитого блока - это в точности блоки линий из сертификатов"""
+        if sum(c["tx_count"] for c in certificates) != len(block.transactions):
+            return False
+        start = 0
+        for certificate in certificates:
+            end = start + certificate["tx_count"]
+            lane_block = LaneBlock(certificate["height"], block.transactions[start:end], certificate["timestamp"],
+                                   certificate["previous_hash"], certificate["proposer"])
+            if lane_block.compute_hash() != certificate["block_hash"]:
+                return False
+            start = end
+        return True
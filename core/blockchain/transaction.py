@@ -1,8 +1,8 @@
 # core/blockchain/transaction.py
 import hashlib
 import json
-from datetime import datetime
 from typing import Dict, Any
+from core.utils.clock import get_clock
 
 class BlockchainTransaction:
     def __init__(self, sender: str, recipient: str, amount: float,
@@ -12,7 +12,7 @@ class BlockchainTransaction:
         self.recipient = recipient
         self.amount = amount
         self.transaction_type = transaction_type
-        self.timestamp = timestamp or datetime.now().timestamp()
+        self.timestamp = timestamp or get_clock().time()
         self.metadata = metadata or {}
 
     def compute_hash(self) -> str:
@@ -47,6 +47,6 @@ class BlockchainTransaction:
             recipient=data["recipient"],
             amount=data["amount"],
             transaction_type=data["transaction_type"],
-            timestamp=data.get("timestamp", datetime.now().timestamp()),
+            timestamp=data.get("timestamp", get_clock().time()),
             metadata=data.get("metadata", {})
         )
@@ -1,29 +1,63 @@
 # core/central_bank.py
-from datetime import datetime
-from typing import Dict, List, Optional, Any
+from datetime import timedelta
+from typing import Dict, List, Optional, Any, Sequence
 import sys
 import random
+import threading
+from concurrent.futures import Future
 from pathlib import Path
 
 # Добавляем корневую директорию в путь поиска модулей
 sys.path.append(str(Path(__file__).parent.parent))
 
-from core.utils.helpers import generate_id
+from core.utils.clock import Clock, get_clock
+from core.utils.id_generator import IdGenerator, generator_for
+from core.account_locks import StripedLocks
+from core.account_store import AccountStore, create_bank_store, create_user_store
+from core.audit import AuditSink
+from core.storage import RecordView, create_ledger
+from config import AUDIT_CONFIG, WALLET_CONFIG
 from core.utils.exceptions import DigitalRubleError, BankNotFoundError, ValidationError
 
 class CentralBank:
-    def __init__(self):
+    def __init__(self, storage_backend: Optional[str] = None, storage_path: Optional[str] = None,
+                 audit_path: Optional[str] = None, clock: Optional[Clock] = None,
+                 id_generator: Optional[IdGenerator] = None):
         # Инициализация всех необходимых атрибутов
-        self.banks: Dict[str, Dict[str, Any]] = {}
-        self.users: Dict[str, Dict[str, Any]] = {}
-        self.transactions: List[Dict[str, Any]] = []
-        self.offline_transactions: List[Dict[str, Any]] = []
+        # Часы и генератор ID подменяются при детерминированном воспроизведении трасс
+        self.clock = clock or get_clock()
+        self.id_generator = id_generator or generator_for(self.clock)
+        # Колоночные хранилища счетов; записи доступны как словари
+        self.banks: AccountStore = create_bank_store()
+        self.users: AccountStore = create_user_store()
+        # Реестр операций: списки в памяти или таблицы SQLite (см. STORAGE_CONFIG)
+        self.ledger = create_ledger(storage_backend, storage_path)
+        self.transactions = self.ledger["transactions"]
+        self.offline_transactions = self.ledger["offline_transactions"]
         self.smart_contracts: Dict[str, Dict[str, Any]] = {}
-        self.emission_requests: List[Dict[str, Any]] = []
-        self.audit_log: List[Dict[str, Any]] = []
+        self.emission_requests = self.ledger["emission_requests"]
+        # Журнал аудита: таблица реестра или файловый NDJSON-журнал с ротацией
+        if audit_path is not None or AUDIT_CONFIG['sink'] == "file":
+            self.audit_log = AuditSink(audit_path)
+        else:
+            self.audit_log = self.ledger["audit_log"]
         self.system_status = "operational"
         self.total_emitted = 0
         self.current_balance = 1_000_000_000_000  # 1 трлн рублей
+        self.initial_reserve = self.current_balance  # current_balance + total_emitted не меняется
+
+        # Формирование блоков сериализуется: эмиссии приходят и напрямую, и из пакетного потока
+        self._block_lock = threading.Lock()
+        # Балансы счетов защищены полосами блокировок; общие счетчики эмиссии - отдельной блокировкой
+        self.account_locks = StripedLocks()
+        self._supply_lock = threading.Lock()
+        self._emission_batcher = None
+        self._reconciliation = None
+        self._supply_checker = None
+        self._offline_expiry = None
+        self._offline_sequences: Dict[str, int] = {}  # кошелек: счетчик оффлайн-транзакций
+        self._offline_reserved: Dict[str, float] = {}  # кошелек: сумма оффлайн-транзакций, ожидающих сверки
+        self._offline_reservations: Dict[str, float] = {}  # tx_id: зарезервированная сумма
 
         # Инициализация блокчейна
         self._init_blockchain()
@@ -31,21 +65,29 @@ class CentralBank:
     def _init_blockchain(self):
         """Инициализирует блокчейн"""
         from core.blockchain.blockchain import Blockchain
-        self.blockchain = Blockchain()
+        self.blockchain = Blockchain(clock=self.clock)
+
+    def generate_id(self, prefix: str = "") -> str:
+        """Выдает новый идентификатор генератором центрального банка"""
+        return self.id_generator.next_id(prefix)
+
+    def audit(self, event: str, **details):
+        """Добавляет событие в журнал аудита"""
+        self.audit_log.append({"type": event, "timestamp": self.clock.now().isoformat(), **details})
 
     def register_bank(self, bank_data: Dict) -> Dict:
         """Регистрирует новый банк"""
         if "name" not in bank_data or "bic" not in bank_data:
             raise ValidationError("Missing required fields", "bank_data")
 
-        bank_id = generate_id("BANK")
+        bank_id = self.generate_id("BANK")
         bank = {
             "bank_id": bank_id,
             "name": bank_data["name"],
             "bic": bank_data["bic"],
             "status": "pending",
             "balance": 0.0,
-            "registration_date": datetime.now().isoformat()
+            "registration_date": self.clock.now().isoformat()
         }
         self.banks[bank_id] = bank
 
@@ -57,6 +99,7 @@ class CentralBank:
             transaction_type="bank_registration",
             metadata={"bank_name": bank_data["name"]}
         )
+        self.audit("bank_registration", sender="SYSTEM", receiver=bank_id, bank_name=bank_data["name"])
 
         return {
             "status": "success",
@@ -66,7 +109,7 @@ class CentralBank:
 
     def register_user(self, user_type: str) -> Dict:
         """Регистрирует нового пользователя"""
-        user_id = generate_id("USER")
+        user_id = self.generate_id("USER")
         user = {
             "user_id": user_id,
             "user_type": user_type,
@@ -86,50 +129,459 @@ class CentralBank:
             "message": "User registered successfully"
         }
 
-    def process_emission(self, bank_id: str, amount: float, purpose: str) -> Dict:
-        """Обрабатывает эмиссию цифровых рублей"""
+    def add_banks(self, banks: List[Dict]) -> int:
+        """Регистрирует пачку банков с заданными идентификаторами и статусами"""
+        return self.banks.add_accounts(banks)
+
+    def add_users(self, users: List[Dict]) -> int:
+        """Регистрирует пачку пользователей с заданными идентификаторами и балансами"""
+        return self.users.add_accounts(users)
+
+    def _check_emission(self, bank_id: str, amount: float):
         if bank_id not in self.banks:
             raise BankNotFoundError(bank_id)
 
-        bank = self.banks[bank_id]
-        if bank["status"] != "active":
+        if self.banks[bank_id]["status"] != "active":
             raise ValidationError("Bank is not active", "bank_status")
 
         if amount <= 0:
             raise ValidationError("Amount must be positive", "amount")
 
-        # Добавляем транзакцию в блокчейн
-        tx_index = self.blockchain.add_transaction(
-            sender="CENTRAL_BANK",
-            recipient=bank_id,
-            amount=amount,
-            transaction_type="emission",
-            metadata={"purpose": purpose}
-        )
+    def process_emission(self, bank_id: str, amount: float, purpose: str) -> Dict:
+        """Обрабатывает эмиссию цифровых рублей"""
+        self._check_emission(bank_id, amount)
+        bank = self.banks[bank_id]
+
+        transaction_id = self.generate_id("TX")
+        with self._block_lock:
+            # Добавляем транзакцию в блокчейн
+            self.blockchain.add_transaction(
+                sender="CENTRAL_BANK",
+                recipient=bank_id,
+                amount=amount,
+                transaction_type="emission",
+                metadata={"purpose": purpose, "transaction_id": transaction_id}
+            )
 
-        # Майним блок
-        self.blockchain.mine_block()
+            # Формируем блок (proof-of-work или финализация кворумом HotStuff);
+            # неподтвержденная эмиссия не должна попасть в следующий блок без зачисления
+            try:
+                block = self.blockchain.mine_block()
+            except Exception:
+                self.blockchain.discard_transactions([transaction_id])
+                raise
+            if block is None:
+                self.blockchain.discard_transactions([transaction_id])
+                raise DigitalRubleError("Emission block was not finalized")
 
-        # Обновляем балансы
-        bank["balance"] += amount
-        self.current_balance -= amount
-        self.total_emitted += amount
+            # Обновляем балансы
+            with self.account_locks.hold(bank_id):
+                bank["balance"] += amount
+                new_balance = bank["balance"]
+            self._record_emission(amount)
 
+        self.audit("emission", sender="CENTRAL_BANK", receiver=bank_id, amount=amount,
+                   transaction_id=transaction_id)
         return {
             "status": "success",
-            "transaction_id": f"TX{tx_index}",
-            "new_balance": bank["balance"],
+            "transaction_id": transaction_id,
+            "new_balance": new_balance,
             "message": "Emission processed successfully"
         }
 
+    def _record_emission(self, amount: float):
+        with self._supply_lock:
+            self.current_balance -= amount
+            self.total_emitted += amount
+
+    def _balance_of(self, account_id: str):
+        """Возвращает запись счета и имя поля его безналичного баланса"""
+        if account_id in self.users:
+            return self.users[account_id], "digital_balance"
+        if account_id in self.banks:
+            return self.banks[account_id], "balance"
+        raise ValidationError(f"Account {account_id} not found", "account_id")
+
+    def transfer(self, sender_id: str, receiver_id: str, amount: float,
+                 transaction_type: str = "transfer") -> Dict:
+        """Атомарно переводит средства между счетами пользователей или банков.
+
+        Списание и зачисление выполняются под блокировками обоих счетов,
+        захваченными в согласованном порядке; переводы между
+        непересекающимися счетами не ждут друг друга.
+        """
+        if amount <= 0:
+            raise ValidationError("Amount must be positive", "amount")
+        if sender_id == receiver_id:
+            raise ValidationError("Sender and receiver must differ", "receiver_id")
+
+        sender, sender_field = self._balance_of(sender_id)
+        receiver, receiver_field = self._balance_of(receiver_id)
+
+        transaction_id = self.generate_id("TX")
+        with self.account_locks.hold(sender_id, receiver_id):
+            if sender[sender_field] < amount:
+                raise ValidationError("Insufficient funds", "amount")
+            sender[sender_field] -= amount
+            receiver[receiver_field] += amount
+            sender_balance = sender[sender_field]
+            # Перевод попадает в ближайший блок; в очередь он ставится вместе с изменением балансов
+            self.blockchain.add_transaction(
+                sender=sender_id,
+                recipient=receiver_id,
+                amount=amount,
+                transaction_type="transfer",
+                metadata={"transaction_id": transaction_id, "sender_field": sender_field,
+                          "receiver_field": receiver_field}
+            )
+
+        self.transactions.append({
+            "tx_id": transaction_id,
+            "sender": sender_id,
+            "receiver": receiver_id,
+            "amount": amount,
+            "type": transaction_type,
+            "timestamp": self.clock.now().isoformat(),
+            "status": "completed"
+        })
+        self.audit("transfer", sender=sender_id, receiver=receiver_id, amount=amount,
+                   transaction_id=transaction_id)
+
+        return {
+            "status": "success",
+            "transaction_id": transaction_id,
+            "sender_balance": sender_balance,
+            "message": "Transfer completed successfully"
+        }
+
+    def exchange(self, user_id: str, bank_id: str, amount: float) -> Dict:
+        """Обменивает наличные пользователя на цифровые рубли из резерва его банка"""
+        if amount <= 0:
+            raise ValidationError("Amount must be positive", "amount")
+        if user_id not in self.users:
+            raise ValidationError(f"Account {user_id} not found", "user_id")
+        if bank_id not in self.banks:
+            raise BankNotFoundError(bank_id)
+
+        user, bank = self.users[user_id], self.banks[bank_id]
+        transaction_id = self.generate_id("TX")
+        with self.account_locks.hold(user_id, bank_id):
+            if user["cash_balance"] < amount:
+                raise ValidationError("Insufficient cash", "amount")
+            if bank["balance"] < amount:
+                raise ValidationError("Insufficient bank reserve", "amount")
+            user["cash_balance"] -= amount
+            bank["cash_balance"] += amount
+            bank["balance"] -= amount
+            user["digital_balance"] += amount
+            self.blockchain.add_transaction(
+                sender=bank_id,
+                recipient=user_id,
+                amount=amount,
+                transaction_type="exchange",
+                metadata={"transaction_id": transaction_id}
+            )
+            digital_balance = user["digital_balance"]
+
+        return {
+            "status": "success",
+            "transaction_id": transaction_id,
+            "digital_balance": digital_balance,
+            "message": "Exchange completed successfully"
+        }
+
+    def create_contract(self, sender_id: str, receiver_id: str, amount: float,
+                        functionality: str = "payment") -> Dict:
+        """Создает смарт-контракт, удерживающий средства отправителя до исполнения"""
+        if amount <= 0:
+            raise ValidationError("Amount must be positive", "amount")
+        if sender_id not in self.users or receiver_id not in self.users:
+            raise ValidationError("Sender or receiver not found", "user_id")
+
+        user = self.users[sender_id]
+        contract_id = self.generate_id("SC")
+        with self.account_locks.hold(sender_id):
+            if user["digital_balance"] < amount:
+                raise ValidationError("Insufficient funds", "amount")
+            user["digital_balance"] -= amount
+            self.smart_contracts[contract_id] = {
+                "contract_id": contract_id,
+                "sender": sender_id,
+                "receiver": receiver_id,
+                "amount": amount,
+                "functionality": functionality,
+                "status": "СОЗДАН"
+            }
+            self.blockchain.add_transaction(
+                sender=sender_id,
+                recipient=contract_id,
+                amount=amount,
+                transaction_type="contract_lock",
+                metadata={"transaction_id": contract_id}
+            )
+        return self.smart_contracts[contract_id]
+
+    def execute_contract(self, contract_id: str) -> Dict:
+        """Исполняет смарт-контракт: удержанные средства зачисляются получателю"""
+        contract = self.smart_contracts.get(contract_id)
+        if not isinstance(contract, dict) or contract.get("status") != "СОЗДАН":
+            raise ValidationError("Contract is not awaiting execution", "contract_id")
+
+        receiver_id = contract["receiver"]
+        with self.account_locks.hold(contract["sender"], receiver_id):
+            if contract["status"] != "СОЗДАН":
+                raise ValidationError("Contract is not awaiting execution", "contract_id")
+            self.users[receiver_id]["digital_balance"] += contract["amount"]
+            contract["status"] = "ИСПОЛНЕН"
+            self.blockchain.add_transaction(
+                sender=contract_id,
+                recipient=receiver_id,
+                amount=contract["amount"],
+                transaction_type="contract_release",
+                metadata={"transaction_id": self.generate_id("TX")}
+            )
+        return contract
+
+    def fund_offline_wallet(self, user_id: str, amount: float) -> Dict:
+        """Переводит средства с цифрового кошелька пользователя на оффлайн-кошелек"""
+        if amount <= 0:
+            raise ValidationError("Amount must be positive", "amount")
+        if user_id not in self.users:
+            raise ValidationError(f"Account {user_id} not found", "user_id")
+
+        user = self.users[user_id]
+        transaction_id = self.generate_id("TX")
+        with self.account_locks.hold(user_id):
+            if user["digital_balance"] < amount:
+                raise ValidationError("Insufficient funds", "amount")
+            user["digital_balance"] -= amount
+            user["offline_balance"] += amount
+            self.blockchain.add_transaction(
+                sender=user_id,
+                recipient=user_id,
+                amount=amount,
+                transaction_type="offline_funding",
+                metadata={"transaction_id": transaction_id}
+            )
+            offline_balance = user["offline_balance"]
+
+        return {
+            "status": "success",
+            "transaction_id": transaction_id,
+            "offline_balance": offline_balance,
+            "message": "Offline wallet funded successfully"
+        }
+
+    def submit_offline_transaction(self, sender_id: str, receiver_id: str, amount: float,
+                                   sequence: Optional[int] = None, check_balance: bool = False) -> Dict:
+        """Принимает оффлайн-транзакцию, подписанную кошельком без связи.
+
+        Транзакция ожидает сверки; sequence - счетчик устройства
+        отправителя (по умолчанию назначается по порядку поступления).
+        Сумма резервируется до сверки. С check_balance=True транзакция
+        отклоняется сразу, если превышает оффлайн-баланс за вычетом
+        уже зарезервированного (так поступает сам кошелек); без него
+        перерасход обнаруживает сверка.
+        """
+        if amount <= 0:
+            raise ValidationError("Amount must be positive", "amount")
+        if sender_id not in self.users or receiver_id not in self.users:
+            raise ValidationError("Sender or receiver not found", "user_id")
+
+        with self.account_locks.hold(sender_id):
+            reserved = self._offline_reserved.get(sender_id, 0.0)
+            if check_balance and amount > self.users[sender_id]["offline_balance"] - reserved:
+                raise ValidationError("Insufficient offline balance", "amount")
+            if sequence is None:
+                sequence = self._offline_sequences.get(sender_id, -1) + 1
+            self._offline_sequences[sender_id] = max(self._offline_sequences.get(sender_id, -1), sequence)
+            tx_id = self.generate_id("TX")
+            self._offline_reserved[sender_id] = reserved + amount
+            self._offline_reservations[tx_id] = amount
+
+        record = {
+            "tx_id": tx_id,
+            "sender": sender_id,
+            "receiver": receiver_id,
+            "amount": amount,
+            "sequence": sequence,
+            "timestamp": self.clock.now().isoformat(),
+            "status": "ОФФЛАЙН"
+        }
+        self.offline_transactions.append(record)
+        return record
+
+    def offline_available(self, user_id: str) -> float:
+        """Оффлайн-баланс за вычетом сумм, ожидающих сверки"""
+        with self.account_locks.hold(user_id):
+            return self.users[user_id]["offline_balance"] - self._offline_reserved.get(user_id, 0.0)
+
+    def release_offline_reservation(self, user_id: str, tx_id: str):
+        """Снимает резерв оффлайн-транзакции после ее проведения или отклонения"""
+        with self.account_locks.hold(user_id):
+            amount = self._offline_reservations.pop(tx_id, None)
+            if amount is None:
+                return  # повторное предъявление или запись, принятая не через submit_offline_transaction
+            remaining = self._offline_reserved.get(user_id, 0.0) - amount
+            if remaining > 1e-9:
+                self._offline_reserved[user_id] = remaining
+            else:
+                self._offline_reserved.pop(user_id, None)
+
+    @property
+    def offline_expiry(self):
+        """Планировщик истечения оффлайн-кошельков (создается при первом обращении)"""
+        if self._offline_expiry is None:
+            from core.expiry import ExpiryScheduler
+            self._offline_expiry = ExpiryScheduler(self._close_expired_wallets, clock=self.clock)
+        return self._offline_expiry
+
+    def open_offline_wallet(self, user_id: str) -> Dict:
+        """Открывает оффлайн-кошелек пользователя на срок WALLET_CONFIG['expiry_days']"""
+        if user_id not in self.users:
+            raise ValidationError(f"Account {user_id} not found", "user_id")
+        user = self.users[user_id]
+        activation_time = self.clock.now()
+        deactivation_time = activation_time + timedelta(days=WALLET_CONFIG['expiry_days'])
+        with self.account_locks.hold(user_id):
+            if user["offline_wallet_status"] == "Открыт":
+                raise ValidationError("Offline wallet is already open", "user_id")
+            user["offline_wallet_status"] = "Открыт"
+            user["offline_activation_time"] = activation_time.isoformat()
+            user["offline_deactivation_time"] = deactivation_time.isoformat()
+        self.offline_expiry.schedule(user_id, deactivation_time.timestamp())
+
+        return {
+            "status": "success",
+            "user_id": user_id,
+            "offline_deactivation_time": user["offline_deactivation_time"],
+            "message": "Offline wallet opened successfully"
+        }
+
+    def _close_expired_wallets(self, user_ids: List[str]):
+        for user_id in user_ids:
+            with self.account_locks.hold(user_id):
+                self.users[user_id]["offline_wallet_status"] = "Закрыт"
+        self.audit("offline_wallet_expiry", count=len(user_ids))
+
+    def expire_offline_wallets(self, now: Optional[float] = None) -> List[str]:
+        """Закрывает оффлайн-кошельки с истекшим сроком; возвращает их владельцев"""
+        return self.offline_expiry.advance(now)
+
+    @property
+    def reconciliation(self):
+        """Движок сверки оффлайн-транзакций (создается при первом обращении)"""
+        if self._reconciliation is None:
+            from core.reconciliation import ReconciliationEngine
+            self._reconciliation = ReconciliationEngine(self)
+        return self._reconciliation
+
+    def reconcile_offline(self, wallet_ids: Optional[List[str]] = None) -> Dict[str, int]:
+        """Сверяет оффлайн-транзакции переподключившихся кошельков (по умолчанию всех)"""
+        return self.reconciliation.reconcile(wallet_ids)
+
+    @property
+    def supply_checker(self):
+        """Проверка инвариантов денежной массы (создается при первом обращении)"""
+        if self._supply_checker is None:
+            from core.supply_check import SupplyChecker
+            self._supply_checker = SupplyChecker(self)
+        return self._supply_checker
+
+    def check_supply(self) -> Dict:
+        """Проверяет, что балансы счетов сходятся с объемом эмиссии"""
+        return self.supply_checker.check()
+
+    def replay_ledger(self, partitions: Optional[int] = None) -> Dict:
+        """Выводит балансы счетов воспроизведением закоммиченных транзакций.
+
+        Живые балансы не меняются: результат сравнивается с ними через
+        core.event_sourcing.diff_state или служит состоянием реплики.
+        """
+        from core.event_sourcing import LedgerReplayer, UserFields
+        with self._block_lock:
+            chain = list(self.blockchain.chain)
+        return LedgerReplayer(partitions).replay_chain(chain, UserFields(self.users))
+
+    @property
+    def emission_batcher(self):
+        """Пакетный обработчик эмиссий (создается при первом обращении)"""
+        if self._emission_batcher is None:
+            from core.emission_batcher import EmissionBatcher
+            self._emission_batcher = EmissionBatcher(self)
+        return self._emission_batcher
+
+    def submit_emission(self, bank_id: str, amount: float, purpose: str) -> Future:
+        """Ставит эмиссию в очередь пакетного проведения.
+
+        Проверки выполняются сразу; возвращаемый Future разрешается
+        идентификатором транзакции, когда пачка попадет в блок.
+        """
+        self._check_emission(bank_id, amount)
+        return self.emission_batcher.submit(bank_id, amount, purpose)
+
+    def settle_emissions(self, emissions: List[tuple]) -> List[str]:
+        """Проводит пачку эмиссий (bank_id, amount, purpose) одним блоком"""
+        transaction_ids = [self.generate_id("TX") for _ in emissions]
+        with self._block_lock:
+            for (bank_id, amount, purpose), transaction_id in zip(emissions, transaction_ids):
+                self.blockchain.add_transaction(
+                    sender="CENTRAL_BANK",
+                    recipient=bank_id,
+                    amount=amount,
+                    transaction_type="emission",
+                    metadata={"purpose": purpose, "transaction_id": transaction_id}
+                )
+
+            # Неподтвержденные эмиссии не должны попасть в следующий блок без зачисления
+            try:
+                block = self.blockchain.mine_block()
+            except Exception:
+                self.blockchain.discard_transactions(transaction_ids)
+                raise
+            if block is None:
+                self.blockchain.discard_transactions(transaction_ids)
+                raise DigitalRubleError("Emission block was not finalized")
+
+            for bank_id, amount, _ in emissions:
+                with self.account_locks.hold(bank_id):
+                    self.banks[bank_id]["balance"] += amount
+                self._record_emission(amount)
+
+        for (bank_id, amount, _), transaction_id in zip(emissions, transaction_ids):
+            self.audit("emission", sender="CENTRAL_BANK", receiver=bank_id, amount=amount,
+                       transaction_id=transaction_id)
+        return transaction_ids
+
+    def mine_pending(self) -> Optional[int]:
+        """Формирует блок из накопленных транзакций; возвращает его номер"""
+        with self._block_lock:
+            block = self.blockchain.mine_block()
+        return block.index if block is not None else None
+
     def get_all_users(self) -> List[Dict]:
         """Возвращает список всех пользователей"""
-        return list(self.users.values())
+        return [user.to_dict() for user in self.users.values()]
 
     def get_all_banks(self) -> List[Dict]:
         """Возвращает список всех банков"""
-        return list(self.banks.values())
+        return [bank.to_dict() for bank in self.banks.values()]
+
+    def get_transaction_history(self, bank_id: Optional[str] = None, start: Any = None,
+                                end: Any = None, limit: Optional[int] = None,
+                                offset: int = 0) -> Sequence[Dict]:
+        """Возвращает историю транзакций, при необходимости по банку и интервалу времени.
+
+        Без фильтров возвращается представление реестра без копирования записей.
+        """
+        if bank_id is None and start is None and end is None and limit is None and not offset:
+            return RecordView(self.transactions)
+        return self.transactions.query(party=bank_id, start=start, end=end, limit=limit, offset=offset)
 
-    def get_transaction_history(self) -> List[Dict]:
-        """Возвращает историю транзакций"""
-        return self.transactions.copy()
+    def close(self):
+        """Проводит оставшиеся эмиссии, сбрасывает буферы реестра и закрывает хранилище"""
+        if self._emission_batcher is not None:
+            self._emission_batcher.close()
+        if isinstance(self.audit_log, AuditSink):
+            self.audit_log.close()
+        self.ledger.close()
@@ -0,0 +1,119 @@
+import threading
+import time
+from concurrent.futures import Future
+from typing import List, Optional
+from config import EMISSION_CONFIG
+from core.utils.exceptions import DigitalRubleError
+
+class EmissionRequest:
+    """Эмиссия, ожидающая включения в блок"""
+
+    __slots__ = ("bank_id", "amount", "purpose", "submitted", "future")
+
+    def __init__(self, bank_id: str, amount: float, purpose: str):
+        self.bank_id = bank_id
+        self.amount = amount
+        self.purpose = purpose
+        self.submitted = time.monotonic()
+        self.future: Future = Future()
+
+class EmissionBatcher:
+    """Пакетное проведение эмиссий: много эмиссий в одном блоке.
+
+    Запросы копятся в очереди; фоновый поток формирует блок, как только
+    набралось batch_size запросов или самый старый ждет дольше
+    batch_window секунд. Каждый вызывающий получает Future, который
+    разрешается идентификатором транзакции после финализации блока.
+    """
+
+    def __init__(self, central_bank, batch_size: Optional[int] = None,
+                 batch_window: Optional[float] = None):
+        self.central_bank = central_bank
+        self.batch_size = batch_size or EMISSION_CONFIG['batch_size']
+        self.batch_window = batch_window if batch_window is not None else EMISSION_CONFIG['batch_window']
+        self.blocks_settled = 0
+
+        self._cond = threading.Condition()
+        self._queue: List[EmissionRequest] = []
+        self._closed = False
+        self._worker: Optional[threading.Thread] = None
+
+    def submit(self, bank_id: str, amount: float, purpose: str) -> Future:
+        """Ставит эмиссию в очередь и возвращает Future с ID транзакции"""
+        request = EmissionRequest(bank_id, amount, purpose)
+        with self._cond:
+            if self._closed:
+                raise DigitalRubleError("Emission batcher is closed")
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="emission-batcher", daemon=True)
+                self._worker.start()
+            self._queue.append(request)
+            # Будим поток при первой заявке (старт окна) и при заполнении пачки
+            if len(self._queue) == 1 or len(self._queue) >= self.batch_size:
+                self._cond.notify_all()
+        return request.future
+
+    def pending_count(self) -> int:
+        """Количество эмиссий в очереди"""
+        with self._cond:
+            return len(self._queue)
+
+    def _take_batch(self) -> List[EmissionRequest]:
+        batch = self._queue[:self.batch_size]
+        del self._queue[:len(batch)]
+        return batch
+
+    def _run(self):
+        with self._cond:
+            while True:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if not self._queue:
+                    return
+                deadline = self._queue[0].submitted + self.batch_window
+                while len(self._queue) < self.batch_size and not self._closed:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                batch = self._take_batch()
+                self._cond.release()
+                try:
+                    self._settle(batch)
+                finally:
+                    self._cond.acquire()
+
+    def flush(self):
+        """Синхронно проводит все накопленные эмиссии"""
+        while True:
+            with self._cond:
+                batch = self._take_batch()
+            if not batch:
+                return
+            self._settle(batch)
+
+    def _settle(self, batch: List[EmissionRequest]):
+        """Проводит пачку эмиссий одним блоком и разрешает Future"""
+        try:
+            transaction_ids = self.central_bank.settle_emissions(
+                [(r.bank_id, r.amount, r.purpose) for r in batch]
+            )
+        except Exception as error:
+            for request in batch:
+                request.future.set_exception(error)
+            return
+
+        self.blocks_settled += 1
+        for request, transaction_id in zip(batch, transaction_ids):
+            request.future.set_result(transaction_id)
+
+    def close(self):
+        """Проводит оставшиеся эмиссии и останавливает фоновый поток"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        if self._worker is not None:
+            self._worker.join()
+        self.flush()
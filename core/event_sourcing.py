@@ -0,0 +1,188 @@
+import math
+import multiprocessing
+import os
+import threading
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from config import REPLAY_CONFIG
+
+# Проводка: (счет, поле баланса, сумма)
+Posting = Tuple[str, str, float]
+
+# Поле баланса определяет хранилище счета
+BANK_FIELDS = ("balance",)
+USER_FIELDS = ("digital_balance", "offline_balance")
+
+def default_field(account_id: str) -> str:
+    """Поле баланса счета, если транзакция его не указала"""
+    return "balance" if account_id.startswith("BANK") else "digital_balance"
+
+def postings(tx: Dict, field_of: Callable[[str], str] = default_field) -> List[Posting]:
+    """Переводит транзакцию блокчейна в проводки по балансам счетов"""
+    kind = tx.get("transaction_type")
+    amount = tx.get("amount", 0)
+    sender, recipient = tx.get("sender"), tx.get("recipient")
+    metadata = tx.get("metadata") or {}
+
+    if kind == "emission":
+        return [(recipient, "balance", amount)]
+    if kind == "transfer":
+        return [(sender, metadata.get("sender_field") or field_of(sender), -amount),
+                (recipient, metadata.get("receiver_field") or field_of(recipient), amount)]
+    if kind == "exchange":
+        return [(sender, "balance", -amount), (recipient, "digital_balance", amount)]
+    if kind == "contract_lock":
+        return [(sender, "digital_balance", -amount)]
+    if kind == "contract_release":
+        return [(recipient, "digital_balance", amount)]
+    if kind == "offline_funding":
+        return [(sender, "digital_balance", -amount), (sender, "offline_balance", amount)]
+    if kind == "offline_settlement":
+        return [(sender, "offline_balance", -amount), (recipient, "digital_balance", amount)]
+    if kind == "bank_registration":
+        return [(recipient, "balance", 0.0)]
+    return []
+
+def exact_partials(values: List[float]) -> List[float]:
+    """Слагаемые, сумма которых в точности равна сумме values.
+
+    Каждый шаг fsum снимает округленную часть остатка, поэтому сумма
+    частичных сумм нескольких диапазонов через fsum дает тот же
+    результат, что fsum по всем значениям сразу.
+    """
+    values = list(values)
+    partials = []
+    while True:
+        total = math.fsum(values)
+        if not total:
+            return partials or [0.0]
+        partials.append(total)
+        values.append(-total)
+
+def partition_of(account_id: str, partitions: int) -> int:
+    """Раздел счета (стабильно между процессами)"""
+    return zlib.crc32(str(account_id).encode()) % partitions
+
+def aggregate(transactions: Iterable[Dict], field_of: Callable[[str], str] = default_field,
+              partition: Optional[Tuple[int, int]] = None) -> Tuple[Dict[Tuple[str, str], List[float]], int]:
+    """Точные частичные суммы проводок по счетам и число проводок.
+
+    partition=(номер, всего разделов) оставляет только проводки счетов
+    этого раздела.
+    """
+    amounts: Dict[Tuple[str, str], List[float]] = {}
+    count = 0
+    for tx in transactions:
+        for account_id, field, amount in postings(tx, field_of):
+            if partition is not None and partition_of(account_id, partition[1]) != partition[0]:
+                continue
+            amounts.setdefault((account_id, field), []).append(amount)
+            count += 1
+    return {key: exact_partials(values) for key, values in amounts.items()}, count
+
+def _aggregate_partition(task: Tuple[int, int, List[Dict], Callable[[str], str]]):
+    index, partitions, transactions, field_of = task
+    return aggregate(transactions, field_of, (index, partitions))
+
+class UserFields:
+    """Поле баланса по составу пользователей; в отличие от замыкания передается в процессы пула"""
+
+    def __init__(self, user_ids: Iterable[str]):
+        self.user_ids = frozenset(user_ids)
+
+    def __call__(self, account_id: str) -> str:
+        return "digital_balance" if account_id in self.user_ids else "balance"
+
+def _pool_context():
+    """Контекст процессов пула.
+
+    fork допустим только из однопоточного процесса: дочерний процесс
+    наследует блокировки, захваченные другими потоками (журнал, аудит,
+    пакетная эмиссия), и может на них зависнуть. Иначе процессы
+    запускаются через forkserver или spawn.
+    """
+    methods = multiprocessing.get_all_start_methods()
+    if "fork" in methods and threading.active_count() == 1:
+        return multiprocessing.get_context("fork")
+    return multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+
+class LedgerReplayer:
+    """Восстановление состояния счетов воспроизведением транзакций реестра.
+
+    Счета делятся на разделы по хэшу идентификатора. Транзакция
+    передается в разделы своих отправителя и получателя, и процесс
+    пула суммирует проводки только счетов своего раздела. Поэтому
+    каждый счет целиком считается в одном процессе, а процесс получает
+    лишь свою часть реестра. Суммы считаются точными частичными суммами
+    и сливаются через fsum, так что результат совпадает с
+    последовательным воспроизведением при любом числе разделов.
+    field_of передается в процессы пула и должен сериализоваться
+    pickle (функция модуля или UserFields, но не замыкание).
+    """
+
+    def __init__(self, partitions: Optional[int] = None, parallel_threshold: Optional[int] = None):
+        self.partitions = partitions or REPLAY_CONFIG['partitions']
+        self.parallel_threshold = parallel_threshold if parallel_threshold is not None \
+            else REPLAY_CONFIG['parallel_threshold']
+
+    def split(self, transactions: Iterable[Dict]) -> List[List[Dict]]:
+        """Раскладывает транзакции по разделам счетов их отправителя и получателя"""
+        parts: List[List[Dict]] = [[] for _ in range(self.partitions)]
+        for tx in transactions:
+            for index in {partition_of(tx.get(key), self.partitions) for key in ("sender", "recipient")}:
+                parts[index].append(tx)
+        return parts
+
+    def replay(self, transactions: Iterable[Dict],
+               field_of: Callable[[str], str] = default_field) -> Dict:
+        """Воспроизводит транзакции и возвращает балансы банков и пользователей"""
+        transactions = list(transactions)
+        workers = min(self.partitions, os.cpu_count() or 1)
+
+        if workers > 1 and len(transactions) >= self.parallel_threshold:
+            tasks = [(index, self.partitions, part, field_of)
+                     for index, part in enumerate(self.split(transactions))]
+            with ProcessPoolExecutor(max_workers=workers, mp_context=_pool_context()) as executor:
+                results = list(executor.map(_aggregate_partition, tasks))
+        else:
+            results = [aggregate(transactions, field_of)]
+
+        partials: Dict[Tuple[str, str], List[float]] = {}
+        for amounts, _ in results:
+            for key, values in amounts.items():
+                partials.setdefault(key, []).extend(values)
+
+        banks: Dict[str, Dict[str, float]] = {}
+        users: Dict[str, Dict[str, float]] = {}
+        # Слияние в порядке идентификаторов счетов: результат не зависит от раскладки
+        for (account_id, field), values in sorted(partials.items()):
+            amount = math.fsum(values)
+            if field in BANK_FIELDS:
+                banks.setdefault(account_id, dict.fromkeys(BANK_FIELDS, 0.0))[field] = amount
+            else:
+                users.setdefault(account_id, dict.fromkeys(USER_FIELDS, 0.0))[field] = amount
+
+        total_emitted = math.fsum(tx["amount"] for tx in transactions if tx.get("transaction_type") == "emission")
+        return {"banks": banks, "users": users, "total_emitted": total_emitted,
+                "postings": sum(count for _, count in results)}
+
+    def replay_chain(self, chain, field_of: Callable[[str], str] = default_field) -> Dict:
+        """Воспроизводит все транзакции цепочки блоков"""
+        transactions = [tx for block in chain for tx in block.transactions if "transaction_type" in tx]
+        return self.replay(transactions, field_of)
+
+def diff_state(central_bank, state: Dict, tolerance: float = 1e-6) -> List[Dict]:
+    """Сравнивает восстановленное состояние с текущими балансами центрального банка"""
+    mismatches = []
+    for store_name, fields in (("banks", BANK_FIELDS), ("users", USER_FIELDS)):
+        store = getattr(central_bank, store_name)
+        rebuilt = state[store_name]
+        for account_id in sorted(set(store) | set(rebuilt)):
+            for field in fields:
+                live = store[account_id][field] if account_id in store else None
+                derived = rebuilt.get(account_id, {}).get(field, 0.0)
+                if live is None or abs(live - derived) > tolerance:
+                    mismatches.append({"account_id": account_id, "field": field,
+                                       "live": live, "rebuilt": derived})
+    return mismatches
@@ -0,0 +1,103 @@
+import heapq
+import math
+import threading
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from config import EXPIRY_CONFIG
+from core.utils.clock import Clock, get_clock
+
+class ExpiryScheduler:
+    """Планировщик истечения сроков на слотах времени.
+
+    Срок каждого ключа (например, кошелька) регистрируется один раз в
+    слоте шириной resolution секунд; слоты упорядочены кучей номеров.
+    advance() снимает только наступившие слоты и вызывает callback
+    одной пачкой, поэтому стоимость пропорциональна числу истекающих
+    ключей, а не всех зарегистрированных. Срок не срабатывает раньше
+    времени и опаздывает не более чем на resolution. Перепланирование
+    и отмена - O(1); пустые записи кучи отбрасываются при извлечении.
+    """
+
+    def __init__(self, callback: Optional[Callable[[List[str]], None]] = None,
+                 resolution: Optional[float] = None, clock: Optional[Clock] = None):
+        self.callback = callback
+        self.resolution = resolution or EXPIRY_CONFIG['resolution']
+        self.clock = clock or get_clock()
+        self._slots: Dict[int, Dict[str, float]] = {}  # номер слота: {ключ: срок}
+        self._ticks: List[int] = []  # куча номеров слотов
+        self._slot_of: Dict[str, int] = {}  # ключ: номер слота
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._slot_of)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._slot_of
+
+    def _remove(self, key: str) -> bool:
+        tick = self._slot_of.pop(key, None)
+        if tick is None:
+            return False
+        slot = self._slots[tick]
+        del slot[key]
+        if not slot:
+            del self._slots[tick]
+        return True
+
+    def _add(self, key: str, deadline: float):
+        self._remove(key)
+        tick = math.ceil(deadline / self.resolution)
+        slot = self._slots.get(tick)
+        if slot is None:
+            slot = self._slots[tick] = {}
+            heapq.heappush(self._ticks, tick)
+        slot[key] = deadline
+        self._slot_of[key] = tick
+
+    def schedule(self, key: str, deadline: float):
+        """Регистрирует срок ключа (Unix-время); повторный вызов переносит срок"""
+        with self._lock:
+            self._add(key, deadline)
+
+    def schedule_many(self, items: Iterable[Tuple[str, float]]) -> int:
+        """Регистрирует сроки пачкой (ключ, срок) под одной блокировкой"""
+        count = 0
+        with self._lock:
+            for key, deadline in items:
+                self._add(key, deadline)
+                count += 1
+        return count
+
+    def cancel(self, key: str) -> bool:
+        """Отменяет срок ключа; возвращает False, если ключ не зарегистрирован"""
+        with self._lock:
+            return self._remove(key)
+
+    def deadline_of(self, key: str) -> Optional[float]:
+        """Зарегистрированный срок ключа"""
+        with self._lock:
+            tick = self._slot_of.get(key)
+            return self._slots[tick][key] if tick is not None else None
+
+    def next_due(self) -> Optional[float]:
+        """Момент, к которому сработает ближайший непустой слот"""
+        with self._lock:
+            while self._ticks and self._ticks[0] not in self._slots:
+                heapq.heappop(self._ticks)
+            return self._ticks[0] * self.resolution if self._ticks else None
+
+    def advance(self, now: Optional[float] = None) -> List[str]:
+        """Снимает ключи с наступившим сроком и передает их callback одной пачкой"""
+        current = math.floor((self.clock.time() if now is None else now) / self.resolution)
+        expired: List[str] = []
+        with self._lock:
+            while self._ticks and self._ticks[0] <= current:
+                slot = self._slots.pop(heapq.heappop(self._ticks), None)
+                if not slot:
+                    continue  # слот опустел после отмен или уже снят
+                for key in slot:
+                    del self._slot_of[key]
+                expired.extend(slot)
+
+        if expired and self.callback is not None:
+            self.callback(expired)
+        return expired
@@ -1,5 +1,5 @@
 import uuid
-from datetime import datetime
+from core.utils.clock import get_clock
 
 class FinancialOrganization:
     def __init__(self, name: str, central_bank):
@@ -50,7 +50,7 @@ class FinancialOrganization:
             "sender_id": sender_id,
             "recipient_id": recipient_id,
             "amount": amount,
-            "timestamp": datetime.now(),
+            "timestamp": get_clock().now(),
             "status": "pending",
             "bank": self.name
         }
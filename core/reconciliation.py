@@ -0,0 +1,165 @@
+import hashlib
+import logging
+import math
+from typing import Dict, Iterable, List, Optional, Set
+from config import RECONCILIATION_CONFIG
+
+OFFLINE_STATUS = "ОФФЛАЙН"
+SETTLED_STATUS = "ПРОВЕДЕНО"
+REJECTED_STATUS = "ОТКЛОНЕНО"
+
+logger = logging.getLogger(__name__)
+
+class BloomFilter:
+    """Фильтр Блума на bytearray с двойным хешированием BLAKE2b"""
+
+    def __init__(self, capacity: int, error_rate: float):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, key: str) -> Iterable[int]:
+        digest = hashlib.blake2b(key.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, key: str):
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+class ReconciliationEngine:
+    """Сверка оффлайн-транзакций при восстановлении связи кошельков.
+
+    За один проход по реестру ожидающие транзакции группируются по
+    кошельку отправителя; внутри кошелька они проверяются по порядку
+    счетчика устройства с нарастающим остатком оффлайн-баланса.
+    Повторно предъявленные транзакции отсекаются фильтром Блума,
+    подтвержденным точным множеством. Принятые транзакции попадают в
+    блокчейн пачками по batch_size, балансы меняются после
+    финализации блока.
+    """
+
+    def __init__(self, central_bank, batch_size: Optional[int] = None,
+                 bloom_capacity: Optional[int] = None, bloom_error_rate: Optional[float] = None):
+        self.central_bank = central_bank
+        self.batch_size = batch_size or RECONCILIATION_CONFIG['batch_size']
+        self.seen_filter = BloomFilter(bloom_capacity or RECONCILIATION_CONFIG['bloom_capacity'],
+                                       bloom_error_rate or RECONCILIATION_CONFIG['bloom_error_rate'])
+        self.seen_ids: Set[str] = set()
+        self.last_sequence: Dict[str, int] = {}  # кошелек: последний проведенный счетчик
+
+    def _is_duplicate(self, tx_id: str) -> bool:
+        # Фильтр отвечает "точно нет" без обращения к множеству для подавляющего большинства ID
+        return tx_id in self.seen_filter and tx_id in self.seen_ids
+
+    def _remember(self, tx_id: str):
+        self.seen_filter.add(tx_id)
+        self.seen_ids.add(tx_id)
+
+    def pending_by_wallet(self, wallet_ids: Optional[Iterable[str]] = None) -> Dict[str, List[Dict]]:
+        """Группирует ожидающие оффлайн-транзакции по кошельку отправителя"""
+        wallets = set(wallet_ids) if wallet_ids is not None else None
+        groups: Dict[str, List[Dict]] = {}
+        for record in self.central_bank.offline_transactions:
+            if record.get("status") != OFFLINE_STATUS:
+                continue
+            if wallets is not None and record["sender"] not in wallets:
+                continue
+            groups.setdefault(record["sender"], []).append(record)
+        return groups
+
+    def _reject(self, record: Dict, reason: str, stats: Dict):
+        record.update({"status": REJECTED_STATUS, "reject_reason": reason})
+        self.central_bank.release_offline_reservation(record["sender"], record["tx_id"])
+        stats["rejected"] += 1
+        if reason == "double_spend":
+            stats["double_spends"] += 1
+
+    def _validate_wallet(self, wallet_id: str, records: List[Dict], stats: Dict) -> List[Dict]:
+        """Проверяет транзакции кошелька за один проход; возвращает принятые"""
+        users = self.central_bank.users
+        if wallet_id not in users:
+            for record in records:
+                self._reject(record, "unknown_sender", stats)
+            return []
+
+        records.sort(key=lambda r: (-1 if r.get("sequence") is None else r["sequence"], r.get("timestamp", "")))
+        balance = users[wallet_id]["offline_balance"]
+        last_sequence = self.last_sequence.get(wallet_id, -1)
+        accepted = []
+
+        for record in records:
+            sequence = record.get("sequence")
+            if self._is_duplicate(record["tx_id"]):
+                self._reject(record, "double_spend", stats)
+            elif sequence is not None and sequence <= last_sequence:
+                # Тот же счетчик устройства уже потрачен другой транзакцией
+                self._reject(record, "double_spend", stats)
+            elif record["receiver"] not in users:
+                self._reject(record, "unknown_receiver", stats)
+            elif not 0 < record["amount"] <= balance:
+                self._reject(record, "insufficient_offline_balance", stats)
+            else:
+                balance -= record["amount"]
+                if sequence is not None:
+                    last_sequence = sequence
+                self._remember(record["tx_id"])
+                accepted.append(record)
+        return accepted
+
+    def _commit_batch(self, batch: List[Dict], stats: Dict):
+        """Проводит пачку принятых транзакций одним блоком и применяет балансы"""
+        bank = self.central_bank
+        with bank._block_lock:
+            for record in batch:
+                bank.blockchain.add_transaction(
+                    sender=record["sender"],
+                    recipient=record["receiver"],
+                    amount=record["amount"],
+                    transaction_type="offline_settlement",
+                    metadata={"transaction_id": record["tx_id"]}
+                )
+            try:
+                block = bank.blockchain.mine_block()
+            except Exception:
+                logger.exception("Не удалось провести блок сверки из %s оффлайн-транзакций", len(batch))
+                block = None
+            if block is None:
+                # Записи остаются в статусе ОФФЛАЙН и будут проведены следующей сверкой
+                bank.blockchain.discard_transactions([record["tx_id"] for record in batch])
+                for record in batch:
+                    self.seen_ids.discard(record["tx_id"])
+                stats["failed"] += len(batch)
+                return
+
+            # Балансы меняются под блокировкой блоков, чтобы проверка запаса видела блок и балансы вместе
+            for record in batch:
+                with bank.account_locks.hold(record["sender"], record["receiver"]):
+                    bank.users[record["sender"]]["offline_balance"] -= record["amount"]
+                    bank.users[record["receiver"]]["digital_balance"] += record["amount"]
+
+        for record in batch:
+            sender, receiver = record["sender"], record["receiver"]
+            record["status"] = SETTLED_STATUS
+            bank.release_offline_reservation(sender, record["tx_id"])
+            if record.get("sequence") is not None:
+                self.last_sequence[sender] = max(self.last_sequence.get(sender, -1), record["sequence"])
+            bank.audit("offline_settlement", sender=sender, receiver=receiver,
+                       amount=record["amount"], transaction_id=record["tx_id"])
+        stats["settled"] += len(batch)
+        stats["blocks"] += 1
+
+    def reconcile(self, wallet_ids: Optional[Iterable[str]] = None) -> Dict[str, int]:
+        """Сверяет и проводит ожидающие оффлайн-транзакции (всех или указанных кошельков)"""
+        stats = {"settled": 0, "rejected": 0, "double_spends": 0, "failed": 0, "blocks": 0}
+        accepted: List[Dict] = []
+        for wallet_id, records in self.pending_by_wallet(wallet_ids).items():
+            accepted.extend(self._validate_wallet(wallet_id, records, stats))
+
+        for start in range(0, len(accepted), self.batch_size):
+            self._commit_batch(accepted[start:start + self.batch_size], stats)
+        return stats
@@ -0,0 +1,102 @@
+import heapq
+import itertools
+from typing import Callable, Dict, List, Optional, Set, Tuple
+from core.utils.clock import VirtualClock, use_clock
+
+# Событие очереди: (момент, номер, обработчик, аргументы); номер сохраняет порядок равновременных событий
+Event = Tuple[float, int, Callable, tuple]
+
+class Simulator:
+    """Дискретно-событийное моделирование на виртуальных часах.
+
+    События хранятся в куче по моменту наступления; run() извлекает
+    ближайшее, переводит часы прямо на его момент и вызывает
+    обработчик, поэтому пустые промежутки (например, 14 дней до
+    истечения оффлайн-кошелька) не стоят ничего. На время прогона
+    виртуальные часы становятся часами процесса по умолчанию, так что
+    блокчейн, кошельки и генератор ID, созданные без явных часов,
+    живут в модельном времени.
+    """
+
+    def __init__(self, clock: Optional[VirtualClock] = None):
+        self.clock = clock or VirtualClock()
+        self.processed = 0
+        self._queue: List[Event] = []
+        self._sequence = itertools.count()
+        self._scheduled: Set[int] = set()  # номера событий в очереди
+        self._cancelled: Set[int] = set()  # отмененные события, еще не извлеченные из очереди
+        self._series: Dict[int, int] = {}  # номер периодической серии -> номер ее ближайшего события
+
+    def now(self) -> float:
+        """Текущее модельное время (Unix-время в секундах)"""
+        return self.clock.time()
+
+    def schedule_at(self, timestamp: float, callback: Callable, *args) -> int:
+        """Планирует вызов на момент timestamp (не раньше текущего); возвращает номер события"""
+        event_id = next(self._sequence)
+        self._scheduled.add(event_id)
+        heapq.heappush(self._queue, (max(timestamp, self.clock.time()), event_id, callback, args))
+        return event_id
+
+    def schedule(self, delay: float, callback: Callable, *args) -> int:
+        """Планирует вызов через delay секунд модельного времени"""
+        return self.schedule_at(self.clock.time() + delay, callback, *args)
+
+    def every(self, interval: float, callback: Callable, *args, start: Optional[float] = None) -> int:
+        """Планирует периодический вызов; повторы прекращаются, если обработчик вернул False.
+
+        Возвращает номер серии: cancel() с ним останавливает все
+        последующие вызовы, сколько бы их уже ни прошло.
+        """
+        if interval <= 0:
+            raise ValueError("Interval must be positive")
+
+        def tick(*tick_args):
+            if callback(*tick_args) is not False and handle in self._series:
+                self._series[handle] = self.schedule(interval, tick, *tick_args)
+            else:
+                self._series.pop(handle, None)
+
+        handle = self.schedule_at(self.clock.time() + interval if start is None else start, tick, *args)
+        self._series[handle] = handle
+        return handle
+
+    def cancel(self, event_id: int):
+        """Отменяет запланированное событие или периодическую серию (уже наступившие не учитываются)"""
+        event_id = self._series.pop(event_id, event_id)
+        if event_id in self._scheduled:
+            self._cancelled.add(event_id)
+
+    def pending(self) -> int:
+        """Количество событий в очереди (включая отмененные, но еще не извлеченные)"""
+        return len(self._queue)
+
+    def run(self, until: Optional[float] = None, max_events: Optional[int] = None) -> int:
+        """Обрабатывает события до момента until (или пока очередь не опустеет).
+
+        Возвращает количество обработанных событий; при заданном until
+        часы в конце переводятся на этот момент.
+        """
+        queue, scheduled, cancelled, clock = self._queue, self._scheduled, self._cancelled, self.clock
+        heappop = heapq.heappop
+        count = 0
+        with use_clock(clock):
+            while queue and (max_events is None or count < max_events):
+                if until is not None and queue[0][0] > until:
+                    break
+                timestamp, event_id, callback, args = heappop(queue)
+                scheduled.discard(event_id)
+                if cancelled and event_id in cancelled:
+                    cancelled.discard(event_id)
+                    continue
+                clock.set(timestamp)
+                callback(*args)
+                count += 1
+            if until is not None and (max_events is None or count < max_events):
+                clock.set(until)
+        self.processed += count
+        return count
+
+    def run_for(self, duration: float, max_events: Optional[int] = None) -> int:
+        """Обрабатывает события следующих duration секунд модельного времени"""
+        return self.run(self.clock.time() + duration, max_events)
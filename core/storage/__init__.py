@@ -0,0 +1,21 @@
+from typing import Optional
+from config import STORAGE_CONFIG
+from .records import LEDGER_TABLES, MemoryLedger, RecordList, RecordView
+from .sqlite_ledger import LedgerRecord, SQLiteLedger, SQLiteRecordTable
+
+LEDGER_BACKENDS = ("memory", "sqlite")
+
+def create_ledger(backend: Optional[str] = None, path: Optional[str] = None,
+                  batch_size: Optional[int] = None):
+    """Создает реестр выбранного типа: 'memory' (списки) или 'sqlite'"""
+    backend = backend or STORAGE_CONFIG['backend']
+    if backend == "memory":
+        return MemoryLedger()
+    if backend == "sqlite":
+        return SQLiteLedger(path, batch_size)
+    raise ValueError(f"Unknown ledger backend: {backend}")
+
+__all__ = [
+    'LEDGER_BACKENDS', 'LEDGER_TABLES', 'LedgerRecord', 'MemoryLedger', 'RecordList', 'RecordView',
+    'SQLiteLedger', 'SQLiteRecordTable', 'create_ledger'
+]
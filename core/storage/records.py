@@ -0,0 +1,93 @@
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+LEDGER_TABLES = ("transactions", "offline_transactions", "emission_requests", "audit_log")
+
+def to_timestamp(value: Any) -> Optional[float]:
+    """Приводит время записи (ISO-строка, datetime или число) к Unix-времени"""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.timestamp()
+    if isinstance(value, str):
+        return datetime.fromisoformat(value).timestamp()
+    return float(value)
+
+def index_fields(record: Dict[str, Any]) -> Tuple[Optional[str], Optional[str], Optional[str], Optional[float]]:
+    """Извлекает индексируемые поля записи: отправитель, получатель, тип, время.
+
+    Записи реестра исторически используют разные имена полей
+    (sender/fo_id, receiver/recipient, type/transaction_type).
+    """
+    sender = record.get("sender", record.get("fo_id"))
+    receiver = record.get("receiver", record.get("recipient"))
+    record_type = record.get("type", record.get("transaction_type"))
+    return sender, receiver, record_type, to_timestamp(record.get("timestamp"))
+
+class RecordList(list):
+    """Список записей реестра в памяти с теми же запросами, что и у SQLite-таблицы"""
+
+    def query(self, party: Optional[str] = None, record_type: Optional[str] = None,
+              start: Any = None, end: Any = None,
+              limit: Optional[int] = None, offset: int = 0) -> List[Dict]:
+        """Фильтрует записи по участнику, типу и интервалу времени"""
+        start, end = to_timestamp(start), to_timestamp(end)
+        result = []
+        skipped = 0
+        for record in self:
+            sender, receiver, kind, timestamp = index_fields(record)
+            if party is not None and party not in (sender, receiver):
+                continue
+            if record_type is not None and kind != record_type:
+                continue
+            if start is not None and (timestamp is None or timestamp < start):
+                continue
+            if end is not None and (timestamp is None or timestamp >= end):
+                continue
+            if skipped < offset:
+                skipped += 1
+                continue
+            result.append(record)
+            if limit is not None and len(result) >= limit:
+                break
+        return result
+
+    def flush(self):
+        """Записи в памяти не буферизуются"""
+        pass
+
+class RecordView(Sequence):
+    """Представление таблицы реестра только для чтения.
+
+    Записи не копируются: длина, индексы и обход берутся из таблицы
+    (списка в памяти или таблицы SQLite), поэтому представление видит
+    и записи, добавленные после его создания.
+    """
+
+    def __init__(self, table):
+        self._table = table
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def __getitem__(self, index):
+        return self._table[index]
+
+    def __iter__(self) -> Iterator[Dict]:
+        return iter(self._table)
+
+class MemoryLedger:
+    """Реестр центрального банка в памяти процесса"""
+
+    def __init__(self):
+        self.tables: Dict[str, RecordList] = {name: RecordList() for name in LEDGER_TABLES}
+
+    def __getitem__(self, name: str) -> RecordList:
+        return self.tables[name]
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
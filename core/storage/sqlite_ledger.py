@@ -0,0 +1,273 @@
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from config import STORAGE_CONFIG
+from .records import LEDGER_TABLES, index_fields, to_timestamp
+
+# Размер страницы при последовательном чтении таблицы
+_PAGE_SIZE = 1000
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+def _encode(record: Dict[str, Any]) -> Tuple:
+    sender, receiver, record_type, timestamp = index_fields(record)
+    payload = json.dumps(record, ensure_ascii=False, default=_json_default)
+    return sender, receiver, record_type, timestamp, payload
+
+def _read_only(self, *args, **kwargs):
+    raise TypeError("Nested ledger values are read-only; assign the top-level field instead")
+
+class _FrozenDict(dict):
+    """Вложенный словарь записи реестра только для чтения"""
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    update = pop = popitem = setdefault = clear = _read_only
+
+class _FrozenList(list):
+    """Вложенный список записи реестра только для чтения"""
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    append = extend = insert = pop = remove = clear = sort = reverse = _read_only
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return _FrozenDict((key, _freeze(item)) for key, item in value.items())
+    if isinstance(value, list):
+        return _FrozenList(_freeze(item) for item in value)
+    return value
+
+class LedgerRecord(dict):
+    """Запись реестра, прочитанная из SQLite.
+
+    Изменение полей сразу записывается обратно в таблицу, поэтому код
+    вида emission_requests[i]["status"] = "Одобрено" работает так же,
+    как со списком словарей. Вложенные словари и списки доступны только
+    для чтения: их изменение не дошло бы до базы, поэтому поле
+    заменяется целиком.
+    """
+
+    def __init__(self, table: 'SQLiteRecordTable', row_id: int, data: Dict[str, Any]):
+        super().__init__((key, _freeze(value)) for key, value in data.items())
+        self._table = table
+        self._row_id = row_id
+
+    def _save(self):
+        self._table.update_row(self._row_id, self)
+
+    def __setitem__(self, key: str, value: Any):
+        super().__setitem__(key, _freeze(value))
+        self._save()
+
+    def __delitem__(self, key: str):
+        super().__delitem__(key)
+        self._save()
+
+    def update(self, *args, **kwargs):
+        super().update((key, _freeze(value)) for key, value in dict(*args, **kwargs).items())
+        self._save()
+
+    def __ior__(self, other):
+        self.update(other)
+        return self
+
+    def setdefault(self, key: str, default: Any = None) -> Any:
+        if key not in self:
+            self[key] = default
+        return self[key]
+
+    def pop(self, key: str, *default) -> Any:
+        present = key in self
+        value = super().pop(key, *default)
+        if present:
+            self._save()
+        return value
+
+    def popitem(self):
+        item = super().popitem()
+        self._save()
+        return item
+
+    def clear(self):
+        super().clear()
+        self._save()
+
+class SQLiteRecordTable:
+    """Таблица реестра в SQLite с интерфейсом списка.
+
+    Записи хранятся в JSON, а отправитель, получатель, тип и время
+    вынесены в индексируемые колонки. Вставки копятся в буфере и
+    записываются пачкой в одной транзакции; любое чтение сначала
+    сбрасывает буфер.
+    """
+
+    def __init__(self, ledger: 'SQLiteLedger', name: str):
+        if name not in LEDGER_TABLES:
+            raise ValueError(f"Unknown ledger table: {name}")
+        self.ledger = ledger
+        self.name = name
+        self._pending: List[Tuple] = []
+
+        conn = ledger.connection
+        with conn:
+            conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {name} ("
+                "id INTEGER PRIMARY KEY, sender TEXT, receiver TEXT, "
+                "type TEXT, timestamp REAL, data TEXT NOT NULL)"
+            )
+            for column in ("sender", "receiver", "type", "timestamp"):
+                conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{name}_{column} ON {name} ({column})")
+        self._count = conn.execute(f"SELECT COUNT(*) FROM {name}").fetchone()[0]
+
+        self._insert_sql = f"INSERT INTO {name} (sender, receiver, type, timestamp, data) VALUES (?, ?, ?, ?, ?)"
+        self._update_sql = f"UPDATE {name} SET sender = ?, receiver = ?, type = ?, timestamp = ?, data = ? WHERE id = ?"
+        self._row_sql = f"SELECT id, data FROM {name} WHERE id = ?"
+        self._page_sql = f"SELECT id, data FROM {name} WHERE id > ? ORDER BY id LIMIT ?"
+
+    # --- Запись ---
+
+    def append(self, record: Dict[str, Any]):
+        """Добавляет запись (фактическая вставка - пачкой)"""
+        row = _encode(record)
+        with self.ledger.lock:
+            self._pending.append(row)
+            self._count += 1
+            if len(self._pending) >= self.ledger.batch_size:
+                self._flush()
+
+    def extend(self, records: Iterable[Dict[str, Any]]):
+        """Добавляет несколько записей"""
+        for record in records:
+            self.append(record)
+
+    def flush(self):
+        """Записывает буфер вставок одной транзакцией"""
+        with self.ledger.lock:
+            self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        rows, self._pending = self._pending, []
+        with self.ledger.connection:
+            self.ledger.connection.executemany(self._insert_sql, rows)
+
+    def update_row(self, row_id: int, record: Dict[str, Any]):
+        """Перезаписывает сохраненную запись"""
+        with self.ledger.lock, self.ledger.connection:
+            self.ledger.connection.execute(self._update_sql, (*_encode(record), row_id))
+
+    # --- Чтение ---
+
+    def _fetch(self, sql: str, params: Tuple) -> List[LedgerRecord]:
+        with self.ledger.lock:
+            self._flush()
+            rows = self.ledger.connection.execute(sql, params).fetchall()
+        return [LedgerRecord(self, row_id, json.loads(data)) for row_id, data in rows]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            positions = range(*index.indices(self._count))
+            if not positions:
+                return []
+            # Читается непрерывный отрезок, шаг и обратный порядок применяются в памяти
+            first = min(positions[0], positions[-1])
+            rows = self._fetch(self._page_sql, (first, abs(positions[-1] - positions[0]) + 1))
+            if positions.step == 1:
+                return rows
+            return [rows[position - first] for position in positions]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("ledger index out of range")
+        # Записи не удаляются, поэтому rowid плотный: позиция i хранится под id i + 1
+        return self._fetch(self._row_sql, (index + 1,))[0]
+
+    def __iter__(self) -> Iterator[LedgerRecord]:
+        last_id = 0
+        while True:
+            page = self._fetch(self._page_sql, (last_id, _PAGE_SIZE))
+            yield from page
+            if len(page) < _PAGE_SIZE:
+                return
+            last_id = page[-1]._row_id
+
+    def copy(self) -> List[LedgerRecord]:
+        """Возвращает все записи списком"""
+        return list(self)
+
+    def query(self, party: Optional[str] = None, record_type: Optional[str] = None,
+              start: Any = None, end: Any = None,
+              limit: Optional[int] = None, offset: int = 0) -> List[Dict]:
+        """Фильтрует записи по участнику, типу и интервалу времени.
+
+        Набор условий фиксирован, поэтому различных текстов запроса
+        немного и все они остаются в кэше подготовленных выражений.
+        """
+        clauses, params = [], []
+        if party is not None:
+            clauses.append("(sender = ? OR receiver = ?)")
+            params += [party, party]
+        if record_type is not None:
+            clauses.append("type = ?")
+            params.append(record_type)
+        if start is not None:
+            clauses.append("timestamp >= ?")
+            params.append(to_timestamp(start))
+        if end is not None:
+            clauses.append("timestamp < ?")
+            params.append(to_timestamp(end))
+
+        sql = f"SELECT id, data FROM {self.name}"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY id LIMIT ? OFFSET ?"
+        params += [-1 if limit is None else limit, offset]
+        return self._fetch(sql, tuple(params))
+
+class SQLiteLedger:
+    """Реестр центрального банка во встроенной базе SQLite (режим WAL)"""
+
+    def __init__(self, path: Optional[str] = None, batch_size: Optional[int] = None):
+        self.path = path or STORAGE_CONFIG['sqlite_path']
+        self.batch_size = batch_size or STORAGE_CONFIG['batch_size']
+        if self.path != ":memory:":
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+
+        # Одно соединение на реестр; доступ из разных потоков сериализуется блокировкой
+        self.lock = threading.RLock()
+        self.connection = sqlite3.connect(self.path, check_same_thread=False, cached_statements=256)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.tables: Dict[str, SQLiteRecordTable] = {name: SQLiteRecordTable(self, name) for name in LEDGER_TABLES}
+
+    def __getitem__(self, name: str) -> SQLiteRecordTable:
+        return self.tables[name]
+
+    def flush(self):
+        """Сбрасывает буферы всех таблиц"""
+        with self.lock:
+            for table in self.tables.values():
+                table._flush()
+
+    def close(self):
+        """Сбрасывает буферы и закрывает базу"""
+        with self.lock:
+            self.flush()
+            self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
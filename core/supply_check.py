@@ -0,0 +1,193 @@
+import math
+from array import array
+from typing import Dict, List, Optional, Set, Tuple
+from config import SUPPLY_CHECK_CONFIG
+from core.event_sourcing import BANK_FIELDS, postings
+
+try:
+    import numpy as np
+except ImportError:  # NumPy необязателен: без него сравнение колонок идет циклом
+    np = None
+
+# Статусы смарт-контрактов, удерживающих средства отправителя
+HOLDING_CONTRACT_STATUSES = ("СОЗДАН",)
+
+# Проверяемые балансы: (хранилище, поле)
+CHECKED_COLUMNS = (("banks", "balance"), ("users", "digital_balance"), ("users", "offline_balance"))
+
+# Снимок колонки: идентификаторы строк и копия значений
+ColumnSnapshot = Tuple[List[str], array]
+
+class SupplyChecker:
+    """Проверка инвариантов денежной массы центрального банка.
+
+    Глобальный инвариант: сумма балансов банков, цифровых и оффлайн
+    балансов пользователей и средств в смарт-контрактах равна
+    total_emitted, а резерв current_balance + total_emitted не меняется.
+    Суммы считаются векторно по колонкам хранилища счетов.
+
+    Инкрементальная проверка сравнивает изменение каждого баланса с
+    момента прошлой проверки с ожидаемым изменением по транзакциям
+    новых блоков (и очереди) и указывает счета, где они разошлись.
+
+    Под блокировками банка снимаются только копии колонок, очереди и
+    счетчиков; сравнение идет уже без них. Снимок хранит идентификаторы
+    строк, поэтому перенос последней строки при удалении счета не
+    приписывает изменение баланса чужому счету.
+    """
+
+    def __init__(self, central_bank, tolerance: Optional[float] = None):
+        self.central_bank = central_bank
+        self.tolerance = tolerance if tolerance is not None else SUPPLY_CHECK_CONFIG['tolerance']
+        self.relative_tolerance = SUPPLY_CHECK_CONFIG['relative_tolerance']
+        self.checked_height = 0
+        self._counted_pending: Set[str] = set()  # ID транзакций очереди, уже учтенных в дельтах
+        self._snapshot: Dict[Tuple[str, str], ColumnSnapshot] = {}
+
+    # --- Векторные операции над колонками ---
+
+    @staticmethod
+    def _total(column: array) -> float:
+        if np is not None:
+            return float(np.frombuffer(column, dtype=np.float64).sum()) if column else 0.0
+        return math.fsum(column)
+
+    def _aligned_previous(self, key: Tuple[str, str], ids: List[str]) -> array:
+        """Значения прошлого снимка в порядке строк текущего (новые счета - с нуля)"""
+        previous = self._snapshot.get(key)
+        if previous is None:
+            return array('d', bytes(8 * len(ids)))
+        previous_ids, values = previous
+        if ids[:len(previous_ids)] == previous_ids:
+            # Строки не переносились, только дописаны новые
+            return values + array('d', bytes(8 * (len(ids) - len(previous_ids))))
+        by_id = dict(zip(previous_ids, values))
+        return array('d', [by_id.get(account_id, 0.0) for account_id in ids])
+
+    def _drifted(self, key: Tuple[str, str], ids: List[str], current: array,
+                 deltas: Dict[str, float]) -> List[Tuple[str, float, float]]:
+        """Счета, у которых фактическое изменение отличается от ожидаемого"""
+        if not ids:
+            return []
+        previous = self._aligned_previous(key, ids)
+        if np is not None:
+            actual = np.frombuffer(current, dtype=np.float64) - np.frombuffer(previous, dtype=np.float64)
+            expected = np.zeros(len(ids))
+            if deltas:
+                positions = {account_id: i for i, account_id in enumerate(ids)}
+                np.add.at(expected, np.fromiter((positions[a] for a in deltas), dtype=np.int64, count=len(deltas)),
+                          np.fromiter(deltas.values(), dtype=np.float64, count=len(deltas)))
+            drifted = np.nonzero(np.abs(actual - expected) > self.tolerance)[0]
+            return [(ids[i], float(expected[i]), float(actual[i])) for i in drifted]
+
+        drifted = []
+        for account_id, value, base in zip(ids, current, previous):
+            actual = value - base
+            expected = deltas.get(account_id, 0.0)
+            if abs(actual - expected) > self.tolerance:
+                drifted.append((account_id, expected, actual))
+        return drifted
+
+    # --- Ожидаемые изменения по транзакциям ---
+
+    def _apply_transaction(self, deltas: Dict, tx: Dict, members: Dict[str, Set[str]]):
+        def field_of(account_id: str) -> str:
+            return "digital_balance" if account_id in members["users"] else "balance"
+
+        for account_id, field, amount in postings(tx, field_of):
+            store_name = "banks" if field in BANK_FIELDS else "users"
+            if account_id not in members[store_name] or not amount:
+                continue
+            column_deltas = deltas.setdefault((store_name, field), {})
+            column_deltas[account_id] = column_deltas.get(account_id, 0.0) + amount
+
+    def _collect_deltas(self, height: int, pending: List[Dict], members: Dict[str, Set[str]]) -> Tuple[Dict, int]:
+        """Ожидаемые изменения балансов по новым блокам и снимку очереди"""
+        chain = self.central_bank.blockchain.chain
+        deltas: Dict[Tuple[str, str], Dict[str, float]] = {}
+        count = 0
+
+        for block in chain[self.checked_height + 1:height]:
+            for tx in block.transactions:
+                if "transaction_type" not in tx:
+                    continue  # блоки линий и дайджесты пачек не меняют балансы ЦБ
+                tx_id = tx["metadata"].get("transaction_id")
+                if tx_id in self._counted_pending:
+                    # Уже учтена, пока ждала в очереди
+                    self._counted_pending.discard(tx_id)
+                    continue
+                self._apply_transaction(deltas, tx, members)
+                count += 1
+
+        # Переводы применяются к балансам сразу, а в блок попадают позже
+        for tx in pending:
+            tx_id = tx["metadata"].get("transaction_id")
+            if tx_id is None or tx_id in self._counted_pending:
+                continue
+            self._counted_pending.add(tx_id)
+            self._apply_transaction(deltas, tx, members)
+            count += 1
+
+        self.checked_height = height - 1
+        return deltas, count
+
+    # --- Проверки ---
+
+    def contract_holdings(self) -> float:
+        """Сумма средств, удерживаемых смарт-контрактами"""
+        # Контракты API (объекты SmartContract) средств не удерживают
+        return math.fsum(contract.get("amount", 0.0) for contract in self.central_bank.smart_contracts.values()
+                         if isinstance(contract, dict) and contract.get("status") in HOLDING_CONTRACT_STATUSES)
+
+    def check(self) -> Dict:
+        """Проверяет инварианты и возвращает отчет с разошедшимися счетами.
+
+        Снимок балансов после проверки становится базой следующей, так
+        что каждое расхождение сообщается один раз.
+        """
+        bank = self.central_bank
+        fields: Dict[str, List[str]] = {}
+        for store_name, field in CHECKED_COLUMNS:
+            fields.setdefault(store_name, []).append(field)
+
+        with bank._block_lock, bank.account_locks.hold_all():
+            snapshots = {store_name: getattr(bank, store_name).snapshot(store_fields)
+                         for store_name, store_fields in fields.items()}
+            holdings = self.contract_holdings()
+            total_emitted = bank.total_emitted
+            reserve = bank.current_balance + total_emitted
+            height, pending = bank.blockchain.pending_snapshot()
+
+        supply = math.fsum(self._total(snapshots[store_name][1][field]) for store_name, field in CHECKED_COLUMNS)
+        supply += holdings
+        members = {store_name: set(ids) for store_name, (ids, _) in snapshots.items()}
+        deltas, checked = self._collect_deltas(height, pending, members)
+
+        drifted = []
+        for key in CHECKED_COLUMNS:
+            ids, columns = snapshots[key[0]]
+            current = columns[key[1]]
+            for account_id, expected, actual in self._drifted(key, ids, current, deltas.get(key, {})):
+                drifted.append({
+                    "account_id": account_id,
+                    "field": key[1],
+                    "expected_delta": expected,
+                    "actual_delta": actual
+                })
+            self._snapshot[key] = (ids, current)
+
+        supply_difference = supply - total_emitted
+        reserve_difference = reserve - bank.initial_reserve
+        # Суммы порядка триллиона не представимы в float точнее ~1e-4, отсюда относительный допуск
+        balanced = math.isclose(supply, total_emitted, rel_tol=self.relative_tolerance, abs_tol=self.tolerance) \
+            and math.isclose(reserve, bank.initial_reserve, rel_tol=self.relative_tolerance, abs_tol=self.tolerance)
+        return {
+            "ok": balanced and not drifted,
+            "supply": supply,
+            "total_emitted": total_emitted,
+            "supply_difference": supply_difference,
+            "reserve_difference": reserve_difference,
+            "drifted": drifted,
+            "height": self.checked_height,
+            "checked_transactions": checked
+        }
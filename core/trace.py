@@ -0,0 +1,263 @@
+import functools
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, IO, Iterator, List, Optional
+from config import TRACE_CONFIG
+from core.utils.clock import VirtualClock
+from core.utils.id_generator import IdGenerator
+from hotstuff_consensus.benchmark import percentile
+
+TRACE_VERSION = 1
+TRACE_MODES = ("fast", "realtime")
+
+# Операции центрального банка, попадающие в трассу
+TRACED_OPERATIONS = (
+    "register_bank", "register_user", "add_banks", "add_users",
+    "process_emission", "submit_emission", "settle_emissions",
+    "transfer", "exchange", "create_contract", "execute_contract",
+    "fund_offline_wallet", "submit_offline_transaction", "reconcile_offline",
+    "mine_pending", "check_supply", "replay_ledger", "get_transaction_history",
+)
+
+# Поля результата с идентификаторами, выданными операцией
+ID_FIELDS = ("bank_id", "user_id", "contract_id", "transaction_id", "tx_id")
+
+def _open(path: str, mode: str) -> IO[str]:
+    if path.endswith(".gz"):
+        if "w" in mode:
+            return gzip.open(path, mode + "t", encoding="utf-8", compresslevel=TRACE_CONFIG['compress_level'])
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+def issued_ids(result: Any) -> List[str]:
+    """Идентификаторы, выданные операцией (из ее результата)"""
+    if isinstance(result, dict):
+        return [result[field] for field in ID_FIELDS if isinstance(result.get(field), str)]
+    if isinstance(result, list) and all(isinstance(item, str) for item in result):
+        return result  # settle_emissions возвращает ID транзакций пачки
+    return []
+
+def iter_trace(path: str) -> Iterator[Dict]:
+    """Читает трассу: первым идет заголовок, затем записи операций"""
+    with _open(path, "r") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def state_digest(central_bank) -> str:
+    """Хэш балансов всех счетов и объема эмиссии (для сравнения прогонов)"""
+    digest = hashlib.sha256()
+    for store_name, fields in (("banks", ("balance", "cash_balance")),
+                               ("users", ("cash_balance", "digital_balance", "offline_balance"))):
+        store = getattr(central_bank, store_name)
+        for account_id in sorted(store):
+            record = store[account_id]
+            values = ",".join(repr(float(record.get(field) or 0.0)) for field in fields)
+            digest.update(f"{account_id}:{values}\n".encode())
+    digest.update(f"emitted:{float(central_bank.total_emitted)!r}".encode())
+    return digest.hexdigest()
+
+class TraceRecorder:
+    """Запись операций, поступающих в экземпляр CentralBank, в файл трассы.
+
+    Методы из TRACED_OPERATIONS подменяются на экземпляре обертками,
+    поэтому в трассу попадают вызовы от любых клиентов (GUI, API,
+    генератор нагрузки, поток пакетных эмиссий). Вложенные вызовы
+    операций в том же потоке не записываются. Запись делается по
+    завершении операции: время начала относительно старта трассы,
+    аргументы, длительность, выданные ID и класс исключения. Формат -
+    NDJSON, для путей .gz сжатый gzip.
+    """
+
+    def __init__(self, central_bank, path: Optional[str] = None):
+        self.central_bank = central_bank
+        self.path = path or TRACE_CONFIG['file']
+        self.count = 0
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = _open(self.path, "w")
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.started = central_bank.clock.time()
+        self._write({
+            "trace": TRACE_VERSION,
+            "started": self.started,
+            "node_id": central_bank.id_generator.node_id,
+            "epoch_ms": central_bank.id_generator.epoch_ms,
+            "operations": list(TRACED_OPERATIONS)
+        })
+
+        for name in TRACED_OPERATIONS:
+            setattr(central_bank, name, self._wrap(name, getattr(central_bank, name)))
+
+    def _write(self, record: Dict):
+        line = json.dumps(record, ensure_ascii=False, separators=(",", ":"), default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+
+    def _wrap(self, name: str, method):
+        clock = self.central_bank.clock
+
+        @functools.wraps(method)
+        def traced(*args, **kwargs):
+            if getattr(self._local, "active", False):
+                return method(*args, **kwargs)
+            self._local.active = True
+            started = clock.time()
+            perf_started = time.perf_counter()
+            result, error = None, None
+            try:
+                result = method(*args, **kwargs)
+                return result
+            except Exception as exc:
+                error = type(exc).__name__
+                raise
+            finally:
+                self._local.active = False
+                self._record(name, args, kwargs, started, time.perf_counter() - perf_started, result, error)
+        return traced
+
+    def _record(self, name: str, args: tuple, kwargs: Dict, started: float, duration: float,
+                result: Any, error: Optional[str]):
+        record = {"t": round(started - self.started, 6), "op": name, "a": list(args)}
+        if kwargs:
+            record["k"] = kwargs
+        record["d"] = round(duration, 6)
+        ids = issued_ids(result)
+        if ids:
+            record["r"] = ids
+        if error is not None:
+            record["e"] = error
+        self._write(record)
+        self.count += 1
+
+    def close(self):
+        """Снимает обертки с экземпляра и закрывает файл трассы"""
+        for name in TRACED_OPERATIONS:
+            self.central_bank.__dict__.pop(name, None)
+        with self._lock:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+class TraceReplayer:
+    """Детерминированное воспроизведение трассы на новом CentralBank.
+
+    Центральный банк создается с виртуальными часами, которые перед
+    каждой операцией выставляются на ее записанный момент, и с
+    генератором ID узла из заголовка трассы; поэтому повторные
+    воспроизведения одной трассы дают одинаковые ID и балансы. ID,
+    выданные при записи, подменяются в аргументах на выданные при
+    воспроизведении. Режим 'fast' выполняет операции без пауз,
+    'realtime' выдерживает записанные интервалы между ними.
+    """
+
+    def __init__(self, path: str, mode: Optional[str] = None, storage_backend: Optional[str] = None,
+                 storage_path: Optional[str] = None):
+        self.path = path
+        self.mode = mode or TRACE_CONFIG['mode']
+        if self.mode not in TRACE_MODES:
+            raise ValueError(f"Unknown replay mode: {self.mode}")
+        self.storage_backend = storage_backend
+        self.storage_path = storage_path
+        self.central_bank = None
+        self.id_map: Dict[str, str] = {}
+
+    def _translate(self, value: Any) -> Any:
+        if isinstance(value, str):
+            return self.id_map.get(value, value)
+        if isinstance(value, list):
+            return [self._translate(item) for item in value]
+        if isinstance(value, dict):
+            return {key: self._translate(item) for key, item in value.items()}
+        return value
+
+    def _call(self, name: str, args: List, kwargs: Dict) -> Any:
+        if name == "submit_emission":
+            # Пачки эмиссий воспроизводятся записями settle_emissions потока пакетного проведения;
+            # от заявки остается только проверка, чтобы пачки не зависели от таймингов потока
+            return self.central_bank._check_emission(*args[:2])
+        return getattr(self.central_bank, name)(*args, **kwargs)
+
+    def replay(self) -> Dict:
+        """Воспроизводит трассу и возвращает отчет со сравнением с записью"""
+        from core.central_bank import CentralBank
+
+        records = iter_trace(self.path)
+        header = next(records, None)
+        if header is None or header.get("trace") != TRACE_VERSION:
+            raise ValueError(f"Unsupported trace file: {self.path}")
+
+        clock = VirtualClock(header["started"])
+        id_generator = IdGenerator(node_id=header["node_id"], epoch_ms=header["epoch_ms"], clock=clock)
+        self.central_bank = CentralBank(storage_backend=self.storage_backend, storage_path=self.storage_path,
+                                        clock=clock, id_generator=id_generator)
+        self.id_map = {}
+
+        replayed: Dict[str, List[float]] = {}
+        recorded: Dict[str, List[float]] = {}
+        count = mismatches = 0
+        last_offset = max_lag = 0.0
+        started = time.perf_counter()
+
+        for record in records:
+            offset = record["t"]
+            clock.set(header["started"] + offset)
+            if self.mode == "realtime":
+                lag = time.perf_counter() - started - offset
+                if lag < 0:
+                    time.sleep(-lag)
+                else:
+                    max_lag = max(max_lag, lag)
+            last_offset = max(last_offset, offset)
+
+            name = record["op"]
+            args = self._translate(record.get("a", []))
+            kwargs = self._translate(record.get("k", {}))
+            op_started = time.perf_counter()
+            result, error = None, None
+            try:
+                result = self._call(name, args, kwargs)
+            except Exception as exc:
+                error = type(exc).__name__
+            replayed.setdefault(name, []).append(time.perf_counter() - op_started)
+            recorded.setdefault(name, []).append(record.get("d", 0.0))
+
+            if error != record.get("e"):
+                mismatches += 1
+            for recorded_id, replayed_id in zip(record.get("r", []), issued_ids(result)):
+                if recorded_id != replayed_id:
+                    self.id_map[recorded_id] = replayed_id
+            count += 1
+
+        elapsed = time.perf_counter() - started
+        return {
+            "mode": self.mode,
+            "operations": count,
+            "outcome_mismatches": mismatches,
+            "duration_s": round(elapsed, 3),
+            "recorded_duration_s": round(last_offset, 3),
+            "achieved_ops": round(count / elapsed, 2) if elapsed else 0.0,
+            "max_schedule_lag_ms": round(max_lag * 1000, 3),
+            "state_digest": state_digest(self.central_bank),
+            "by_operation": {
+                name: {
+                    "count": len(durations),
+                    "replay_p50_ms": round(percentile(durations, 50) * 1000, 3),
+                    "replay_p99_ms": round(percentile(durations, 99) * 1000, 3),
+                    "recorded_p50_ms": round(percentile(recorded[name], 50) * 1000, 3),
+                    "recorded_p99_ms": round(percentile(recorded[name], 99) * 1000, 3),
+                }
+                for name, durations in replayed.items()
+            }
+        }
@@ -1,14 +1,14 @@
-import uuid
-from datetime import datetime
 import hashlib
+from core.utils.clock import get_clock
+from core.utils.id_generator import next_id
 
 class Transaction:
     def __init__(self, sender_id: str, recipient_id: str, amount: int):
-        self.id = str(uuid.uuid4())
+        self.id = next_id("TX")
         self.sender_id = sender_id
         self.recipient_id = recipient_id
         self.amount = amount
-        self.timestamp = datetime.now()
+        self.timestamp = get_clock().now()
         self.status = "pending"
         self.signature = None
         self.is_offline = False
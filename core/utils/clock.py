@@ -0,0 +1,98 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterator, Optional
+from config import ID_CONFIG
+
+class Clock(ABC):
+    """Источник времени: системные часы или виртуальные часы воспроизведения"""
+
+    @abstractmethod
+    def time(self) -> float:
+        """Текущее Unix-время в секундах"""
+
+    def time_ms(self) -> int:
+        """Текущее Unix-время в миллисекундах"""
+        return int(self.time() * 1000)
+
+    def now(self) -> datetime:
+        """Текущие локальные дата и время"""
+        return datetime.fromtimestamp(self.time())
+
+    @abstractmethod
+    def sleep(self, seconds: float):
+        """Ожидает указанное время"""
+
+class SystemClock(Clock):
+    """Системные часы"""
+
+    def time(self) -> float:
+        return time.time()
+
+    def time_ms(self) -> int:
+        return time.time_ns() // 1_000_000
+
+    def now(self) -> datetime:
+        return datetime.now()
+
+    def sleep(self, seconds: float):
+        if seconds > 0:
+            time.sleep(seconds)
+
+class VirtualClock(Clock):
+    """Виртуальные часы: время меняется только явно.
+
+    Используются при детерминированном воспроизведении и
+    дискретно-событийном моделировании: время выставляется по записи
+    трассы или моменту события, ожидание сдвигает часы вперед
+    мгновенно. Время не идет назад: set() с прошедшим моментом
+    оставляет часы на месте.
+    """
+
+    def __init__(self, start: Optional[float] = None):
+        self._lock = threading.Lock()
+        self._now = ID_CONFIG['epoch_ms'] / 1000 if start is None else start
+
+    def time(self) -> float:
+        return self._now
+
+    def set(self, timestamp: float):
+        """Переводит часы на указанный момент (если он не в прошлом)"""
+        with self._lock:
+            if timestamp > self._now:
+                self._now = timestamp
+
+    def advance(self, seconds: float):
+        """Сдвигает часы вперед"""
+        if seconds < 0:
+            raise ValueError("Virtual clock cannot go backwards")
+        with self._lock:
+            self._now += seconds
+
+    def sleep(self, seconds: float):
+        if seconds > 0:
+            self.advance(seconds)
+
+system_clock = SystemClock()
+_current: Clock = system_clock
+
+def get_clock() -> Clock:
+    """Часы процесса по умолчанию"""
+    return _current
+
+def set_clock(clock: Clock) -> Clock:
+    """Подменяет часы процесса по умолчанию; возвращает прежние"""
+    global _current
+    previous, _current = _current, clock
+    return previous
+
+@contextmanager
+def use_clock(clock: Clock) -> Iterator[Clock]:
+    """Временно подменяет часы процесса по умолчанию"""
+    previous = set_clock(clock)
+    try:
+        yield clock
+    finally:
+        set_clock(previous)
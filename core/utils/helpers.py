@@ -1,11 +1,9 @@
 # core/utils/helpers.py
-import random
-import string
-from datetime import datetime
-import json
+from core.utils.id_generator import next_id
 
 def generate_id(prefix: str = "", length: int = 6) -> str:
-    """Генерирует уникальный идентификатор"""
-    timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-    random_part = ''.join(random.choices(string.ascii_uppercase + string.digits, k=length))
-    return f"{prefix}{timestamp}{random_part}" if prefix else f"{timestamp}{random_part}"
+    """Генерирует уникальный идентификатор, упорядоченный по времени выдачи.
+
+    Параметр length сохранен для совместимости и не используется.
+    """
+    return next_id(prefix)
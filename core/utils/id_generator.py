@@ -0,0 +1,154 @@
+import threading
+from typing import List, Optional
+from weakref import WeakKeyDictionary
+from config import ID_CONFIG
+from core.utils.clock import Clock, get_clock, system_clock
+
+# Раскладка 63-битного идентификатора: время (мс) | узел | слот потока | счетчик
+TIMESTAMP_BITS = 41
+NODE_BITS = 5
+SLOT_BITS = 5
+SEQUENCE_BITS = 12
+
+MAX_NODE_ID = (1 << NODE_BITS) - 1
+SLOT_COUNT = 1 << SLOT_BITS
+SEQUENCE_MASK = (1 << SEQUENCE_BITS) - 1
+
+SLOT_SHIFT = SEQUENCE_BITS
+NODE_SHIFT = SEQUENCE_BITS + SLOT_BITS
+TIMESTAMP_SHIFT = SEQUENCE_BITS + SLOT_BITS + NODE_BITS
+
+# Base32 Крокфорда: без I, L, O, U; порядок символов совпадает с порядком значений
+_ALPHABET = "0123456789ABCDEFGHJKMNPQRSTVWXYZ"
+_DECODE = {char: value for value, char in enumerate(_ALPHABET)}
+ID_STRING_LENGTH = 13  # 13 * 5 = 65 бит, строки сортируются как числа
+
+def encode_id(value: int) -> str:
+    """Кодирует числовой ID строкой фиксированной длины"""
+    chars = []
+    for _ in range(ID_STRING_LENGTH):
+        chars.append(_ALPHABET[value & 31])
+        value >>= 5
+    return "".join(reversed(chars))
+
+def decode_id(text: str) -> int:
+    """Восстанавливает числовой ID из строки"""
+    value = 0
+    for char in text.upper():
+        value = (value << 5) | _DECODE[char]
+    return value
+
+class _Slot:
+    """Состояние генерации одного слота: последняя миллисекунда и счетчик"""
+
+    __slots__ = ("slot_id", "last_ms", "sequence")
+
+    def __init__(self, slot_id: int):
+        self.slot_id = slot_id
+        self.last_ms = -1
+        self.sequence = 0
+
+class _SlotLease:
+    """Закрепление слота за потоком; слот возвращается в пул при завершении потока"""
+
+    __slots__ = ("slot", "pool")
+
+    def __init__(self, slot: _Slot, pool: List[_Slot]):
+        self.slot = slot
+        self.pool = pool
+
+    def __del__(self):
+        self.pool.append(self.slot)
+
+class IdGenerator:
+    """Генератор идентификаторов в стиле Snowflake.
+
+    Каждый поток получает собственный слот и выдает ID без блокировок;
+    уникальность между потоками обеспечивает номер слота в ID, между
+    процессами - номер узла. Потоки сверх числа слотов используют общий
+    слот 0 под блокировкой. Время монотонно: при откате часов или
+    исчерпании счетчика миллисекунда берется в долг у будущего.
+    С виртуальными часами и одним потоком последовательность ID
+    полностью детерминирована.
+    """
+
+    def __init__(self, node_id: Optional[int] = None, epoch_ms: Optional[int] = None,
+                 clock: Optional[Clock] = None):
+        self.node_id = ID_CONFIG['node_id'] if node_id is None else node_id
+        if not 0 <= self.node_id <= MAX_NODE_ID:
+            raise ValueError(f"Node ID must be in range 0..{MAX_NODE_ID}")
+        self.epoch_ms = ID_CONFIG['epoch_ms'] if epoch_ms is None else epoch_ms
+        self.clock = clock  # None - часы процесса по умолчанию (get_clock)
+
+        self._shared = _Slot(0)
+        self._shared_lock = threading.Lock()
+        # Пул свободных слотов; list.pop/append атомарны
+        self._free: List[_Slot] = [_Slot(i) for i in range(SLOT_COUNT - 1, 0, -1)]
+        self._local = threading.local()
+
+    def _lease(self) -> Optional[_SlotLease]:
+        lease = getattr(self._local, "lease", None)
+        if lease is None:
+            try:
+                lease = _SlotLease(self._free.pop(), self._free)
+            except IndexError:
+                return None
+            self._local.lease = lease
+        return lease
+
+    def _advance(self, slot: _Slot) -> int:
+        now = (self.clock or get_clock()).time_ms() - self.epoch_ms
+        if now > slot.last_ms:
+            slot.last_ms = now
+            slot.sequence = 0
+        else:
+            slot.sequence = (slot.sequence + 1) & SEQUENCE_MASK
+            if slot.sequence == 0:
+                slot.last_ms += 1
+        return (slot.last_ms << TIMESTAMP_SHIFT) | (self.node_id << NODE_SHIFT) \
+            | (slot.slot_id << SLOT_SHIFT) | slot.sequence
+
+    def next_int(self) -> int:
+        """Выдает следующий числовой ID"""
+        lease = self._lease()
+        if lease is not None:
+            return self._advance(lease.slot)
+        with self._shared_lock:
+            return self._advance(self._shared)
+
+    def next_id(self, prefix: str = "") -> str:
+        """Выдает следующий ID строкой (с необязательным префиксом)"""
+        return prefix + encode_id(self.next_int())
+
+    def timestamp_of(self, value: int) -> float:
+        """Возвращает время выдачи ID (Unix-время в секундах)"""
+        return ((value >> TIMESTAMP_SHIFT) + self.epoch_ms) / 1000
+
+default_generator = IdGenerator(clock=system_clock)
+
+# Генераторы подмененных часов процесса (моделирование, воспроизведение трасс)
+_clock_generators: "WeakKeyDictionary[Clock, IdGenerator]" = WeakKeyDictionary()
+_clock_generators_lock = threading.Lock()
+
+def generator_for(clock: Clock) -> IdGenerator:
+    """Генератор ID для часов: у каждых часов, кроме системных, свой.
+
+    Счетчики генератора монотонны, поэтому модельное время, ушедшее
+    вперед, не должно попадать в генератор реального времени - иначе
+    после моделирования ID процесса выдавались бы из будущего.
+    """
+    if clock is system_clock:
+        return default_generator
+    generator = _clock_generators.get(clock)
+    if generator is None:
+        with _clock_generators_lock:
+            generator = _clock_generators.setdefault(clock, IdGenerator(clock=clock))
+    return generator
+
+def next_int() -> int:
+    """Выдает следующий числовой ID по часам процесса"""
+    return generator_for(get_clock()).next_int()
+
+def next_id(prefix: str = "") -> str:
+    """Выдает следующий строковый ID по часам процесса"""
+    return generator_for(get_clock()).next_id(prefix)
@@ -0,0 +1,173 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import struct
+import threading
+from typing import Dict, Iterator, List, Optional
+from config import LOGGING_CONFIG
+
+# Кадр двоичной записи: длина полезной части, время, уровень, длины имени логгера и шаблона
+BINARY_HEADER = struct.Struct("<IdBHH")
+
+# Аргументы этих типов не меняются, поэтому сообщение можно отформатировать позже в потоке записи
+_IMMUTABLE_ARGS = (str, int, float, bool, bytes, type(None))
+
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.Handler] = None
+_setup_lock = threading.Lock()
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler, откладывающий %-форматирование до потока записи.
+
+    Стандартный QueueHandler форматирует сообщение в вызывающем
+    потоке; здесь запись уходит в очередь с шаблоном и аргументами.
+    Изменяемые аргументы форматируются сразу, чтобы текст не зависел
+    от их последующих изменений.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        args = record.args
+        if args and not (isinstance(args, tuple) and all(isinstance(arg, _IMMUTABLE_ARGS) for arg in args)):
+            record.msg = record.getMessage()
+            record.args = None
+        return record
+
+class BinaryRecordHandler(logging.Handler):
+    """Запись структурированных логов в двоичные кадры без форматирования.
+
+    Кадр: заголовок BINARY_HEADER, имя логгера, шаблон сообщения и
+    аргументы в JSON. Файлы переключаются по размеру, как у
+    RotatingFileHandler (path, path.1, ... path.N).
+    """
+
+    def __init__(self, path: str, max_bytes: Optional[int] = None, backup_count: Optional[int] = None):
+        super().__init__()
+        self.path = path
+        self.max_bytes = max_bytes if max_bytes is not None else LOGGING_CONFIG['max_size']
+        self.backup_count = backup_count if backup_count is not None else LOGGING_CONFIG['backup_count']
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "ab")
+        self._size = self._file.tell()
+
+    def _rotate(self):
+        self._file.close()
+        for i in range(self.backup_count - 1, 0, -1):
+            source = f"{self.path}.{i}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{i + 1}")
+        if self.backup_count > 0:
+            os.replace(self.path, f"{self.path}.1")
+        else:
+            os.remove(self.path)
+        self._file = open(self.path, "ab")
+        self._size = 0
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            name = record.name.encode("utf-8")
+            template = str(record.msg).encode("utf-8")
+            args = json.dumps(list(record.args) if record.args else [], ensure_ascii=False, default=str).encode("utf-8")
+            payload_size = BINARY_HEADER.size - 4 + len(name) + len(template) + len(args)
+            frame = BINARY_HEADER.pack(payload_size, record.created, record.levelno, len(name), len(template))
+            if self.max_bytes and self._size and self._size + 4 + payload_size > self.max_bytes:
+                self._rotate()
+            self._file.write(frame + name + template + args)
+            self._size += 4 + payload_size
+        except Exception:
+            self.handleError(record)
+
+    def flush(self):
+        with self.lock:
+            if not self._file.closed:
+                self._file.flush()
+
+    def close(self):
+        with self.lock:
+            if not self._file.closed:
+                self._file.close()
+        super().close()
+
+def read_binary_log(path: str) -> Iterator[Dict]:
+    """Читает двоичный лог; сообщение форматируется только при чтении"""
+    with open(path, "rb") as f:
+        data = f.read()
+    offset = 0
+    while offset + BINARY_HEADER.size <= len(data):
+        payload_size, created, level, name_size, template_size = BINARY_HEADER.unpack_from(data, offset)
+        start = offset + BINARY_HEADER.size
+        end = offset + 4 + payload_size
+        name = data[start:start + name_size].decode("utf-8")
+        template = data[start + name_size:start + name_size + template_size].decode("utf-8")
+        args = json.loads(data[start + name_size + template_size:end])
+        yield {
+            "created": created,
+            "level": logging.getLevelName(level),
+            "name": name,
+            "msg": template,
+            "args": args,
+            "message": template % tuple(args) if args else template
+        }
+        offset = end
+
+def setup_logging(level: Optional[str] = None, path: Optional[str] = None,
+                  max_bytes: Optional[int] = None, backup_count: Optional[int] = None,
+                  console: Optional[bool] = None, binary_path: Optional[str] = None
+                  ) -> logging.handlers.QueueListener:
+    """Настраивает логирование процесса через очередь и фоновый поток записи.
+
+    Корневой логгер получает DeferredQueueHandler; QueueListener пишет
+    записи в файл с ротацией по размеру (LOGGING_CONFIG), при
+    необходимости в консоль и в двоичный лог. Повторный вызов
+    возвращает уже запущенный слушатель.
+    """
+    global _listener, _queue_handler
+    with _setup_lock:
+        if _listener is not None:
+            return _listener
+
+        path = path or LOGGING_CONFIG['file']
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        formatter = logging.Formatter(LOGGING_CONFIG['format'])
+        handlers: List[logging.Handler] = [logging.handlers.RotatingFileHandler(
+            path,
+            maxBytes=max_bytes if max_bytes is not None else LOGGING_CONFIG['max_size'],
+            backupCount=backup_count if backup_count is not None else LOGGING_CONFIG['backup_count'],
+            encoding="utf-8"
+        )]
+        if console if console is not None else LOGGING_CONFIG['console']:
+            handlers.append(logging.StreamHandler())
+        for handler in handlers:
+            handler.setFormatter(formatter)
+        binary_path = binary_path or LOGGING_CONFIG['binary_file']
+        if binary_path:
+            handlers.append(BinaryRecordHandler(binary_path, max_bytes, backup_count))
+
+        log_queue: queue.SimpleQueue = queue.SimpleQueue()
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        _queue_handler = DeferredQueueHandler(log_queue)
+        root = logging.getLogger()
+        root.setLevel(level or LOGGING_CONFIG['level'])
+        root.addHandler(_queue_handler)
+        return _listener
+
+def shutdown_logging():
+    """Дописывает очередь, останавливает поток записи и закрывает файлы"""
+    global _listener, _queue_handler
+    with _setup_lock:
+        if _listener is None:
+            return
+        logging.getLogger().removeHandler(_queue_handler)
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = _queue_handler = None
+
+atexit.register(shutdown_logging)
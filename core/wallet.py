@@ -1,139 +1,266 @@
 # core/wallet.py
-from datetime import datetime, timedelta
+from array import array
+from collections import OrderedDict, deque
+from datetime import timedelta
 import uuid
-from typing import List, Dict, Optional
+from typing import Any, Deque, Dict, Iterable, Optional
 from config import WALLET_CONFIG
+from core.utils.clock import Clock, get_clock
+from core.wallet_history import HistoryStore, HistoryView, decode_history_record, default_store
 import logging
 
-# Настройка логирования
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    filename='logs/app.log',
-    filemode='a'
-)
+# Обработчики настраивает точка входа (core.utils.logging_setup.setup_logging)
 logger = logging.getLogger(__name__)
 
 class Wallet:
-    def __init__(self, owner_id: str):
+    def __init__(self, owner_id: str, clock: Optional[Clock] = None,
+                 history_store: Optional[HistoryStore] = None):
         self.wallet_id = str(uuid.uuid4())
         self.owner_id = owner_id
-        self.open_time = datetime.now()
+        # Срок действия отсчитывается по часам кошелька (виртуальным при моделировании)
+        self.clock = clock or get_clock()
+        self.open_time = self.clock.now()
         self.expiry_time = self.open_time + timedelta(days=WALLET_CONFIG['expiry_days'])
         self.balance = 0.0
-        self.pending_transactions: List = []
-        self.transaction_history: List[Dict] = []
+        # Ожидающие оффлайн-транзакции в порядке добавления: ID транзакции -> транзакция
+        self.pending_transactions: "OrderedDict[str, Any]" = OrderedDict()
+        # В памяти - кольцевые буферы последних записей; старые вытесняются в файл шарда
+        self.history_capacity = WALLET_CONFIG['history_in_memory']
+        self.transaction_history: Deque[Dict] = deque()
+        self.block_hashes: Deque[str] = deque()
+        self._history_store = history_store
+        self._history_offsets = array('Q')  # смещения вытесненных записей истории
+        self._block_offsets = array('Q')  # смещения вытесненных хешей блоков
+        # ID транзакции -> запись истории (в памяти или вытесненная, но еще ожидающая)
+        self._history_index: Dict[str, Dict] = {}
+        # Транзакции, вытесненные до подтверждения: ID -> номер записи в _history_offsets
+        self._spilled_pending: Dict[str, int] = {}
         self.is_active = True
-        self.block_hashes: List[str] = []
         self.max_balance = WALLET_CONFIG['max_balance']
 
     def add_funds(self, amount: float) -> bool:
         """Добавляет средства на баланс кошелька"""
         if not self.is_active:
-            logger.warning(f"Попытка пополнения неактивного кошелька {self.wallet_id}")
+            logger.warning("Попытка пополнения неактивного кошелька %s", self.wallet_id)
             return False
 
         if amount <= 0:
-            logger.warning(f"Попытка пополнения кошелька {self.wallet_id} на невалидную сумму {amount}")
+            logger.warning("Попытка пополнения кошелька %s на невалидную сумму %s", self.wallet_id, amount)
             return False
 
         if self.balance + amount > self.max_balance:
-            logger.warning(f"Превышен максимальный баланс кошелька {self.wallet_id}")
+            logger.warning("Превышен максимальный баланс кошелька %s", self.wallet_id)
             return False
 
         self.balance += amount
-        self.transaction_history.append({
+        self._append_history({
             'type': 'deposit',
             'amount': amount,
-            'timestamp': datetime.now(),
+            'timestamp': self.clock.now(),
             'status': 'completed',
             'block_hash': None
         })
-        logger.info(f"Кошелёк {self.wallet_id} пополнен на {amount}. Новый баланс: {self.balance}")
+        logger.info("Кошелёк %s пополнен на %s. Новый баланс: %s", self.wallet_id, amount, self.balance)
         return True
 
     def withdraw_funds(self, amount: float) -> bool:
         """Списывает средства с баланса кошелька"""
         if not self.is_active:
-            logger.warning(f"Попытка списания с неактивного кошелька {self.wallet_id}")
+            logger.warning("Попытка списания с неактивного кошелька %s", self.wallet_id)
             return False
 
         if amount <= 0:
-            logger.warning(f"Попытка списания невалидной суммы {amount} с кошелька {self.wallet_id}")
+            logger.warning("Попытка списания невалидной суммы %s с кошелька %s", amount, self.wallet_id)
             return False
 
         if self.balance < amount:
-            logger.warning(f"Недостаточно средств в кошельке {self.wallet_id} для списания {amount}")
+            logger.warning("Недостаточно средств в кошельке %s для списания %s", self.wallet_id, amount)
             return False
 
         self.balance -= amount
-        self.transaction_history.append({
+        self._append_history({
             'type': 'withdrawal',
             'amount': amount,
-            'timestamp': datetime.now(),
+            'timestamp': self.clock.now(),
             'status': 'pending',
             'block_hash': None
         })
-        logger.info(f"С кошелька {self.wallet_id} списано {amount}. Новый баланс: {self.balance}")
+        logger.info("С кошелька %s списано %s. Новый баланс: %s", self.wallet_id, amount, self.balance)
         return True
 
     def add_offline_transaction(self, transaction) -> bool:
         """Добавляет оффлайн-транзакцию в очередь ожидания"""
         if not self.is_active:
-            logger.warning(f"Попытка добавления транзакции в неактивный кошелёк {self.wallet_id}")
+            logger.warning("Попытка добавления транзакции в неактивный кошелёк %s", self.wallet_id)
             return False
 
         if self.balance < transaction.amount:
-            logger.warning(f"Недостаточно средств в кошельке {self.wallet_id} для транзакции на {transaction.amount}")
+            logger.warning("Недостаточно средств в кошельке %s для транзакции на %s",
+                           self.wallet_id, transaction.amount)
             return False
 
-        self.pending_transactions.append(transaction)
-        self.transaction_history.append({
+        self.pending_transactions[transaction.id] = transaction
+        entry = {
             'type': 'offline_transaction',
             'transaction_id': transaction.id,
             'amount': transaction.amount,
-            'timestamp': datetime.now(),
+            'timestamp': self.clock.now(),
             'status': 'pending',
             'block_hash': None
-        })
-        logger.info(f"В кошелёк {self.wallet_id} добавлена транзакция {transaction.id} на сумму {transaction.amount}")
+        }
+        self._history_index.setdefault(transaction.id, entry)
+        self._append_history(entry)
+        logger.info("В кошелёк %s добавлена транзакция %s на сумму %s",
+                    self.wallet_id, transaction.id, transaction.amount)
         return True
 
+    def _store(self) -> HistoryStore:
+        if self._history_store is None:
+            self._history_store = default_store()
+        return self._history_store
+
+    def _append_history(self, entry: Dict):
+        """Добавляет запись истории, вытесняя самую старую из памяти в файл"""
+        self.transaction_history.append(entry)
+        if len(self.transaction_history) <= self.history_capacity:
+            return
+        evicted = self.transaction_history.popleft()
+        self._history_offsets.append(self._store().append(self.wallet_id, "history", evicted))
+        transaction_id = evicted.get('transaction_id')
+        if transaction_id is not None and self._history_index.get(transaction_id) is evicted:
+            if evicted['status'] == 'pending':
+                # Запись нужна для подтверждения; на диске пока ее исходное состояние
+                self._spilled_pending[transaction_id] = len(self._history_offsets) - 1
+            else:
+                del self._history_index[transaction_id]
+
+    def _add_block_hash(self, block_hash: str):
+        self.block_hashes.append(block_hash)
+        if len(self.block_hashes) > self.history_capacity:
+            evicted = self.block_hashes.popleft()
+            self._block_offsets.append(self._store().append(self.wallet_id, "block", evicted))
+
+    def _confirm(self, entry: Dict, block_hash: str):
+        entry['status'] = 'confirmed'
+        entry['block_hash'] = block_hash
+        transaction_id = entry.get('transaction_id')
+        if entry['type'] == 'offline_transaction':
+            self.pending_transactions.pop(transaction_id, None)
+        position = self._spilled_pending.pop(transaction_id, None)
+        if position is not None:
+            # Файл только на добавление: подтвержденная запись дописывается, и ее номер
+            # в истории указывает уже на новую копию
+            self._history_offsets[position] = self._store().append(self.wallet_id, "history", entry)
+            del self._history_index[transaction_id]
+
     def confirm_transaction(self, transaction_id: str, block_hash: str) -> bool:
         """Подтверждает транзакцию после включения в блок"""
-        for tx in self.transaction_history:
-            if tx.get('transaction_id') == transaction_id:
-                tx['status'] = 'confirmed'
-                tx['block_hash'] = block_hash
-                self.block_hashes.append(block_hash)
+        entry = self._history_index.get(transaction_id)
+        if entry is None:
+            logger.warning("Транзакция %s не найдена в кошельке %s", transaction_id, self.wallet_id)
+            return False
 
-                if tx['type'] == 'offline_transaction':
-                    self.pending_transactions = [
-                        t for t in self.pending_transactions if t.id != transaction_id
-                    ]
+        self._confirm(entry, block_hash)
+        self._add_block_hash(block_hash)
+        logger.info("Транзакция %s в кошельке %s подтверждена в блоке %s",
+                    transaction_id, self.wallet_id, block_hash)
+        return True
 
-                logger.info(f"Транзакция {transaction_id} в кошельке {self.wallet_id} подтверждена в блоке {block_hash}")
-                return True
+    def confirm_block(self, block_hash: str, tx_ids: Iterable[str]) -> int:
+        """Подтверждает все транзакции кошелька из блока за один проход.
 
-        logger.warning(f"Транзакция {transaction_id} не найдена в кошельке {self.wallet_id}")
-        return False
+        ID, не относящиеся к кошельку, пропускаются; хеш блока
+        запоминается один раз. Возвращает число подтвержденных транзакций.
+        """
+        confirmed = 0
+        index = self._history_index
+        for transaction_id in tx_ids:
+            entry = index.get(transaction_id)
+            if entry is not None:
+                self._confirm(entry, block_hash)
+                confirmed += 1
+
+        if confirmed:
+            self._add_block_hash(block_hash)
+            logger.info("В кошельке %s подтверждено %s транзакций в блоке %s", self.wallet_id, confirmed, block_hash)
+        return confirmed
+
+    def get_transaction(self, transaction_id: str) -> Optional[Dict]:
+        """Возвращает запись истории по ID транзакции"""
+        return self._history_index.get(transaction_id)
 
     def check_expiry(self) -> bool:
         """Проверяет, не истёк ли срок действия кошелька"""
-        if datetime.now() > self.expiry_time:
-            self.is_active = False
-            logger.warning(f"Срок действия кошелька {self.wallet_id} истёк")
+        if self.clock.now() > self.expiry_time:
+            self.expire()
             return False
         return True
 
+    def expire(self):
+        """Деактивирует кошелек по истечении срока (вызывается планировщиком истечения)"""
+        self.is_active = False
+        logger.warning("Срок действия кошелька %s истёк", self.wallet_id)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Состояние кошелька для сохранения (см. core.wallet_store)"""
+        return {
+            'wallet_id': self.wallet_id,
+            'owner_id': self.owner_id,
+            'open_time': self.open_time,
+            'expiry_time': self.expiry_time,
+            'balance': self.balance,
+            'max_balance': self.max_balance,
+            'is_active': self.is_active,
+            'history_capacity': self.history_capacity,
+            'pending_transactions': list(self.pending_transactions.values()),
+            'history': list(self.transaction_history),
+            'history_offsets': self._history_offsets,
+            'block_hashes': list(self.block_hashes),
+            'block_offsets': self._block_offsets,
+            'spilled_pending': [(position, self._history_index[tx_id])
+                                for tx_id, position in self._spilled_pending.items()],
+        }
+
+    @classmethod
+    def restore(cls, state: Dict[str, Any], clock: Optional[Clock] = None,
+                history_store: Optional[HistoryStore] = None) -> "Wallet":
+        """Восстанавливает кошелек из состояния snapshot() без повторной инициализации"""
+        wallet = cls.__new__(cls)
+        wallet.wallet_id = state['wallet_id']
+        wallet.owner_id = state['owner_id']
+        wallet.clock = clock or get_clock()
+        wallet.open_time = state['open_time']
+        wallet.expiry_time = state['expiry_time']
+        wallet.balance = state['balance']
+        wallet.max_balance = state['max_balance']
+        wallet.is_active = state['is_active']
+        wallet.history_capacity = state['history_capacity']
+        wallet.pending_transactions = OrderedDict((tx.id, tx) for tx in state['pending_transactions'])
+        wallet.transaction_history = deque(state['history'])
+        wallet.block_hashes = deque(state['block_hashes'])
+        wallet._history_store = history_store
+        wallet._history_offsets = array('Q', state['history_offsets'])
+        wallet._block_offsets = array('Q', state['block_offsets'])
+
+        wallet._history_index = {}
+        for entry in wallet.transaction_history:
+            if entry.get('transaction_id') is not None:
+                wallet._history_index.setdefault(entry['transaction_id'], entry)
+        wallet._spilled_pending = {}
+        for position, entry in state['spilled_pending']:
+            wallet._history_index[entry['transaction_id']] = entry
+            wallet._spilled_pending[entry['transaction_id']] = position
+        return wallet
+
     def get_balance(self) -> float:
         """Возвращает текущий баланс кошелька"""
         return self.balance
 
-    def get_transaction_history(self) -> list:
-        """Возвращает историю транзакций"""
-        return self.transaction_history.copy()
+    def get_transaction_history(self) -> HistoryView:
+        """Возвращает полную историю транзакций (ленивое представление только для чтения)"""
+        return HistoryView(self.wallet_id, self.transaction_history, self._history_offsets, self._store,
+                           decode_history_record)
 
-    def get_block_hashes(self) -> list:
-        """Возвращает хеши блоков, содержащих транзакции кошелька"""
-        return self.block_hashes.copy()
+    def get_block_hashes(self) -> HistoryView:
+        """Возвращает хеши блоков, содержащих транзакции кошелька (ленивое представление)"""
+        return HistoryView(self.wallet_id, self.block_hashes, self._block_offsets, self._store)
@@ -0,0 +1,178 @@
+import json
+import os
+import threading
+import zlib
+from collections.abc import Sequence
+from datetime import datetime
+from itertools import islice
+from typing import Any, Dict, IO, Iterator, List, Optional
+from config import WALLET_CONFIG
+
+def _encode(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"$dt": value.isoformat()}
+    return str(value)
+
+def decode_history_record(record: Dict) -> Dict:
+    """Восстанавливает типы полей записи истории, прочитанной из файла"""
+    timestamp = record.get("timestamp")
+    if isinstance(timestamp, dict) and "$dt" in timestamp:
+        record["timestamp"] = datetime.fromisoformat(timestamp["$dt"])
+    return record
+
+class HistoryStore:
+    """Файлы вытесненной истории кошельков только на добавление.
+
+    Кошельки раскладываются по shards файлам по CRC32 идентификатора;
+    запись - строка NDJSON с ID кошелька. Кошелек хранит смещения своих
+    записей, поэтому чтение страницы - это seek по этим смещениям без
+    просмотра чужих записей. Файлы открываются при первой записи.
+
+    Конец каждого шарда хранится в памяти: дописывание не двигает
+    позицию файла, а файл, открытый на добавление, пишет в конец сам.
+    Буфер записи сбрасывается перед чтением и при закрытии, flush()
+    дополнительно доводит записи до диска (fsync).
+    """
+
+    def __init__(self, directory: Optional[str] = None, shards: Optional[int] = None):
+        self.directory = directory or WALLET_CONFIG['history_dir']
+        self.shards = shards or WALLET_CONFIG['history_shards']
+        self._files: Dict[int, IO[bytes]] = {}
+        self._ends: Dict[int, int] = {}  # смещение конца каждого открытого шарда
+        self._locks = [threading.Lock() for _ in range(self.shards)]
+        self._open_lock = threading.Lock()
+
+    def shard_of(self, wallet_id: str) -> int:
+        """Номер файла, в который вытесняется история кошелька"""
+        return zlib.crc32(wallet_id.encode()) % self.shards
+
+    def path_of(self, shard: int) -> str:
+        return os.path.join(self.directory, f"shard-{shard:03d}.ndjson")
+
+    def _file(self, shard: int) -> IO[bytes]:
+        f = self._files.get(shard)
+        if f is None:
+            with self._open_lock:
+                f = self._files.get(shard)
+                if f is None:
+                    os.makedirs(self.directory, exist_ok=True)
+                    f = open(self.path_of(shard), "a+b")
+                    self._ends[shard] = f.seek(0, os.SEEK_END)
+                    self._files[shard] = f
+        return f
+
+    def append(self, wallet_id: str, kind: str, record: Any) -> int:
+        """Дописывает запись кошелька и возвращает ее смещение в файле"""
+        line = json.dumps({"w": wallet_id, "k": kind, "e": record}, ensure_ascii=False,
+                          separators=(",", ":"), default=_encode).encode("utf-8") + b"\n"
+        shard = self.shard_of(wallet_id)
+        f = self._file(shard)
+        with self._locks[shard]:
+            offset = self._ends[shard]
+            f.write(line)
+            self._ends[shard] = offset + len(line)
+        return offset
+
+    def read(self, wallet_id: str, offsets: Sequence) -> List[Any]:
+        """Читает записи кошелька по смещениям"""
+        if not len(offsets):
+            return []
+        shard = self.shard_of(wallet_id)
+        f = self._file(shard)
+        records = []
+        with self._locks[shard]:
+            f.flush()
+            for offset in offsets:
+                f.seek(offset)
+                records.append(json.loads(f.readline())["e"])
+        return records
+
+    def flush(self):
+        """Сбрасывает буферы всех открытых шардов на диск (fsync)"""
+        with self._open_lock:
+            files = list(self._files.items())
+        for shard, f in files:
+            with self._locks[shard]:
+                f.flush()
+                os.fsync(f.fileno())
+
+    def close(self):
+        """Сбрасывает и закрывает файлы шардов"""
+        self.flush()
+        with self._open_lock:
+            for f in self._files.values():
+                f.close()
+            self._files.clear()
+            self._ends.clear()
+
+_default_store: Optional[HistoryStore] = None
+_default_lock = threading.Lock()
+
+def default_store() -> HistoryStore:
+    """Хранилище вытесненной истории процесса (WALLET_CONFIG['history_dir'])"""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = HistoryStore()
+        return _default_store
+
+class HistoryView(Sequence):
+    """Представление полной истории кошелька только для чтения.
+
+    Старые записи читаются из файла шарда постранично и по требованию,
+    свежие берутся из кольцевого буфера в памяти. Индексы записей
+    стабильны: вытеснение переносит запись на диск, не меняя ее номера.
+    """
+
+    def __init__(self, wallet_id: str, memory, offsets, store_getter, decode=None):
+        self.wallet_id = wallet_id
+        self._memory = memory
+        self._offsets = offsets
+        self._store = store_getter
+        self._decode = decode
+
+    def __len__(self) -> int:
+        return len(self._offsets) + len(self._memory)
+
+    def _spilled(self, start: int, stop: int) -> List[Any]:
+        records = self._store().read(self.wallet_id, self._offsets[start:stop])
+        if self._decode is not None:
+            records = [self._decode(record) for record in records]
+        return records
+
+    def slice(self, start: int, stop: int) -> List[Any]:
+        """Записи с номерами [start, stop)"""
+        start, stop = max(start, 0), min(stop, len(self))
+        spilled = len(self._offsets)
+        items = self._spilled(start, min(stop, spilled)) if start < spilled else []
+        if stop > spilled:
+            items.extend(islice(self._memory, max(start - spilled, 0), stop - spilled))
+        return items
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("history index out of range")
+        return self.slice(index, index + 1)[0]
+
+    def pages(self, page_size: Optional[int] = None) -> Iterator[List[Any]]:
+        """Лениво выдает историю страницами от старых записей к новым"""
+        page_size = page_size or WALLET_CONFIG['history_page_size']
+        start = 0
+        while start < len(self):
+            page = self.slice(start, start + page_size)
+            if not page:
+                return
+            yield page
+            start += len(page)
+
+    def __iter__(self) -> Iterator[Any]:
+        for page in self.pages():
+            yield from page
+
+    def recent(self) -> List[Any]:
+        """Записи кольцевого буфера в памяти"""
+        return list(self._memory)
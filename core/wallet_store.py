@@ -0,0 +1,424 @@
+import glob
+import hashlib
+import mmap
+import os
+import struct
+from array import array
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from config import WALLET_CONFIG
+from core.transaction import Transaction
+from core.utils.clock import Clock
+from core.wallet import Wallet
+from core.wallet_history import HistoryStore, default_store
+
+# Файл кошельков: заголовок, записи (длина + тело), индекс (ключ, смещение) по возрастанию ключа, трейлер
+MAGIC = b"DRWALLET"
+VERSION = 2
+FILE_HEADER = struct.Struct("<8sH6x")
+RECORD_LENGTH = struct.Struct("<I")
+INDEX_ENTRY = struct.Struct("<16sQ")
+TRAILER = struct.Struct("<QQ8s")  # смещение индекса, число кошельков, MAGIC
+
+# Манифест каталога кошельков: поколение и число файлов; читаются только перечисленные им файлы
+DIRECTORY_MAGIC = b"DRWALDIR"
+MANIFEST = struct.Struct("<8sHxxIQ")  # MAGIC, версия, число файлов, поколение
+MANIFEST_NAME = "MANIFEST"
+
+WALLET_FIXED = struct.Struct("<qqddBI")  # открытие, срок, баланс, лимит, активен, емкость истории
+SECTION_COUNTS = struct.Struct("<IIIIII")
+ENTRY_NUMBERS = struct.Struct("<dq")  # сумма, время
+TRANSACTION_NUMBERS = struct.Struct("<dqB")  # сумма, время, флаги
+STRING_LENGTH = struct.Struct("<H")
+NO_STRING = 0xFFFF
+NO_TIME = -2 ** 63
+
+# Флаги транзакции; целая сумма сохраняет тип, так как входит в подписываемые данные
+TX_OFFLINE = 1
+TX_INTEGER_AMOUNT = 2
+
+def wallet_key(wallet_id: str) -> bytes:
+    """16-байтовый ключ кошелька в индексе файла"""
+    return hashlib.blake2b(wallet_id.encode(), digest_size=16).digest()
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+def _timestamp(value: Optional[datetime]) -> int:
+    # Микросекунды от эпохи без перевода через float: время восстанавливается точно
+    return (value - _EPOCH) // _MICROSECOND if value is not None else NO_TIME
+
+def _datetime(value: int) -> Optional[datetime]:
+    return None if value == NO_TIME else _EPOCH + timedelta(microseconds=value)
+
+class _Writer:
+    __slots__ = ("parts",)
+
+    def __init__(self):
+        self.parts: List[bytes] = []
+
+    def pack(self, fmt: struct.Struct, *values):
+        self.parts.append(fmt.pack(*values))
+
+    def string(self, value: Optional[str]):
+        if value is None:
+            self.parts.append(STRING_LENGTH.pack(NO_STRING))
+            return
+        data = str(value).encode("utf-8")
+        if len(data) >= NO_STRING:
+            raise ValueError("String field is too long for the wallet format")
+        self.parts.append(STRING_LENGTH.pack(len(data)))
+        self.parts.append(data)
+
+    def entry(self, entry: Dict):
+        self.string(entry.get('type'))
+        self.string(entry.get('status'))
+        self.pack(ENTRY_NUMBERS, entry.get('amount', 0.0), _timestamp(entry.get('timestamp')))
+        self.string(entry.get('transaction_id'))
+        self.string(entry.get('block_hash'))
+
+    def transaction(self, tx: Transaction):
+        self.string(tx.id)
+        self.string(tx.sender_id)
+        self.string(tx.recipient_id)
+        flags = (TX_OFFLINE if tx.is_offline else 0) | (TX_INTEGER_AMOUNT if isinstance(tx.amount, int) else 0)
+        self.pack(TRANSACTION_NUMBERS, tx.amount, _timestamp(tx.timestamp), flags)
+        self.string(tx.status)
+        self.string(tx.signature)
+
+class _Reader:
+    __slots__ = ("data", "pos")
+
+    def __init__(self, data, pos: int = 0):
+        self.data = data
+        self.pos = pos
+
+    def unpack(self, fmt: struct.Struct) -> tuple:
+        values = fmt.unpack_from(self.data, self.pos)
+        self.pos += fmt.size
+        return values
+
+    def string(self) -> Optional[str]:
+        (length,) = STRING_LENGTH.unpack_from(self.data, self.pos)
+        self.pos += STRING_LENGTH.size
+        if length == NO_STRING:
+            return None
+        value = bytes(self.data[self.pos:self.pos + length]).decode("utf-8")
+        self.pos += length
+        return value
+
+    def entry(self) -> Dict:
+        entry_type, status = self.string(), self.string()
+        amount, timestamp = self.unpack(ENTRY_NUMBERS)
+        entry = {'type': entry_type, 'amount': amount, 'timestamp': _datetime(timestamp), 'status': status}
+        transaction_id = self.string()
+        if transaction_id is not None:
+            entry['transaction_id'] = transaction_id
+        entry['block_hash'] = self.string()
+        return entry
+
+    def transaction(self) -> Transaction:
+        # Транзакция восстанавливается без __init__, который выдал бы новый ID
+        tx = Transaction.__new__(Transaction)
+        tx.id, tx.sender_id, tx.recipient_id = self.string(), self.string(), self.string()
+        amount, timestamp, flags = self.unpack(TRANSACTION_NUMBERS)
+        tx.amount = int(amount) if flags & TX_INTEGER_AMOUNT else amount
+        tx.timestamp = _datetime(timestamp)
+        tx.is_offline = bool(flags & TX_OFFLINE)
+        tx.status, tx.signature = self.string(), self.string()
+        return tx
+
+    def offsets(self, count: int) -> array:
+        values = array('Q')
+        values.frombytes(bytes(self.data[self.pos:self.pos + count * 8]))
+        self.pos += count * 8
+        return values
+
+def encode_wallet(wallet: Wallet) -> bytes:
+    """Кодирует кошелек (включая ожидающие оффлайн-транзакции) в компактную двоичную запись"""
+    state = wallet.snapshot()
+    writer = _Writer()
+    writer.pack(WALLET_FIXED, _timestamp(state['open_time']), _timestamp(state['expiry_time']),
+                state['balance'], state['max_balance'], state['is_active'], state['history_capacity'])
+    writer.string(state['wallet_id'])
+    writer.string(state['owner_id'])
+    writer.pack(SECTION_COUNTS, len(state['pending_transactions']), len(state['history']),
+                len(state['history_offsets']), len(state['block_hashes']), len(state['block_offsets']),
+                len(state['spilled_pending']))
+    for tx in state['pending_transactions']:
+        writer.transaction(tx)
+    for entry in state['history']:
+        writer.entry(entry)
+    writer.parts.append(state['history_offsets'].tobytes())
+    for block_hash in state['block_hashes']:
+        writer.string(block_hash)
+    writer.parts.append(state['block_offsets'].tobytes())
+    writer.parts.append(array('Q', (position for position, _ in state['spilled_pending'])).tobytes())
+    for _, entry in state['spilled_pending']:
+        writer.entry(entry)
+    return b"".join(writer.parts)
+
+def decode_wallet(data, offset: int = 0, clock: Optional[Clock] = None,
+                  history_store: Optional[HistoryStore] = None) -> Wallet:
+    """Восстанавливает кошелек из двоичной записи"""
+    reader = _Reader(data, offset)
+    open_time, expiry_time, balance, max_balance, is_active, history_capacity = reader.unpack(WALLET_FIXED)
+    wallet_id, owner_id = reader.string(), reader.string()
+    pending, history, history_offsets, blocks, block_offsets, spilled = reader.unpack(SECTION_COUNTS)
+    state = {
+        'wallet_id': wallet_id,
+        'owner_id': owner_id,
+        'open_time': _datetime(open_time),
+        'expiry_time': _datetime(expiry_time),
+        'balance': balance,
+        'max_balance': max_balance,
+        'is_active': bool(is_active),
+        'history_capacity': history_capacity,
+        'pending_transactions': [reader.transaction() for _ in range(pending)],
+        'history': [reader.entry() for _ in range(history)],
+        'history_offsets': reader.offsets(history_offsets),
+        'block_hashes': [reader.string() for _ in range(blocks)],
+        'block_offsets': reader.offsets(block_offsets),
+    }
+    positions = reader.offsets(spilled)
+    state['spilled_pending'] = [(position, reader.entry()) for position in positions]
+    return Wallet.restore(state, clock, history_store)
+
+def _fsync_directory(directory: str):
+    # Переименование файла надежно только после fsync каталога (POSIX)
+    if os.name != "posix":
+        return
+    fd = os.open(directory or ".", os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def save_wallets(path: str, wallets: Iterable[Wallet], history_store: Optional[HistoryStore] = None) -> int:
+    """Записывает кошельки в один файл за последовательный проход; возвращает их число.
+
+    Записи ссылаются на смещения в файлах вытесненной истории, поэтому
+    хранилище истории кошельков (по умолчанию - хранилище процесса)
+    сбрасывается на диск раньше, чем пишется файл кошельков.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    (history_store or default_store()).flush()
+    index: List[Tuple[bytes, int]] = []
+    temporary = path + ".tmp"
+    with open(temporary, "wb", buffering=1024 * 1024) as f:
+        f.write(FILE_HEADER.pack(MAGIC, VERSION))
+        position = FILE_HEADER.size
+        for wallet in wallets:
+            record = encode_wallet(wallet)
+            index.append((wallet_key(wallet.wallet_id), position))
+            f.write(RECORD_LENGTH.pack(len(record)))
+            f.write(record)
+            position += RECORD_LENGTH.size + len(record)
+
+        index.sort()
+        f.write(b"".join(INDEX_ENTRY.pack(key, offset) for key, offset in index))
+        f.write(TRAILER.pack(position, len(index), MAGIC))
+        f.flush()
+        os.fsync(f.fileno())
+    # Новый файл уже на диске, поэтому после сбоя под именем path остается
+    # либо прежняя версия, либо новая целиком; fsync каталога закрепляет замену
+    os.replace(temporary, path)
+    _fsync_directory(directory)
+    return len(index)
+
+class WalletFile:
+    """Файл кошельков, отображенный в память.
+
+    Индекс (отсортированные 16-байтовые ключи и смещения) не читается
+    целиком: поиск кошелька - двоичный поиск прямо по отображению,
+    запись декодируется только при обращении к кошельку.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version = FILE_HEADER.unpack_from(self._map, 0)
+        index_offset, count, trailer_magic = TRAILER.unpack_from(self._map, len(self._map) - TRAILER.size)
+        if magic != MAGIC or trailer_magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"Not a wallet file: {path}")
+        self.index_offset = index_offset
+        self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _key_at(self, i: int) -> bytes:
+        start = self.index_offset + i * INDEX_ENTRY.size
+        return self._map[start:start + 16]
+
+    def find(self, wallet_id: str) -> Optional[int]:
+        """Смещение записи кошелька или None"""
+        key = wallet_key(wallet_id)
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key_at(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self.count and self._key_at(lo) == key:
+            return INDEX_ENTRY.unpack_from(self._map, self.index_offset + lo * INDEX_ENTRY.size)[1]
+        return None
+
+    def read(self, offset: int, clock: Optional[Clock] = None,
+             history_store: Optional[HistoryStore] = None) -> Wallet:
+        return decode_wallet(self._map, offset + RECORD_LENGTH.size, clock, history_store)
+
+    def __iter__(self) -> Iterator[Tuple[int, int]]:
+        """Последовательно выдает (смещение записи, длина записи)"""
+        position = FILE_HEADER.size
+        while position < self.index_offset:
+            (length,) = RECORD_LENGTH.unpack_from(self._map, position)
+            yield position, length
+            position += RECORD_LENGTH.size + length
+
+    def wallets(self, clock: Optional[Clock] = None,
+                history_store: Optional[HistoryStore] = None) -> Iterator[Wallet]:
+        """Декодирует все кошельки файла за один последовательный проход"""
+        for position, _ in self:
+            yield decode_wallet(self._map, position + RECORD_LENGTH.size, clock, history_store)
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+def load_wallets(path: str, clock: Optional[Clock] = None,
+                 history_store: Optional[HistoryStore] = None) -> List[Wallet]:
+    """Загружает все кошельки файла за один последовательный проход"""
+    wallet_file = WalletFile(path)
+    try:
+        return list(wallet_file.wallets(clock, history_store))
+    finally:
+        wallet_file.close()
+
+class WalletDirectory:
+    """Каталог файлов кошельков с ленивой загрузкой отдельных кошельков.
+
+    save() раскладывает кошельки по files файлам по ключу и пишет
+    каждый файл одним последовательным проходом. get() находит
+    кошелек двоичным поиском по индексу отображенного файла и
+    декодирует только его; загруженные кошельки кэшируются.
+
+    Файлы каждого сохранения получают новое поколение в имени, а
+    манифест с поколением и числом файлов заменяется последним:
+    после сбоя посреди save() каталог читается по прежнему манифесту.
+    """
+
+    def __init__(self, directory: Optional[str] = None, clock: Optional[Clock] = None,
+                 history_store: Optional[HistoryStore] = None):
+        self.directory = directory or WALLET_CONFIG['store_dir']
+        self.clock = clock
+        self.history_store = history_store
+        self.generation = 0
+        self._shards = 0
+        self._files: List[WalletFile] = []
+        self._cache: Dict[str, Wallet] = {}
+        self._open()
+
+    def _path(self, generation: int, number: int) -> str:
+        return os.path.join(self.directory, f"wallets-{generation:08d}-{number:03d}.bin")
+
+    def _read_manifest(self) -> Tuple[int, int]:
+        """Поколение и число файлов из манифеста; (0, 0) для пустого каталога"""
+        try:
+            with open(os.path.join(self.directory, MANIFEST_NAME), "rb") as f:
+                data = f.read()
+        except FileNotFoundError:
+            return 0, 0
+        if len(data) != MANIFEST.size:
+            raise ValueError(f"Corrupted wallet manifest in {self.directory}")
+        magic, version, files, generation = MANIFEST.unpack(data)
+        if magic != DIRECTORY_MAGIC or version != VERSION:
+            raise ValueError(f"Not a wallet manifest in {self.directory}")
+        return generation, files
+
+    def _write_manifest(self, generation: int, files: int):
+        path = os.path.join(self.directory, MANIFEST_NAME)
+        temporary = path + ".tmp"
+        with open(temporary, "wb") as f:
+            f.write(MANIFEST.pack(DIRECTORY_MAGIC, VERSION, files, generation))
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, path)
+        _fsync_directory(self.directory)
+
+    def _open(self):
+        self.close()
+        self.generation, shards = self._read_manifest()
+        self._files = [WalletFile(self._path(self.generation, number)) for number in range(shards)]
+        self._shards = shards
+
+    def _file_for(self, wallet_id: str, files: int) -> int:
+        return int.from_bytes(wallet_key(wallet_id)[:4], "little") % files
+
+    def save(self, wallets: Iterable[Wallet], files: Optional[int] = None) -> int:
+        """Сохраняет кошельки (заменяя прежнее содержимое каталога)"""
+        files = files or WALLET_CONFIG['store_files']
+        groups: List[List[Wallet]] = [[] for _ in range(files)]
+        for wallet in wallets:
+            groups[self._file_for(wallet.wallet_id, files)].append(wallet)
+
+        os.makedirs(self.directory, exist_ok=True)
+        generation = self._read_manifest()[0] + 1
+        saved = 0
+        for number, group in enumerate(groups):
+            saved += save_wallets(self._path(generation, number), group, self.history_store)
+        # Каталог переключается на новое поколение одной заменой манифеста
+        self._write_manifest(generation, files)
+
+        self.close()
+        current = {self._path(generation, number) for number in range(files)}
+        for path in glob.glob(os.path.join(self.directory, "wallets-*.bin*")):
+            if path not in current:
+                os.remove(path)  # прежние поколения и остатки прерванных сохранений
+        self._cache.clear()
+        self._open()
+        return saved
+
+    def __len__(self) -> int:
+        return sum(len(f) for f in self._files)
+
+    def __contains__(self, wallet_id: str) -> bool:
+        return wallet_id in self._cache or self._locate(wallet_id) is not None
+
+    def _locate(self, wallet_id: str) -> Optional[Tuple[WalletFile, int]]:
+        if not self._shards:
+            return None
+        wallet_file = self._files[self._file_for(wallet_id, self._shards)]
+        offset = wallet_file.find(wallet_id)
+        return (wallet_file, offset) if offset is not None else None
+
+    def get(self, wallet_id: str) -> Optional[Wallet]:
+        """Загружает кошелек по ID (при первом обращении)"""
+        wallet = self._cache.get(wallet_id)
+        if wallet is None:
+            located = self._locate(wallet_id)
+            if located is None:
+                return None
+            wallet = located[0].read(located[1], self.clock, self.history_store)
+            if wallet.wallet_id != wallet_id:
+                return None  # совпадение 128-битных ключей разных ID
+            self._cache[wallet_id] = wallet
+        return wallet
+
+    def load_all(self) -> Iterator[Wallet]:
+        """Последовательно загружает все кошельки каталога"""
+        for wallet_file in self._files:
+            for wallet in wallet_file.wallets(self.clock, self.history_store):
+                yield self._cache.get(wallet.wallet_id, wallet)
+
+    def close(self):
+        """Снимает отображения файлов"""
+        for wallet_file in self._files:
+            wallet_file.close()
+        self._files = []
+        self._shards = 0
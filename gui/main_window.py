@@ -5,7 +5,6 @@ import sys
 import random
 import time
 from pathlib import Path
-import logging
 from datetime import datetime, timedelta
 import matplotlib
 matplotlib.use('TkAgg')
@@ -16,17 +15,12 @@ plt.rcParams['font.family'] = 'DejaVu Sans'
 # Добавляем корневую директорию в PYTHONPATH
 sys.path.append(str(Path(__file__).parent.parent))
 
-# Настройка логгирования
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler("logs/app.log"),
-        logging.StreamHandler()
-    ]
-)
-
 from core.central_bank import CentralBank
+from core.utils.exceptions import ValidationError
+from core.utils.logging_setup import setup_logging
+
+# Настройка логгирования: запись в файл с ротацией и в консоль из фонового потока
+setup_logging(console=True)
 
 class DigitalRubleApp(tk.Tk):
     def __init__(self):
@@ -792,8 +786,8 @@ class DigitalRubleApp(tk.Tk):
 
         # Тестовые данные для демонстрации
         test_hashes = [
-            ("tx" + ''.join(random.choices('0123456789abcdef', k=16)), datetime.now().isoformat(), "ПОДТВЕРЖДЕНО"),
-            ("tx" + ''.join(random.choices('0123456789abcdef', k=16)), datetime.now().isoformat(), "ОЖИДАНИЕ")
+            ("tx" + ''.join(random.choices('0123456789abcdef', k=16)), self.central_bank.clock.now().isoformat(), "ПОДТВЕРЖДЕНО"),
+            ("tx" + ''.join(random.choices('0123456789abcdef', k=16)), self.central_bank.clock.now().isoformat(), "ОЖИДАНИЕ")
         ]
 
         for tx in test_hashes:
@@ -916,6 +910,7 @@ class DigitalRubleApp(tk.Tk):
 
     def refresh_all_data(self):
         """Обновляет все данные в интерфейсе"""
+        self.central_bank.expire_offline_wallets()
         self._update_comboboxes()
 
         if hasattr(self, 'users_data_tree'):
@@ -940,19 +935,21 @@ class DigitalRubleApp(tk.Tk):
         try:
             count = int(self.user_count_entry.get())
             user_type = self.user_type_var.get()
+            first_number = len(self.central_bank.users) + 1
+            users = []
 
             for i in range(count):
                 if user_type == "physical":
-                    user_id = f"FL{len(self.central_bank.users) + 1:06d}"
+                    user_id = f"FL{first_number + i:06d}"
                     user_type_text = "Физическое лицо"
                 elif user_type == "legal":
-                    user_id = f"UL{len(self.central_bank.users) + 1:06d}"
+                    user_id = f"UL{first_number + i:06d}"
                     user_type_text = "Юридическое лицо"
                 else:  # government
-                    user_id = f"GOV{len(self.central_bank.users) + 1:06d}"
+                    user_id = f"GOV{first_number + i:06d}"
                     user_type_text = "Гос. учреждение"
 
-                user = {
+                users.append({
                     "user_id": user_id,
                     "user_type": user_type_text,
                     "cash_balance": 10000,
@@ -962,9 +959,10 @@ class DigitalRubleApp(tk.Tk):
                     "offline_balance": 0,
                     "offline_activation_time": None,
                     "offline_deactivation_time": None
-                }
-                self.central_bank.users[user_id] = user
+                })
 
+            # Пачкой добавляем пользователей в колоночное хранилище
+            self.central_bank.users.add_accounts(users)
             self._update_comboboxes()
             messagebox.showinfo("Успех", f"Создано {count} пользователей типа {user_type_text}")
             self.refresh_all_data()
@@ -975,20 +973,21 @@ class DigitalRubleApp(tk.Tk):
         """Создает заданное количество банков"""
         try:
             count = int(self.bank_count_entry.get())
+            first_number = len(self.central_bank.banks) + 1
+            banks = []
 
             for i in range(count):
-                bank_id = f"BANK{len(self.central_bank.banks) + 1:04d}"
-                bank = {
-                    "bank_id": bank_id,
-                    "name": f"Банк {len(self.central_bank.banks) + 1}",
+                banks.append({
+                    "bank_id": f"BANK{first_number + i:04d}",
+                    "name": f"Банк {first_number + i}",
                     "bic": f"044525{random.randint(1000, 9999)}",
                     "status": "активен",
                     "balance": 0.0,
                     "cash_balance": 10000000,
-                    "registration_date": datetime.now().isoformat()
-                }
-                self.central_bank.banks[bank_id] = bank
+                    "registration_date": self.central_bank.clock.now().isoformat()
+                })
 
+            self.central_bank.banks.add_accounts(banks)
             self._update_comboboxes()
             messagebox.showinfo("Успех", f"Создано {count} банков")
             self.refresh_all_data()
@@ -1050,7 +1049,7 @@ class DigitalRubleApp(tk.Tk):
                 "receiver": user_id,
                 "amount": amount,
                 "type": "обмен",
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": self.central_bank.clock.now().isoformat(),
                 "tx_hash": tx_hash,
                 "status": "Выполнено"
             }
@@ -1099,7 +1098,7 @@ class DigitalRubleApp(tk.Tk):
                 "receiver": receiver,
                 "amount": amount,
                 "type": "онлайн",
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": self.central_bank.clock.now().isoformat(),
                 "tx_hash": tx_hash,
                 "status": "В очереди"
             }
@@ -1129,11 +1128,10 @@ class DigitalRubleApp(tk.Tk):
             messagebox.showinfo("Информация", "Оффлайн кошелек уже открыт")
             return
 
-        user["offline_wallet_status"] = "Открыт"
-        user["offline_activation_time"] = datetime.now().isoformat()
-        user["offline_deactivation_time"] = (datetime.now() + timedelta(days=14)).isoformat()
+        # Срок регистрируется в планировщике истечения центрального банка
+        result = self.central_bank.open_offline_wallet(user_id)
 
-        messagebox.showinfo("Успех", f"Оффлайн кошелек открыт до {user['offline_deactivation_time']}")
+        messagebox.showinfo("Успех", f"Оффлайн кошелек открыт до {result['offline_deactivation_time']}")
         self.refresh_all_data()
 
     def topup_offline_wallet(self):
@@ -1189,25 +1187,15 @@ class DigitalRubleApp(tk.Tk):
                 messagebox.showerror("Ошибка", "Оффлайн кошелек отправителя не открыт")
                 return
 
-            if sender_user["offline_balance"] < amount:
-                messagebox.showerror("Ошибка", "Недостаточно средств на оффлайн кошельке отправителя")
+            # Средства списываются при сверке, когда кошелек снова выйдет на связь; до этого
+            # сумма зарезервирована, и проверка баланса учитывает все неподтвержденные отправки
+            try:
+                self.central_bank.submit_offline_transaction(sender, receiver, amount, check_balance=True)
+            except ValidationError:
+                messagebox.showerror("Ошибка", "Недостаточно средств на оффлайн кошельке отправителя"
+                                     if amount > 0 else "Некорректная сумма")
                 return
 
-            tx_id = f"TX{len(self.central_bank.offline_transactions) + 1:06d}"
-            tx_hash = f"hash{random.randint(100000, 999999)}"
-
-            offline_tx = {
-                "tx_id": tx_id,
-                "sender": sender,
-                "receiver": receiver,
-                "amount": amount,
-                "timestamp": datetime.now().isoformat(),
-                "tx_hash": tx_hash,
-                "status": "ОФФЛАЙН"
-            }
-            self.central_bank.offline_transactions.append(offline_tx)
-            sender_user["offline_balance"] -= amount
-
             messagebox.showinfo("Успех", "Оффлайн транзакция создана и будет обработана при восстановлении соединения")
             self.refresh_all_data()
         except ValueError:
@@ -1244,7 +1232,7 @@ class DigitalRubleApp(tk.Tk):
                 "tx_hash": tx_hash,
                 "functionality": "Оплата коммунальных платежей",
                 "required_amount": 1000,
-                "execution_time": (datetime.now() + timedelta(days=1)).isoformat(),
+                "execution_time": (self.central_bank.clock.now() + timedelta(days=1)).isoformat(),
                 "status": "СОЗДАН"
             }
             self.central_bank.smart_contracts[contract_id] = smart_contract
@@ -1278,7 +1266,7 @@ class DigitalRubleApp(tk.Tk):
                 "fo_id": bank_id,
                 "cash_balance": bank["cash_balance"],
                 "amount": amount,
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": self.central_bank.clock.now().isoformat(),
                 "status": "Ожидание"
             }
             self.central_bank.emission_requests.append(emission_request)
@@ -1332,7 +1320,7 @@ class DigitalRubleApp(tk.Tk):
                 "receiver": bank_id,
                 "amount": amount,
                 "type": "эмиссия",
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": self.central_bank.clock.now().isoformat(),
                 "tx_hash": tx_hash,
                 "status": "Выполнено"
             }
@@ -1364,9 +1352,15 @@ class DigitalRubleApp(tk.Tk):
         self.refresh_all_data()
 
     def process_pending_transactions(self):
-        """Обрабатывает транзакции в очереди"""
+        """Обрабатывает транзакции в очереди и сверяет оффлайн-транзакции"""
+        offline = self.central_bank.reconcile_offline()
         if not self.pending_transactions:
-            messagebox.showinfo("Информация", "Нет транзакций в очереди")
+            if offline["settled"] or offline["rejected"]:
+                messagebox.showinfo("Информация", f"Оффлайн-транзакций проведено: {offline['settled']}, "
+                                                  f"отклонено: {offline['rejected']}")
+                self.refresh_all_data()
+            else:
+                messagebox.showinfo("Информация", "Нет транзакций в очереди")
             return
 
         processed_count = 0
@@ -1402,9 +1396,9 @@ class DigitalRubleApp(tk.Tk):
 
         # Добавляем тестовые транзакции
         test_tx = [
-            ("tx" + ''.join(random.choices('0123456789abcdef', k=16)), datetime.now().isoformat(), "ПОДТВЕРЖДЕНО"),
-            ("tx" + ''.join(random.choices('0123456789abcdef', k=16)), datetime.now().isoformat(), "ОЖИДАНИЕ"),
-            ("tx" + ''.join(random.choices('0123456789abcdef', k=16)), datetime.now().isoformat(), "ПОДТВЕРЖДЕНО")
+            ("tx" + ''.join(random.choices('0123456789abcdef', k=16)), self.central_bank.clock.now().isoformat(), "ПОДТВЕРЖДЕНО"),
+            ("tx" + ''.join(random.choices('0123456789abcdef', k=16)), self.central_bank.clock.now().isoformat(), "ОЖИДАНИЕ"),
+            ("tx" + ''.join(random.choices('0123456789abcdef', k=16)), self.central_bank.clock.now().isoformat(), "ПОДТВЕРЖДЕНО")
         ]
 
         for tx in test_tx:
@@ -1445,7 +1439,7 @@ class DigitalRubleApp(tk.Tk):
             prev_hash = "0" * 64 if i == 1 else "block" + ''.join(random.choices('0123456789abcdef', k=16))
             current_hash = "block" + ''.join(random.choices('0123456789abcdef', k=16))
             tx_count = random.randint(1, 5)
-            timestamp = datetime.now().strftime('%H:%M:%S')
+            timestamp = self.central_bank.clock.now().strftime('%H:%M:%S')
 
             test_blocks.append((
                 i,
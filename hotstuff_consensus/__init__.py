@@ -1,3 +1,4 @@
 # hotstuff_consensus/__init__.py
 from .hotstuff import HotStuffConsensus
 from .node import HotStuffNode
+from .cluster import LocalCluster
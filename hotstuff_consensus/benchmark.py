@@ -0,0 +1,174 @@
+"""Бенчмарк пропускной способности и задержки консенсуса HotStuff.
+
+Запуск:
+    python -m hotstuff_consensus.benchmark --nodes 4,7 --batch-sizes 10,100 \
+        --latency-ms 0,5 --faulty 0,1 --output bench.json --baseline old.json
+
+Сетевая задержка не ожидается через sleep, а добавляется к измеренному
+времени раунда: раунд состоит из рассылки предложения и сбора голосов,
+то есть двух сетевых переходов.
+"""
+import argparse
+import itertools
+import json
+import math
+import platform
+import sys
+import time
+from typing import Dict, List, Optional, Sequence
+
+from .block import Block
+from .cluster import LocalCluster
+
+RESULT_FORMAT_VERSION = 1
+NETWORK_HOPS_PER_ROUND = 2
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Возвращает перцентиль по методу ближайшего ранга"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+def _make_block(index: int, previous_hash: str, batch_size: int, proposer: str) -> Dict:
+    """Создает блок с синтетическими транзакциями"""
+    transactions = [
+        {"sender": f"user{i}", "recipient": f"user{i + 1}", "amount": 1.0, "seq": index * batch_size + i}
+        for i in range(batch_size)
+    ]
+    return Block(index, transactions, float(index), previous_hash, proposer).to_dict()
+
+def run_scenario(node_count: int, batch_size: int, latency_ms: float = 0.0,
+                 faulty_count: int = 0, rounds: int = 100) -> Dict:
+    """Прогоняет один сценарий и возвращает его метрики"""
+    cluster = LocalCluster(node_count, faulty_count)
+    network_delay = NETWORK_HOPS_PER_ROUND * latency_ms / 1000
+
+    latencies: List[float] = []
+    messages = 0
+    committed_blocks = 0
+    total_time = 0.0
+    previous_hash = "0"
+
+    for index in range(1, rounds + 1):
+        block = _make_block(index, previous_hash, batch_size, cluster.leader_id)
+        started = time.perf_counter()
+        result = cluster.run_round(block)
+        elapsed = time.perf_counter() - started + network_delay
+
+        total_time += elapsed
+        messages += result.get("messages", 0)
+        if result["status"] == "success":
+            committed_blocks += 1
+            latencies.append(elapsed)
+            previous_hash = block["hash"]
+
+    committed_tx = committed_blocks * batch_size
+    return {
+        "nodes": node_count,
+        "batch_size": batch_size,
+        "latency_ms": latency_ms,
+        "faulty": faulty_count,
+        "rounds": rounds,
+        "committed_blocks": committed_blocks,
+        "committed_tx": committed_tx,
+        "tps": committed_tx / total_time if total_time else 0.0,
+        "latency_p50_ms": percentile(latencies, 50) * 1000,
+        "latency_p99_ms": percentile(latencies, 99) * 1000,
+        "messages_per_commit": messages / committed_blocks if committed_blocks else None,
+    }
+
+def run_suite(node_counts: Sequence[int], batch_sizes: Sequence[int],
+              latencies_ms: Sequence[float], faulty_counts: Sequence[int],
+              rounds: int = 100) -> Dict:
+    """Прогоняет все комбинации параметров"""
+    results = []
+    for nodes, batch, latency, faulty in itertools.product(
+            node_counts, batch_sizes, latencies_ms, faulty_counts):
+        if faulty >= nodes:
+            continue
+        results.append(run_scenario(nodes, batch, latency, faulty, rounds))
+
+    return {
+        "version": RESULT_FORMAT_VERSION,
+        "python": platform.python_version(),
+        "timestamp": time.time(),
+        "results": results,
+    }
+
+def _scenario_key(result: Dict) -> tuple:
+    return result["nodes"], result["batch_size"], result["latency_ms"], result["faulty"]
+
+def compare_results(current: Dict, baseline: Dict, tolerance: float = 0.1) -> List[Dict]:
+    """Сравнивает результаты с базовыми и возвращает список регрессий"""
+    baseline_by_key = {_scenario_key(r): r for r in baseline.get("results", [])}
+    regressions = []
+
+    for result in current["results"]:
+        old = baseline_by_key.get(_scenario_key(result))
+        if old is None:
+            continue
+
+        checks = [
+            ("tps", old["tps"] * (1 - tolerance), result["tps"] < old["tps"] * (1 - tolerance)),
+            ("latency_p99_ms", old["latency_p99_ms"] * (1 + tolerance),
+             result["latency_p99_ms"] > old["latency_p99_ms"] * (1 + tolerance)),
+        ]
+        if old["messages_per_commit"] is not None and result["messages_per_commit"] is not None:
+            checks.append(("messages_per_commit", old["messages_per_commit"],
+                           result["messages_per_commit"] > old["messages_per_commit"]))
+
+        for metric, limit, failed in checks:
+            if failed:
+                regressions.append({
+                    "scenario": dict(zip(("nodes", "batch_size", "latency_ms", "faulty"),
+                                         _scenario_key(result))),
+                    "metric": metric,
+                    "baseline": old[metric],
+                    "current": result[metric],
+                    "limit": limit,
+                })
+
+    return regressions
+
+def _int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(",") if v]
+
+def _float_list(value: str) -> List[float]:
+    return [float(v) for v in value.split(",") if v]
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="HotStuff consensus benchmark")
+    parser.add_argument("--nodes", type=_int_list, default=[4, 7, 10])
+    parser.add_argument("--batch-sizes", type=_int_list, default=[1, 100, 1000])
+    parser.add_argument("--latency-ms", type=_float_list, default=[0.0, 5.0])
+    parser.add_argument("--faulty", type=_int_list, default=[0, 1])
+    parser.add_argument("--rounds", type=int, default=100)
+    parser.add_argument("--output", help="Файл для JSON-результатов (по умолчанию stdout)")
+    parser.add_argument("--baseline", help="JSON-результаты предыдущего релиза для сравнения")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    args = parser.parse_args(argv)
+
+    report = run_suite(args.nodes, args.batch_sizes, args.latency_ms, args.faulty, args.rounds)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare_results(report, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression['scenario']}: {regression['metric']} "
+                  f"{regression['baseline']} -> {regression['current']}", file=sys.stderr)
+        if regressions:
+            return 1
+
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
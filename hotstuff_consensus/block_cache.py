@@ -0,0 +1,109 @@
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Set
+from config import HOTSTUFF_CONFIG
+
+class BlockCache:
+    """Кэш полученных блоков с вытеснением закоммиченных и осиротевших блоков.
+
+    Незакоммиченные блоки выше последней закоммиченной высоты закреплены:
+    они могут оказаться в текущей или заблокированной ветке. После коммита
+    блок передается в постоянное хранилище (on_commit) и становится
+    кандидатом на вытеснение по LRU, как и блоки конкурирующих веток,
+    высота которых не выше закоммиченной.
+    """
+
+    def __init__(self, capacity: Optional[int] = None,
+                 on_commit: Optional[Callable[[Dict], None]] = None):
+        self.capacity = capacity if capacity is not None else HOTSTUFF_CONFIG['block_cache_size']
+        self.on_commit = on_commit
+        self.committed_height = -1
+        self._blocks: Dict[str, Dict] = {}
+        self._evictable: "OrderedDict[str, None]" = OrderedDict()  # LRU-порядок
+        self._pending_by_height: Dict[int, Set[str]] = {}
+        self._committed: Set[str] = set()
+        self._locked: Set[str] = set()
+
+    def __contains__(self, block_hash: str) -> bool:
+        return block_hash in self._blocks
+
+    def __getitem__(self, block_hash: str) -> Dict:
+        block = self._blocks[block_hash]
+        if block_hash in self._evictable:
+            self._evictable.move_to_end(block_hash)
+        return block
+
+    def __setitem__(self, block_hash: str, block: Dict):
+        self.add(block, block_hash)
+
+    def __len__(self) -> int:
+        return len(self._blocks)
+
+    def get(self, block_hash: str, default: Optional[Dict] = None) -> Optional[Dict]:
+        """Возвращает блок по хэшу"""
+        if block_hash not in self._blocks:
+            return default
+        return self[block_hash]
+
+    def add(self, block: Dict, block_hash: Optional[str] = None):
+        """Добавляет полученный блок в кэш"""
+        block_hash = block_hash or block["hash"]
+        if block_hash in self._blocks:
+            self[block_hash]
+            return
+
+        self._blocks[block_hash] = block
+        height = block.get("index", 0)
+        if block_hash not in self._committed and height > self.committed_height:
+            self._pending_by_height.setdefault(height, set()).add(block_hash)
+        else:
+            self._evictable[block_hash] = None
+        self._evict()
+
+    def lock(self, block_hash: str):
+        """Закрепляет блок заблокированной ветки вместо предыдущего"""
+        for previous in self._locked - {block_hash}:
+            block = self._blocks.get(previous)
+            if block is not None and block.get("index", 0) <= self.committed_height:
+                self._evictable[previous] = None
+        self._locked = {block_hash}
+        self._evictable.pop(block_hash, None)
+        self._evict()
+
+    def commit(self, block_hash: str) -> bool:
+        """Помечает блок закоммиченным и передает его тело в хранилище"""
+        if block_hash not in self._blocks or block_hash in self._committed:
+            return False
+
+        block = self._blocks[block_hash]
+        height = block.get("index", 0)
+        self._committed.add(block_hash)
+        self.committed_height = max(self.committed_height, height)
+
+        # Блоки на высоте не выше закоммиченной больше не продолжат цепочку
+        for pending_height in sorted(h for h in self._pending_by_height if h <= self.committed_height):
+            for pending_hash in self._pending_by_height.pop(pending_height):
+                if pending_hash not in self._locked or pending_hash == block_hash:
+                    self._evictable[pending_hash] = None
+        self._locked.discard(block_hash)
+
+        self._evictable[block_hash] = None
+        if self.on_commit is not None:
+            self.on_commit(block)
+        self._evict()
+        return True
+
+    def is_committed(self, block_hash: str) -> bool:
+        """Проверяет, закоммичен ли блок"""
+        return block_hash in self._committed
+
+    @property
+    def pinned_count(self) -> int:
+        """Количество закрепленных (невытесняемых) блоков"""
+        return len(self._blocks) - len(self._evictable)
+
+    def _evict(self):
+        """Вытесняет наименее используемые незакрепленные блоки"""
+        while len(self._blocks) > self.capacity and self._evictable:
+            block_hash, _ = self._evictable.popitem(last=False)
+            del self._blocks[block_hash]
+            self._committed.discard(block_hash)
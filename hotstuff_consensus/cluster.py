@@ -0,0 +1,113 @@
+from typing import Dict, List, Optional
+from .node import HotStuffNode
+
+class LocalCluster:
+    """Сеть узлов HotStuff внутри одного процесса (для симуляции и бенчмарков)"""
+
+    def __init__(self, node_count: int, faulty_count: int = 0):
+        if node_count < 1:
+            raise ValueError("Cluster needs at least one node")
+        if faulty_count < 0 or faulty_count >= node_count:
+            raise ValueError("Faulty node count must be in [0, node_count)")
+
+        self.node_ids: List[str] = [f"node{i}" for i in range(node_count)]
+        self.nodes: Dict[str, HotStuffNode] = {
+            node_id: HotStuffNode(node_id) for node_id in self.node_ids
+        }
+        for node in self.nodes.values():
+            for node_id in self.node_ids:
+                node.consensus.add_node(node_id)
+
+        # Неисправными считаем последние узлы: они получают сообщения, но не голосуют
+        self.faulty: set = set(self.node_ids[node_count - faulty_count:])
+        # Отключенные узлы не получают сообщений и не голосуют
+        self.offline: set = set()
+        self.leader_id = self.node_ids[0]
+        for node in self.nodes.values():
+            node.consensus.set_leader(self.leader_id)
+        # После неудачного раунда узлы не могут голосовать за другой блок той же
+        # высоты в том же виде, поэтому следующий раунд идет только в новом виде
+        self.view_change_pending = False
+
+    @property
+    def leader(self) -> HotStuffNode:
+        """Возвращает узел-лидер"""
+        return self.nodes[self.leader_id]
+
+    def change_view(self) -> bool:
+        """Переводит узлы в следующий вид сообщениями NEW-VIEW от исправных узлов.
+
+        Возвращает False, если кворум сообщений не набран; тогда переход
+        повторяется перед следующим раундом.
+        """
+        target = self.leader.consensus.view + 1
+        senders = [node_id for node_id in self.node_ids
+                   if node_id not in self.faulty and node_id not in self.offline]
+        for node_id, node in self.nodes.items():
+            if node_id in self.offline:
+                continue
+            for sender in senders:
+                node.new_view(target, sender)
+
+        if self.leader.consensus.view != target:
+            self.view_change_pending = True
+            return False
+        self.leader_id = self.leader.consensus.leader
+        self.view_change_pending = False
+        return True
+
+    def run_round(self, block: Dict) -> Dict:
+        """Проводит один раунд консенсуса: предложение блока и сбор голосов"""
+        if self.view_change_pending and not self.change_view():
+            return {
+                "status": "failed",
+                "message": "View change quorum not reached",
+                "block_hash": block["hash"],
+                "messages": 0
+            }
+
+        proposal = self.leader.propose_block(block)
+        if proposal["status"] != "success":
+            self.change_view()
+            return proposal
+
+        messages = 0
+        for node_id, node in self.nodes.items():
+            if node_id in self.offline:
+                continue
+            node.receive_proposal(proposal)
+            if node_id != self.leader_id:
+                messages += 1
+
+        result: Optional[Dict] = None
+        for node_id in self.node_ids:
+            if node_id in self.faulty or node_id in self.offline:
+                continue
+            if node_id == self.leader_id:
+                vote_result = self.leader.receive_vote(node_id, block["hash"])
+            else:
+                own_vote = self.nodes[node_id].consensus.cast_vote(
+                    block["hash"], block["index"], proposal["view"])
+                if own_vote["status"] != "success":
+                    continue
+                vote_result = self.leader.receive_vote(
+                    node_id, block["hash"], bytes.fromhex(own_vote["signature"]))
+                messages += 1
+            if result is None and vote_result["status"] == "success":
+                result = vote_result
+
+        if result is None:
+            self.change_view()
+            return {
+                "status": "failed",
+                "message": "Quorum not reached",
+                "block_hash": block["hash"],
+                "messages": messages
+            }
+
+        # Решение о коммите доходит до реплик вместе со следующим предложением
+        for node_id, node in self.nodes.items():
+            if node_id not in self.offline:
+                node.commit_block(block["hash"], result["qc"])
+
+        return {**result, "messages": messages}
@@ -0,0 +1,137 @@
+import hashlib
+import json
+from collections import deque
+from typing import Dict, List, Optional
+from config import HOTSTUFF_CONFIG
+from core.utils.clock import Clock, get_clock
+from .block import Block
+from .cluster import LocalCluster
+from .quorum_certificate import QuorumCertificate, QuorumCertificateBuilder, ValidatorSet
+
+# Сертификаты доступности подписываются в нулевом виде: они не зависят от смены лидера
+AVAILABILITY_VIEW = 0
+
+def batch_digest(transactions: List[Dict]) -> str:
+    """Вычисляет дайджест пачки транзакций"""
+    return hashlib.sha256(json.dumps(transactions, sort_keys=True).encode()).hexdigest()
+
+class BatchWorker:
+    """Воркер, хранящий пачки транзакций и подтверждающий их доступность"""
+
+    def __init__(self, worker_id: str, validators: ValidatorSet):
+        self.worker_id = worker_id
+        self.validators = validators
+        self.batches: Dict[str, List[Dict]] = {}
+
+    def store(self, digest: str, transactions: List[Dict]) -> Optional[bytes]:
+        """Сохраняет пачку и возвращает подписанное подтверждение"""
+        if batch_digest(transactions) != digest:
+            return None
+        self.batches[digest] = transactions
+        return self.validators.sign(self.worker_id, digest, AVAILABILITY_VIEW)
+
+    def fetch(self, digest: str) -> Optional[List[Dict]]:
+        """Отдает пачку по дайджесту"""
+        return self.batches.get(digest)
+
+class DisseminationLayer:
+    """Слой распространения данных, отделенный от упорядочивания.
+
+    Воркеры рассылают пачки транзакций и собирают подтверждения
+    доступности; HotStuff упорядочивает только дайджесты пачек с
+    сертификатами, поэтому размер предложения лидера не зависит от
+    размера транзакций.
+    """
+
+    def __init__(self, worker_count: Optional[int] = None, faulty_count: int = 0,
+                 clock: Optional[Clock] = None):
+        worker_count = worker_count or HOTSTUFF_CONFIG['node_count']
+        self.clock = clock or get_clock()
+        self.validators = ValidatorSet()
+        self.worker_ids = [f"worker{i}" for i in range(worker_count)]
+        for worker_id in self.worker_ids:
+            self.validators.add(worker_id)
+        self.workers: Dict[str, BatchWorker] = {
+            worker_id: BatchWorker(worker_id, self.validators) for worker_id in self.worker_ids
+        }
+        self.faulty = set(self.worker_ids[worker_count - faulty_count:])
+        self.quorum = (worker_count * 2) // 3 + 1
+        self.certified: deque = deque()  # сертификаты, ожидающие упорядочивания
+        self.bytes_sent = 0
+
+    def broadcast(self, transactions: List[Dict]) -> Optional[Dict]:
+        """Рассылает пачку воркерам и возвращает сертификат доступности"""
+        digest = batch_digest(transactions)
+        payload_size = len(json.dumps(transactions))
+        builder = QuorumCertificateBuilder(digest, AVAILABILITY_VIEW)
+
+        for worker_id in self.worker_ids:
+            if worker_id in self.faulty:
+                continue
+            self.bytes_sent += payload_size
+            ack = self.workers[worker_id].store(digest, transactions)
+            if ack is not None:
+                builder.add(self.validators.index_of(worker_id), ack)
+
+        certificate = builder.build()
+        if certificate.signer_count < self.quorum:
+            return None
+
+        certificate = {"digest": digest, "count": len(transactions), "cert": certificate.to_dict()}
+        self.certified.append(certificate)
+        return certificate
+
+    def verify_availability(self, certificate: Dict) -> bool:
+        """Проверяет сертификат доступности пачки"""
+        qc = QuorumCertificate.from_dict(certificate["cert"])
+        return qc.block_hash == certificate["digest"] and self.validators.verify(qc, self.quorum)
+
+    def next_block(self, index: int, previous_hash: str, proposer: str,
+                   max_batches: Optional[int] = None) -> Optional[Dict]:
+        """Собирает блок из сертифицированных дайджестов вместо транзакций"""
+        if not self.certified:
+            return None
+        max_batches = max_batches or len(self.certified)
+        batches = [self.certified.popleft() for _ in range(min(max_batches, len(self.certified)))]
+        return Block(index, batches, self.clock.time(), previous_hash, proposer).to_dict()
+
+    def validate_block(self, block: Dict) -> bool:
+        """Проверяет, что все пачки блока доступны (вызывается репликой перед голосованием)"""
+        return all(self.verify_availability(batch) for batch in block["transactions"])
+
+    def resolve(self, block: Dict) -> List[Dict]:
+        """Восстанавливает транзакции упорядоченного блока из хранилищ воркеров"""
+        transactions = []
+        for batch in block["transactions"]:
+            qc = QuorumCertificate.from_dict(batch["cert"])
+            for worker_id in self.validators.signers_of(qc):
+                payload = self.workers[worker_id].fetch(batch["digest"])
+                if payload is not None:
+                    transactions.extend(payload)
+                    break
+            else:
+                raise LookupError(f"Batch {batch['digest']} is not available")
+        return transactions
+
+    def order(self, cluster: LocalCluster, index: int, previous_hash: str,
+              max_batches: Optional[int] = None) -> Optional[Dict]:
+        """Упорядочивает накопленные пачки одним раундом HotStuff"""
+        block = self.next_block(index, previous_hash, cluster.leader_id, max_batches)
+        if block is None:
+            return None
+        if not self.validate_block(block):
+            # Доступные пачки возвращаются в начало очереди, недоступные отбрасываются с отчетом
+            available, dropped = [], []
+            for batch in block["transactions"]:
+                if self.verify_availability(batch):
+                    available.append(batch)
+                else:
+                    dropped.append(batch["digest"])
+            self.certified.extendleft(reversed(available))
+            return {"status": "error", "message": "Unavailable batch in block", "block": block,
+                    "requeued": len(available), "dropped": dropped}
+
+        result = cluster.run_round(block)
+        if result["status"] != "success":
+            self.certified.extendleft(reversed(block["transactions"]))
+        return {**result, "block": block}
@@ -1,10 +1,13 @@
 # hotstuff_consensus/hotstuff.py
 import json
 import time
+from contextlib import nullcontext
 from typing import Dict, List, Set, Optional, Any
+from .quorum_certificate import QuorumCertificate, QuorumCertificateBuilder, ValidatorSet
+from .wal import ConsensusWAL, recover_state
 
 class HotStuffConsensus:
-    def __init__(self, node_id: str):
+    def __init__(self, node_id: str, wal: Optional[ConsensusWAL] = None):
         self.node_id = node_id
         self.view = 0
         self.leader = None
@@ -14,46 +17,146 @@ class HotStuffConsensus:
         self.locked_block: Optional[Dict] = None
         self.votes: Dict[str, Set[str]] = {}  # block_hash: set(node_ids)
         self.new_view_votes: Set[str] = set()
-
-    def add_node(self, node_id: str):
+        self.new_view_target: Optional[int] = None  # вид, за переход к которому собираются голоса
+        self.validators = ValidatorSet()
+        self.qc_builders: Dict[str, QuorumCertificateBuilder] = {}  # block_hash: builder
+        self.high_qc: Optional[QuorumCertificate] = None
+        self.last_vote: Optional[Dict] = None  # последний собственный голос: view, height, block
+        self.proposal_heights: Dict[str, int] = {}  # block_hash: высота предложенного блока
+        self.wal = wal
+        if wal is not None:
+            self._restore(recover_state(wal.replay()))
+
+    def _restore(self, state: Dict):
+        """Восстанавливает вид, блокировку и поданные голоса после перезапуска"""
+        self.view = state["view"]
+        self.locked_block = state["locked_block"]
+        self.high_qc = QuorumCertificate.from_dict(state["high_qc"]) if state["high_qc"] else None
+        self.last_vote = state["last_vote"]
+
+    def _log(self, record: Dict):
+        if self.wal is not None:
+            self.wal.append(record)
+
+    def _wal_batch(self):
+        return self.wal.batch() if self.wal is not None else nullcontext()
+
+    def checkpoint(self):
+        """Сжимает журнал до снимка текущего состояния"""
+        if self.wal is None:
+            return
+        records = [{"t": "view", "view": self.view}]
+        if self.high_qc is not None:
+            records.append({"t": "lock", "qc": self.high_qc.to_dict(), "block": self.locked_block})
+        if self.last_vote is not None:
+            records.append({"t": "vote", **self.last_vote})
+        self.wal.rewrite(records)
+
+    def add_node(self, node_id: str, key: Optional[bytes] = None):
         """Добавляет узел в сеть консенсуса"""
         self.nodes.add(node_id)
+        self.validators.add(node_id, key)
         self.quorum = (len(self.nodes) * 2) // 3 + 1  # 2f+1 византийская устойчивость
 
     def set_leader(self, leader_id: str):
         """Устанавливает лидера для текущего вида"""
         self.leader = leader_id
 
-    def propose(self, block: Dict) -> Dict:
-        """Предлагает новый блок (вызывается лидером)"""
+    def propose(self, block: Dict, justify: Optional[QuorumCertificate] = None) -> Dict:
+        """Предлагает новый блок (вызывается лидером).
+
+        К предложению прикладывается сертификат кворума предыдущего блока:
+        явно переданный justify или последний собранный high_qc.
+        """
         if self.node_id != self.leader:
             return {"status": "error", "message": "Only leader can propose blocks"}
 
         self.proposed_block = block
         self.votes[block["hash"]] = set()
+        self.proposal_heights[block["hash"]] = block.get("index", 0)
+        self.qc_builders[block["hash"]] = QuorumCertificateBuilder(block["hash"], self.view)
+        justify = justify or self.high_qc
 
         return {
             "status": "success",
             "block": block,
             "view": self.view,
-            "leader": self.leader
+            "leader": self.leader,
+            "justify": justify.to_dict() if justify else None
         }
 
-    def vote(self, block_hash: str, voter_id: str) -> Dict:
-        """Голосует за блок"""
+    def sign_vote(self, block_hash: str) -> bytes:
+        """Подписывает голос этого узла за блок в текущем виде"""
+        return self.validators.sign(self.node_id, block_hash, self.view)
+
+    def cast_vote(self, block_hash: str, height: int, view: Optional[int] = None) -> Dict:
+        """Подает собственный голос узла.
+
+        Голос записывается в журнал до отправки. Узел голосует только за
+        возрастающие пары (вид, высота) и не голосует за два разных блока
+        на одной позиции, в том числе после перезапуска.
+        """
+        view = self.view if view is None else view
+        if self.last_vote is not None:
+            last_position = (self.last_vote["view"], self.last_vote["height"])
+            if (view, height) < last_position:
+                return {"status": "error", "message": "Vote for an outdated position"}
+            if (view, height) == last_position and self.last_vote["block"] != block_hash:
+                return {"status": "error", "message": "Already voted for another block at this height"}
+
+        vote = {"view": view, "height": height, "block": block_hash}
+        if vote != self.last_vote:
+            self._log({"t": "vote", **vote})
+            self.last_vote = vote
+
+        return {
+            "status": "success",
+            "block_hash": block_hash,
+            "view": view,
+            "signature": self.validators.sign(self.node_id, block_hash, view).hex()
+        }
+
+    def vote(self, block_hash: str, voter_id: str, signature: Optional[bytes] = None) -> Dict:
+        """Голосует за блок.
+
+        Без signature принимается только собственный голос узла - он
+        подписывается его ключом; голоса других узлов должны быть
+        подписаны ими самими.
+        """
         if block_hash not in self.votes:
             return {"status": "error", "message": "Unknown block"}
-
-        self.votes[block_hash].add(voter_id)
+        if voter_id not in self.nodes:
+            return {"status": "error", "message": "Unknown voter"}
+
+        with self._wal_batch():
+            return self._count_vote(block_hash, voter_id, signature)
+
+    def _count_vote(self, block_hash: str, voter_id: str, signature: Optional[bytes]) -> Dict:
+        builder = self.qc_builders[block_hash]
+        if voter_id == self.node_id and signature is None:
+            own_vote = self.cast_vote(block_hash, self.proposal_heights[block_hash], builder.view)
+            if own_vote["status"] != "success":
+                return own_vote
+            signature = bytes.fromhex(own_vote["signature"])
+        elif signature is None:
+            return {"status": "error", "message": "Unsigned vote"}
+        elif not self.validators.verify_vote(voter_id, block_hash, builder.view, signature):
+            return {"status": "error", "message": "Invalid vote signature"}
+
+        if builder.add(self.validators.index_of(voter_id), signature):
+            self.votes[block_hash].add(voter_id)
 
         # Проверяем кворум
         if len(self.votes[block_hash]) >= self.quorum:
             # Блок принят
+            qc = builder.build()
+            self.update_high_qc(qc)
             return {
                 "status": "success",
                 "message": "Block accepted by quorum",
                 "block_hash": block_hash,
-                "votes": list(self.votes[block_hash])
+                "qc": qc.to_dict(),
+                "signers": qc.signer_count
             }
 
         return {
@@ -63,18 +166,64 @@ class HotStuffConsensus:
             "required": self.quorum
         }
 
-    def new_view(self, new_view: int) -> Dict:
-        """Переход к новому виду"""
+    def verify_qc(self, qc: QuorumCertificate) -> bool:
+        """Проверяет сертификат кворума"""
+        return self.validators.verify(qc, self.quorum)
+
+    def verify_qcs(self, qcs: List[QuorumCertificate]) -> bool:
+        """Пакетно проверяет несколько сертификатов кворума"""
+        return self.validators.verify_batch(qcs, self.quorum)
+
+    def update_high_qc(self, qc: QuorumCertificate, block: Optional[Dict] = None):
+        """Запоминает самый свежий сертификат и блокируется на его блоке"""
+        if self.high_qc is not None and qc.view < self.high_qc.view:
+            return
+        if block is None and self.proposed_block is not None \
+                and self.proposed_block["hash"] == qc.block_hash:
+            block = self.proposed_block
+
+        # Сертификат того же блока лишь дополнился голосами - журнал не трогаем
+        if self.high_qc is None or (qc.block_hash, qc.view) != (self.high_qc.block_hash, self.high_qc.view):
+            self._log({"t": "lock", "qc": qc.to_dict(), "block": block})
+        self.high_qc = qc
+        if block is not None:
+            self.locked_block = block
+
+    def prune(self, committed_height: int):
+        """Забывает голоса и сборщики сертификатов блоков не выше закоммиченной высоты"""
+        for block_hash in [h for h, height in self.proposal_heights.items() if height <= committed_height]:
+            del self.proposal_heights[block_hash]
+            self.votes.pop(block_hash, None)
+            self.qc_builders.pop(block_hash, None)
+
+    def new_view(self, new_view: int, voter_id: Optional[str] = None) -> Dict:
+        """Переход к новому виду.
+
+        Без voter_id учитывается собственное сообщение узла, иначе -
+        сообщение NEW-VIEW от voter_id. Вид меняется, когда за один и тот
+        же новый вид набран кворум сообщений.
+        """
         if new_view <= self.view:
             return {"status": "error", "message": "New view must be greater than current"}
+        voter_id = voter_id or self.node_id
+        if voter_id not in self.nodes:
+            return {"status": "error", "message": "Unknown voter"}
 
-        self.new_view_votes.add(self.node_id)
+        if new_view != self.new_view_target:
+            self.new_view_target = new_view
+            self.new_view_votes = set()
+        self.new_view_votes.add(voter_id)
 
         if len(self.new_view_votes) >= self.quorum:
+            self._log({"t": "view", "view": new_view})
             self.view = new_view
-            self.leader = list(self.nodes)[self.view % len(self.nodes)]
+            # Порядок валидаторов одинаков на всех узлах, в отличие от порядка обхода множества
+            self.leader = self.validators.node_at(self.view % len(self.validators))
             self.new_view_votes = set()
+            self.new_view_target = None
             self.votes = {}
+            self.qc_builders = {}
+            self.proposal_heights = {}
 
             return {
                 "status": "success",
@@ -99,5 +248,6 @@ class HotStuffConsensus:
             "quorum": self.quorum,
             "proposed_block": self.proposed_block,
             "locked_block": self.locked_block,
-            "votes": {k: list(v) for k, v in self.votes.items()}
+            "votes": {k: list(v) for k, v in self.votes.items()},
+            "high_qc": self.high_qc.to_dict() if self.high_qc else None
         }
@@ -0,0 +1,116 @@
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from config import HOTSTUFF_CONFIG
+from core.utils.clock import Clock, get_clock
+from .block import Block
+from .cluster import LocalCluster
+from .quorum_certificate import QuorumCertificate
+
+class ConsensusLanes:
+    """Независимые линии упорядочивания HotStuff, по одной на шард счетов.
+
+    Транзакции распределяются по линиям по отправителю, поэтому порядок
+    операций одного счета задает одна линия. Каждая линия коммитит свои
+    блоки собственным лидером; результаты раунда детерминированно
+    сливаются по (высота, номер линии) независимо от порядка завершения.
+    """
+
+    def __init__(self, lane_count: Optional[int] = None, nodes_per_lane: Optional[int] = None,
+                 batch_size: Optional[int] = None, parallel: bool = True,
+                 clock: Optional[Clock] = None):
+        self.lane_count = lane_count or HOTSTUFF_CONFIG['lane_count']
+        self.clock = clock or get_clock()
+        nodes_per_lane = nodes_per_lane or HOTSTUFF_CONFIG['node_count']
+        self.batch_size = batch_size or HOTSTUFF_CONFIG['block_size_limit']
+        self.parallel = parallel
+
+        self.lanes: List[LocalCluster] = [LocalCluster(nodes_per_lane) for _ in range(self.lane_count)]
+        self.queues: List[List[Dict]] = [[] for _ in range(self.lane_count)]
+        self.heights: List[int] = [0] * self.lane_count
+        self.tips: List[str] = ["0"] * self.lane_count
+
+    def lane_for(self, account_id: str) -> int:
+        """Возвращает номер линии для счета (стабильно между процессами)"""
+        return zlib.crc32(account_id.encode()) % self.lane_count
+
+    def submit(self, transaction: Dict, key: Optional[str] = None) -> int:
+        """Ставит транзакцию в очередь линии ее отправителя"""
+        lane_id = self.lane_for(key or transaction["sender"])
+        self.queues[lane_id].append(transaction)
+        return lane_id
+
+    def pending_count(self) -> int:
+        """Количество транзакций, ожидающих упорядочивания"""
+        return sum(len(queue) for queue in self.queues)
+
+    def _commit_lane(self, lane_id: int) -> Optional[Dict]:
+        """Коммитит очередной блок линии; при неудаче транзакции остаются в очереди"""
+        queue = self.queues[lane_id]
+        if not queue:
+            return None
+
+        cluster = self.lanes[lane_id]
+        batch = queue[:self.batch_size]
+        height = self.heights[lane_id] + 1
+        block = Block(height, batch, self.clock.time(), self.tips[lane_id], cluster.leader_id).to_dict()
+        result = cluster.run_round(block)
+        if result["status"] != "success":
+            return None
+
+        del queue[:len(batch)]
+        self.heights[lane_id] = height
+        self.tips[lane_id] = block["hash"]
+        return {"lane": lane_id, "height": height, "block": block, "qc": result["qc"]}
+
+    def commit_round(self) -> List[Dict]:
+        """Проводит по одному раунду во всех линиях и сливает результаты"""
+        lane_ids = [i for i in range(self.lane_count) if self.queues[i]]
+        if self.parallel and len(lane_ids) > 1:
+            with ThreadPoolExecutor(max_workers=len(lane_ids)) as executor:
+                outputs = list(executor.map(self._commit_lane, lane_ids))
+        else:
+            outputs = [self._commit_lane(i) for i in lane_ids]
+        return self.merge([output for output in outputs if output is not None])
+
+    @staticmethod
+    def merge(outputs: List[Dict]) -> List[Dict]:
+        """Детерминированно упорядочивает закоммиченные блоки линий"""
+        return sorted(outputs, key=lambda output: (output["height"], output["lane"]))
+
+    def merge_into(self, blockchain, outputs: List[Dict]):
+        """Добавляет слитый раунд линий в глобальный реестр одним блоком.
+
+        Реестр должен быть создан с lane_verifier=self.verify_certificates,
+        иначе его блоки с сертификатами линий не пройдут проверку цепочки.
+        """
+        if not outputs:
+            return None
+        if blockchain.lane_verifier is None:
+            raise ValueError("Blockchain has no lane verifier")
+
+        transactions = [tx for output in outputs for tx in output["block"]["transactions"]]
+        # Заголовок блока линии позволяет пересчитать его хэш по срезу транзакций глобального блока
+        certificates = [{
+            "lane": output["lane"],
+            "height": output["height"],
+            "block_hash": output["block"]["hash"],
+            "tx_count": len(output["block"]["transactions"]),
+            "timestamp": output["block"]["timestamp"],
+            "previous_hash": output["block"]["previous_hash"],
+            "proposer": output["block"]["proposer"],
+            "qc": output["qc"]
+        } for output in outputs]
+
+        return blockchain.append_finalized(transactions, {"lanes": certificates})
+
+    def verify_certificates(self, certificates: List[Dict]) -> bool:
+        """Проверяет сертификаты кворума линий, приложенные к глобальному блоку"""
+        for certificate in certificates:
+            if not 0 <= certificate["lane"] < self.lane_count:
+                return False
+            qc = QuorumCertificate.from_dict(certificate["qc"])
+            consensus = self.lanes[certificate["lane"]].leader.consensus
+            if qc.block_hash != certificate["block_hash"] or not consensus.verify_qc(qc):
+                return False
+        return True
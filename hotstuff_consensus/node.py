@@ -1,15 +1,37 @@
 # hotstuff_consensus/node.py
-from typing import Dict, Any, Optional
+import json
+from collections import deque
+from itertools import islice
+from typing import Deque, Dict, Any, Optional, Callable, List
+from config import HOTSTUFF_CONFIG
 from .hotstuff import HotStuffConsensus
+from .block_cache import BlockCache
+from .quorum_certificate import QuorumCertificate
+from .wal import ConsensusWAL
 
 class HotStuffNode:
-    def __init__(self, node_id: str):
+    def __init__(self, node_id: str, cache_size: Optional[int] = None,
+                 block_store: Optional[Callable[[Dict], None]] = None,
+                 wal: Optional[ConsensusWAL] = None, sync_window: Optional[int] = None):
         self.node_id = node_id
-        self.consensus = HotStuffConsensus(node_id)
-        self.received_blocks: Dict[str, Dict] = {}  # block_hash: Block
+        self.consensus = HotStuffConsensus(node_id, wal)
+        # block_hash: Block; закоммиченные блоки передаются в block_store
+        self.received_blocks = BlockCache(cache_size, on_commit=block_store)
+        # Последние закоммиченные блоки для синхронизации: {"block": Block, "qc": QC} по возрастанию
+        # высоты; окно ограничено, более старые блоки остаются только в block_store
+        self.committed_chain: Deque[Dict] = deque(
+            maxlen=sync_window if sync_window is not None else HOTSTUFF_CONFIG['sync_window'])
 
     def receive_proposal(self, proposal: Dict) -> Dict:
         """Получает предложение блока от лидера"""
+        if proposal.get("justify"):
+            qc = QuorumCertificate.from_dict(proposal["justify"])
+            if not self.consensus.verify_qc(qc):
+                return {"status": "error", "message": "Invalid quorum certificate"}
+            self.consensus.update_high_qc(qc, self.received_blocks.get(qc.block_hash))
+            if qc.block_hash in self.received_blocks:
+                self.received_blocks.lock(qc.block_hash)
+
         self.received_blocks[proposal["block"]["hash"]] = proposal["block"]
         return {
             "status": "success",
@@ -17,12 +39,66 @@ class HotStuffNode:
             "block_hash": proposal["block"]["hash"]
         }
 
-    def receive_vote(self, voter_id: str, block_hash: str) -> Dict:
+    def receive_vote(self, voter_id: str, block_hash: str, signature: Optional[bytes] = None) -> Dict:
         """Получает голос от другого узла"""
         if block_hash not in self.received_blocks:
-            return {"status": "error", "message": "Unknown block"}
+            # Узел пропустил предложение и должен догнать сеть через синхронизацию
+            return {"status": "error", "message": "Unknown block", "sync_required": True}
+
+        result = self.consensus.vote(block_hash, voter_id, signature)
+        if result["status"] == "success":
+            self.commit_block(block_hash, result["qc"])
+        return result
+
+    def commit_block(self, block_hash: str, qc: Optional[Dict] = None) -> bool:
+        """Фиксирует блок, принятый кворумом"""
+        block = self.received_blocks.get(block_hash)
+        if not self.received_blocks.commit(block_hash):
+            return False
+        self.committed_chain.append({"block": block, "qc": qc})
+        self.consensus.prune(self.received_blocks.committed_height)
+        return True
+
+    @property
+    def committed_tip(self) -> Optional[Dict]:
+        """Последний закоммиченный блок"""
+        return self.committed_chain[-1]["block"] if self.committed_chain else None
+
+    def get_committed_blocks(self, start_height: int, max_blocks: int,
+                             max_bytes: Optional[int] = None) -> List[Dict]:
+        """Отдает отрезок закоммиченной цепочки для синхронизации отстающих узлов.
+
+        Ответ ограничен max_blocks и, если задан, примерным размером
+        max_bytes (но содержит хотя бы один блок). Блоки старше окна
+        sync_window узел не отдает - их запрашивают у других пиров.
+        """
+        if not self.committed_chain:
+            return []
+        offset = start_height - self.committed_chain[0]["block"]["index"]
+        if offset < 0:
+            return []
+
+        entries = []
+        size = 0
+        for entry in islice(self.committed_chain, offset, offset + max_blocks):
+            if max_bytes is not None:
+                size += len(json.dumps(entry))
+                if entries and size > max_bytes:
+                    break
+            entries.append(entry)
+        return entries
+
+    def apply_committed_blocks(self, entries: List[Dict]) -> int:
+        """Применяет пачку проверенных закоммиченных блоков, полученных при синхронизации"""
+        for entry in entries:
+            block = entry["block"]
+            self.received_blocks.add(block)
+            self.commit_block(block["hash"], entry["qc"])
 
-        return self.consensus.vote(block_hash, voter_id)
+        if entries and entries[-1]["qc"]:
+            qc = QuorumCertificate.from_dict(entries[-1]["qc"])
+            self.consensus.update_high_qc(qc, entries[-1]["block"])
+        return len(entries)
 
     def propose_block(self, block_data: Dict) -> Dict:
         """Предлагает новый блок (если этот узел - лидер)"""
@@ -32,14 +108,16 @@ class HotStuffNode:
         """Голосует за блок"""
         return self.consensus.vote(block_hash, self.node_id)
 
-    def new_view(self, new_view: int) -> Dict:
-        """Инициирует переход к новому виду"""
-        return self.consensus.new_view(new_view)
+    def new_view(self, new_view: int, voter_id: Optional[str] = None) -> Dict:
+        """Инициирует переход к новому виду или учитывает сообщение NEW-VIEW от voter_id"""
+        return self.consensus.new_view(new_view, voter_id)
 
     def get_status(self) -> Dict:
         """Возвращает статус узла"""
         return {
             **self.consensus.get_status(),
             "node_id": self.node_id,
-            "received_blocks": len(self.received_blocks)
+            "received_blocks": len(self.received_blocks),
+            "pinned_blocks": self.received_blocks.pinned_count,
+            "committed_height": self.received_blocks.committed_height
         }
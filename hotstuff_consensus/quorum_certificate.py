@@ -0,0 +1,142 @@
+import hashlib
+import hmac
+from typing import Dict, Any, Iterable, List, Optional
+
+SIGNATURE_SIZE = hashlib.sha256().digest_size
+
+def derive_node_key(node_id: str) -> bytes:
+    """Выводит ключ подписи узла (офлайн-замена настоящей PKI)"""
+    return hashlib.sha256(f"hotstuff-node-key:{node_id}".encode()).digest()
+
+def _vote_message(block_hash: str, view: int) -> bytes:
+    return f"{view}:{block_hash}".encode()
+
+def _xor(left: bytes, right: bytes) -> bytes:
+    return (int.from_bytes(left, "big") ^ int.from_bytes(right, "big")).to_bytes(SIGNATURE_SIZE, "big")
+
+class QuorumCertificate:
+    """Компактный сертификат кворума: битовая карта подписантов и агрегированная подпись.
+
+    Агрегирование — XOR частичных HMAC-подписей, замена BLS-мультиподписи
+    для офлайн-симуляции. Размер сертификата не зависит от числа голосов,
+    кроме битовой карты (n бит).
+    """
+
+    def __init__(self, block_hash: str, view: int, signers: int, signature: bytes):
+        self.block_hash = block_hash
+        self.view = view
+        self.signers = signers  # бит i установлен, если подписал i-й валидатор
+        self.signature = signature
+
+    @property
+    def signer_count(self) -> int:
+        """Количество подписантов"""
+        return bin(self.signers).count("1")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Преобразует сертификат в словарь"""
+        return {
+            "block_hash": self.block_hash,
+            "view": self.view,
+            "signers": format(self.signers, "x"),
+            "signature": self.signature.hex()
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'QuorumCertificate':
+        """Создает сертификат из словаря"""
+        return cls(
+            block_hash=data["block_hash"],
+            view=data["view"],
+            signers=int(data["signers"], 16),
+            signature=bytes.fromhex(data["signature"])
+        )
+
+class ValidatorSet:
+    """Набор валидаторов с ключами и позициями в битовой карте"""
+
+    def __init__(self):
+        self._keys: Dict[str, bytes] = {}
+        self._order: List[str] = []
+        self._index: Dict[str, int] = {}
+        self._macs: Dict[str, "hmac.HMAC"] = {}
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def add(self, node_id: str, key: Optional[bytes] = None):
+        """Добавляет валидатора; позиции упорядочены по идентификатору узла"""
+        if node_id in self._keys:
+            return
+        self._keys[node_id] = key or derive_node_key(node_id)
+        self._macs[node_id] = hmac.new(self._keys[node_id], digestmod=hashlib.sha256)
+        self._order = sorted(self._keys)
+        self._index = {node_id: i for i, node_id in enumerate(self._order)}
+
+    def index_of(self, node_id: str) -> int:
+        """Возвращает позицию валидатора в битовой карте"""
+        return self._index[node_id]
+
+    def node_at(self, index: int) -> str:
+        """Возвращает идентификатор валидатора по позиции"""
+        return self._order[index]
+
+    def signers_of(self, qc: QuorumCertificate) -> List[str]:
+        """Раскрывает битовую карту в список идентификаторов"""
+        return [node_id for i, node_id in enumerate(self._order) if qc.signers >> i & 1]
+
+    def sign(self, node_id: str, block_hash: str, view: int) -> bytes:
+        """Частичная подпись голоса узла"""
+        mac = self._macs[node_id].copy()
+        mac.update(_vote_message(block_hash, view))
+        return mac.digest()
+
+    def verify_vote(self, node_id: str, block_hash: str, view: int, signature: bytes) -> bool:
+        """Проверяет частичную подпись голоса"""
+        return node_id in self._macs and hmac.compare_digest(
+            self.sign(node_id, block_hash, view), signature)
+
+    def _expected_aggregate(self, qc: QuorumCertificate) -> Optional[bytes]:
+        if qc.signers >> len(self._order):
+            return None  # неизвестные подписанты
+        aggregate = bytes(SIGNATURE_SIZE)
+        for node_id in self.signers_of(qc):
+            aggregate = _xor(aggregate, self.sign(node_id, qc.block_hash, qc.view))
+        return aggregate
+
+    def verify(self, qc: QuorumCertificate, quorum: int) -> bool:
+        """Проверяет сертификат кворума"""
+        if qc.signer_count < quorum:
+            return False
+        expected = self._expected_aggregate(qc)
+        return expected is not None and hmac.compare_digest(expected, qc.signature)
+
+    def verify_batch(self, qcs: Iterable[QuorumCertificate], quorum: int) -> bool:
+        """Проверяет пачку сертификатов; останавливается на первом неверном.
+
+        Каждый сертификат сверяется отдельно: XOR агрегатов всей пачки
+        не зависит от того, какой сертификат несет какую подпись, и
+        пропустил бы переставленные подписи.
+        """
+        return all(self.verify(qc, quorum) for qc in qcs)
+
+class QuorumCertificateBuilder:
+    """Накапливает голоса за блок в битовую карту и агрегированную подпись"""
+
+    def __init__(self, block_hash: str, view: int):
+        self.block_hash = block_hash
+        self.view = view
+        self.signers = 0
+        self.signature = bytes(SIGNATURE_SIZE)
+
+    def add(self, index: int, signature: bytes) -> bool:
+        """Добавляет частичную подпись; повторный голос игнорируется"""
+        if self.signers >> index & 1:
+            return False
+        self.signers |= 1 << index
+        self.signature = _xor(self.signature, signature)
+        return True
+
+    def build(self) -> QuorumCertificate:
+        """Формирует сертификат из накопленных голосов"""
+        return QuorumCertificate(self.block_hash, self.view, self.signers, self.signature)
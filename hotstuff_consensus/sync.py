@@ -0,0 +1,124 @@
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional, Sequence
+from config import HOTSTUFF_CONFIG
+from .block import Block
+from .node import HotStuffNode
+from .quorum_certificate import QuorumCertificate
+
+class SyncError(Exception):
+    """Ошибка синхронизации узла"""
+    pass
+
+class SyncClient:
+    """Догоняет сеть для отстающего узла HotStuff.
+
+    Недостающие закоммиченные блоки запрашиваются у пиров отрезками
+    ограниченного размера, несколько запросов находятся в полете
+    одновременно. Каждый отрезок проверяется (хэши, связность цепочки,
+    пакетная проверка сертификатов кворума) и применяется целиком.
+    """
+
+    def __init__(self, node: HotStuffNode, peers: Sequence[HotStuffNode],
+                 chunk_size: Optional[int] = None, max_chunk_bytes: Optional[int] = None,
+                 pipeline_depth: Optional[int] = None):
+        if not peers:
+            raise ValueError("At least one peer is required for sync")
+        self.node = node
+        self.peers = list(peers)
+        self.chunk_size = chunk_size or HOTSTUFF_CONFIG['sync_chunk_size']
+        self.max_chunk_bytes = max_chunk_bytes or HOTSTUFF_CONFIG['sync_max_chunk_bytes']
+        self.pipeline_depth = pipeline_depth or HOTSTUFF_CONFIG['sync_pipeline_depth']
+        self._next_peer = 0
+
+    def target_height(self) -> int:
+        """Максимальная закоммиченная высота среди пиров"""
+        tips = [peer.committed_tip for peer in self.peers]
+        return max((tip["index"] for tip in tips if tip is not None), default=0)
+
+    def catch_up(self, target_height: Optional[int] = None) -> Dict:
+        """Загружает и применяет недостающие блоки до target_height"""
+        target = target_height if target_height is not None else self.target_height()
+        tip = self.node.committed_tip
+        start = tip["index"] + 1 if tip else 1
+        previous_hash = tip["hash"] if tip else None
+
+        applied = 0
+        chunks = 0
+        started = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.pipeline_depth) as executor:
+            pending = deque()
+            next_request = start
+
+            def request(height: int, count: int, attempt: int = 0, peer_index: Optional[int] = None):
+                # Повтор идет к следующему по кругу пиру, а не к тому, что выдаст общий счетчик
+                if peer_index is None:
+                    peer_index = self._pick_peer()
+                peer = self.peers[peer_index]
+                future = executor.submit(peer.get_committed_blocks, height, count, self.max_chunk_bytes)
+                return height, count, attempt, peer_index, future
+
+            while next_request <= target or pending:
+                while len(pending) < self.pipeline_depth and next_request <= target:
+                    count = min(self.chunk_size, target - next_request + 1)
+                    pending.append(request(next_request, count))
+                    next_request += count
+
+                height, count, attempt, peer_index, future = pending.popleft()
+                entries = future.result()
+                if not entries:
+                    if attempt + 1 >= len(self.peers):
+                        raise SyncError(f"No peer could serve blocks from height {height}")
+                    pending.appendleft(request(height, count, attempt + 1,
+                                               (peer_index + 1) % len(self.peers)))
+                    continue
+
+                self._verify_chunk(entries, height, previous_hash)
+                self.node.apply_committed_blocks(entries)
+                previous_hash = entries[-1]["block"]["hash"]
+                applied += len(entries)
+                chunks += 1
+
+                # Пир урезал ответ по размеру - дозапрашиваем остаток отрезка
+                if len(entries) < count:
+                    pending.appendleft(request(height + len(entries), count - len(entries)))
+
+        elapsed = time.perf_counter() - started
+        return {
+            "status": "success",
+            "blocks": applied,
+            "chunks": chunks,
+            "height": self.node.committed_tip["index"] if self.node.committed_tip else 0,
+            "seconds": elapsed,
+            "blocks_per_second": applied / elapsed if elapsed else 0.0
+        }
+
+    def _pick_peer(self) -> int:
+        peer_index = self._next_peer % len(self.peers)
+        self._next_peer += 1
+        return peer_index
+
+    def _verify_chunk(self, entries: List[Dict], start_height: int, previous_hash: Optional[str]):
+        """Проверяет отрезок цепочки перед применением"""
+        qcs = []
+        for offset, entry in enumerate(entries):
+            block = entry["block"]
+            if block["index"] != start_height + offset:
+                raise SyncError(f"Unexpected block height {block['index']}")
+            if Block.from_dict(block).compute_hash() != block["hash"]:
+                raise SyncError(f"Block {block['index']} hash mismatch")
+            if previous_hash is not None and block["previous_hash"] != previous_hash:
+                raise SyncError(f"Block {block['index']} does not extend the local chain")
+            if not entry["qc"]:
+                raise SyncError(f"Block {block['index']} has no quorum certificate")
+
+            qc = QuorumCertificate.from_dict(entry["qc"])
+            if qc.block_hash != block["hash"]:
+                raise SyncError(f"Quorum certificate does not match block {block['index']}")
+            qcs.append(qc)
+            previous_hash = block["hash"]
+
+        if not self.node.consensus.verify_qcs(qcs):
+            raise SyncError(f"Invalid quorum certificates in blocks from height {start_height}")
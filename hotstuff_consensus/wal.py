@@ -0,0 +1,251 @@
+import json
+import os
+import struct
+import threading
+import zlib
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+from config import HOTSTUFF_CONFIG
+
+# Заголовок записи: длина полезной нагрузки и CRC32
+_HEADER = struct.Struct("<II")
+
+DURABILITY_LEVELS = ("none", "async", "group")
+
+class WALError(Exception):
+    """Журнал не смог надежно записать данные"""
+    pass
+
+class ConsensusWAL:
+    """Журнал упреждающей записи состояния консенсуса.
+
+    Уровни надежности:
+      none  - запись только в буфер ОС, fsync не выполняется;
+      async - fsync в фоновом потоке раз в flush_interval, append не ждет;
+      group - append возвращается после fsync, но одновременные записи
+              (и записи внутри batch()) разделяют один fsync.
+
+    После ошибки записи или fsync содержимое файла не определено, поэтому
+    журнал переходит в состояние ошибки: все ожидающие и последующие
+    операции получают WALError.
+    """
+
+    def __init__(self, path: str, durability: Optional[str] = None,
+                 flush_interval: Optional[float] = None):
+        durability = durability or HOTSTUFF_CONFIG['wal_durability']
+        if durability not in DURABILITY_LEVELS:
+            raise ValueError(f"Unknown WAL durability level: {durability}")
+
+        self.path = path
+        self.durability = durability
+        self.flush_interval = flush_interval if flush_interval is not None \
+            else HOTSTUFF_CONFIG['wal_flush_interval']
+        self.fsync_count = 0
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._truncate_torn_tail()
+        self._file = open(path, "ab")
+
+        self._cond = threading.Condition()
+        self._buffer: List[bytes] = []
+        self._appended_seq = 0
+        self._durable_seq = 0
+        self._flushing = False
+        self._batch_depth = 0
+        self._closed = False
+        self._error: Optional[BaseException] = None
+
+        self._flusher: Optional[threading.Thread] = None
+        if durability == "async":
+            self._flusher = threading.Thread(target=self._flush_loop, name="wal-flusher", daemon=True)
+            self._flusher.start()
+
+    @staticmethod
+    def encode(record: Dict) -> bytes:
+        """Кодирует запись с заголовком длины и контрольной суммы"""
+        payload = json.dumps(record, separators=(",", ":")).encode()
+        return _HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+
+    def append(self, record: Dict):
+        """Добавляет запись в журнал с учетом уровня надежности"""
+        data = self.encode(record)
+        with self._cond:
+            if self._closed:
+                raise ValueError("WAL is closed")
+            self._check_error()
+            self._buffer.append(data)
+            self._appended_seq += 1
+            seq = self._appended_seq
+            if self.durability == "group" and self._batch_depth == 0:
+                self._wait_durable(seq)
+            elif self.durability == "none":
+                self._write_buffer(sync=False)
+
+    @contextmanager
+    def batch(self):
+        """Группирует несколько записей под один fsync"""
+        with self._cond:
+            self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            with self._cond:
+                self._batch_depth -= 1
+                if self.durability == "group" and self._batch_depth == 0:
+                    self._wait_durable(self._appended_seq)
+
+    def flush(self):
+        """Принудительно сбрасывает все записи на диск"""
+        with self._cond:
+            self._wait_durable(self._appended_seq)
+
+    def _wait_durable(self, seq: int):
+        """Ждет, пока запись seq станет надежной; первый ожидающий выполняет fsync за всех"""
+        while self._durable_seq < seq:
+            self._check_error()
+            if self._flushing:
+                self._cond.wait()
+                continue
+            self._flushing = True
+            batch, upto = self._buffer, self._appended_seq
+            self._buffer = []
+            self._cond.release()
+            try:
+                self._file.write(b"".join(batch))
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            except BaseException as error:
+                self._cond.acquire()
+                self._error = error
+                self._flushing = False
+                self._cond.notify_all()
+                raise WALError("WAL write failed") from error
+            self._cond.acquire()
+            self._flushing = False
+            self.fsync_count += 1
+            self._durable_seq = max(self._durable_seq, upto)
+            self._cond.notify_all()
+
+    def _check_error(self):
+        if self._error is not None:
+            raise WALError("WAL write failed") from self._error
+
+    def _write_buffer(self, sync: bool):
+        """Пишет накопленные записи в файл (вызывается под блокировкой)"""
+        while self._flushing:
+            self._cond.wait()
+        if self._buffer:
+            self._file.write(b"".join(self._buffer))
+            self._buffer = []
+        self._file.flush()
+        if sync:
+            os.fsync(self._file.fileno())
+            self.fsync_count += 1
+            self._durable_seq = self._appended_seq
+
+    def _flush_loop(self):
+        with self._cond:
+            while not self._closed and self._error is None:
+                self._cond.wait(self.flush_interval)
+                if self._durable_seq < self._appended_seq:
+                    try:
+                        self._wait_durable(self._appended_seq)
+                    except WALError:
+                        return  # ошибка сохранена и будет получена следующим вызовом
+
+    def close(self):
+        """Сбрасывает буфер и закрывает журнал"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        if self._flusher is not None:
+            self._flusher.join()
+        with self._cond:
+            try:
+                self._check_error()
+                self._write_buffer(sync=self.durability != "none")
+            finally:
+                self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def rewrite(self, records: List[Dict]):
+        """Атомарно заменяет журнал снимком состояния (компакция)"""
+        tmp_path = self.path + ".tmp"
+        with self._cond:
+            self._write_buffer(sync=False)
+            with open(tmp_path, "wb") as f:
+                f.write(b"".join(self.encode(r) for r in records))
+                f.flush()
+                os.fsync(f.fileno())
+            self._file.close()
+            os.replace(tmp_path, self.path)
+            self._file = open(self.path, "ab")
+            self._durable_seq = self._appended_seq
+
+    @staticmethod
+    def _scan(data: bytes) -> Iterator[Tuple[Dict, int]]:
+        """Разбирает записи, возвращая их вместе со смещением конца"""
+        view = memoryview(data)
+        offset = 0
+        while offset + _HEADER.size <= len(data):
+            length, crc = _HEADER.unpack_from(data, offset)
+            start = offset + _HEADER.size
+            payload = view[start:start + length]
+            if len(payload) < length or zlib.crc32(payload) != crc:
+                return
+            offset = start + length
+            yield json.loads(payload.tobytes()), offset
+
+    @classmethod
+    def read(cls, path: str) -> Iterator[Dict]:
+        """Последовательно читает записи журнала до первой поврежденной"""
+        if not os.path.exists(path):
+            return
+        with open(path, "rb") as f:
+            data = f.read()
+        for record, _ in cls._scan(data):
+            yield record
+
+    def replay(self) -> List[Dict]:
+        """Возвращает все записи журнала"""
+        with self._cond:
+            self._write_buffer(sync=False)
+        return list(self.read(self.path))
+
+    def _truncate_torn_tail(self):
+        """Обрезает недописанную при сбое последнюю запись"""
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            data = f.read()
+        valid = 0
+        for _, valid in self._scan(data):
+            pass
+        if valid < len(data):
+            with open(self.path, "r+b") as f:
+                f.truncate(valid)
+
+def recover_state(records: List[Dict]) -> Dict:
+    """Восстанавливает состояние безопасности консенсуса из записей журнала"""
+    state = {"view": 0, "locked_block": None, "high_qc": None, "last_vote": None}
+    for record in records:
+        kind = record["t"]
+        if kind == "view":
+            state["view"] = max(state["view"], record["view"])
+        elif kind == "vote":
+            state["last_vote"] = {"view": record["view"], "height": record["height"],
+                                  "block": record["block"]}
+        elif kind == "lock":
+            state["high_qc"] = record["qc"]
+            if record.get("block") is not None:
+                state["locked_block"] = record["block"]
+    return state
@@ -0,0 +1,19 @@
+"""Генератор нагрузки для центрального банка без графического интерфейса.
+
+Запуск:
+    python -m loadgen --banks 10 --users 10000 --rate 2000 --count 50000 \
+        --arrival bursty --mix online=0.6,exchange=0.2,offline=0.1,emission=0.05,contract=0.05 \
+        --amount online=lognormal:6,1 --seed 42 --trace load.ndjson.gz --output load.json
+
+Воспроизведение записанной трассы (детерминированное, на любой версии):
+    python -m loadgen.replay load.ndjson.gz --mode fast --output replay.json
+"""
+from .distributions import parse_distribution
+from .driver import LoadDriver
+from .population import Population, build_population
+from .workload import OPERATIONS, Operation, generate_workload, parse_mix
+
+__all__ = [
+    'LoadDriver', 'OPERATIONS', 'Operation', 'Population', 'build_population',
+    'generate_workload', 'parse_distribution', 'parse_mix'
+]
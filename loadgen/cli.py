@@ -0,0 +1,59 @@
+import argparse
+import json
+import sys
+from typing import Dict, List, Optional
+from core.central_bank import CentralBank
+from core.trace import TraceRecorder
+from .driver import LoadDriver
+from .population import build_population
+from .workload import ARRIVAL_PROCESSES, generate_workload, parse_mix
+
+def _amounts(items: List[str]) -> Dict[str, str]:
+    amounts = {}
+    for item in items:
+        kind, _, spec = item.partition("=")
+        amounts[kind] = spec
+    return amounts
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Headless load generator for the digital ruble simulator")
+    parser.add_argument("--banks", type=int, default=5)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--user-cash", help="Распределение наличных пользователей, например lognormal:9,0.5")
+    parser.add_argument("--rate", type=float, default=500.0, help="Средняя интенсивность операций в секунду")
+    parser.add_argument("--count", type=int, default=5000, help="Количество операций")
+    parser.add_argument("--arrival", choices=ARRIVAL_PROCESSES, default="poisson")
+    parser.add_argument("--burst-factor", type=float)
+    parser.add_argument("--burst-fraction", type=float)
+    parser.add_argument("--mix", type=parse_mix, help="Доли операций, например online=0.6,exchange=0.4")
+    parser.add_argument("--amount", action="append", default=[],
+                        help="Распределение сумм операции, например online=uniform:1,100")
+    parser.add_argument("--threads", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--storage", choices=("memory", "sqlite"), help="Хранилище реестра")
+    parser.add_argument("--trace", help="Записать операции в файл трассы (python -m loadgen.replay)")
+    parser.add_argument("--output", help="Файл для JSON-отчета (по умолчанию stdout)")
+    args = parser.parse_args(argv)
+
+    central_bank = CentralBank(storage_backend=args.storage)
+    recorder = TraceRecorder(central_bank, args.trace) if args.trace else None
+    try:
+        population = build_population(central_bank, args.banks, args.users, args.seed, args.user_cash)
+        operations = generate_workload(population, args.count, args.rate, args.arrival, args.mix,
+                                       _amounts(args.amount), args.seed,
+                                       args.burst_factor, args.burst_fraction)
+        report = LoadDriver(central_bank, threads=args.threads).run(operations, args.rate)
+        report["supply_ok"] = central_bank.check_supply()["ok"]
+    finally:
+        central_bank.close()
+        if recorder is not None:
+            recorder.close()
+
+    report["parameters"] = {key: value for key, value in vars(args).items() if key not in ("output", "trace")}
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    else:
+        json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+        sys.stdout.write("\n")
+    return 0
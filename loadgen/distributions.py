@@ -0,0 +1,27 @@
+import random
+from typing import Callable, Dict
+
+# Распределение: функция от генератора случайных чисел
+Distribution = Callable[[random.Random], float]
+
+def parse_distribution(spec: str) -> Distribution:
+    """Разбирает описание распределения вида 'имя:параметры'.
+
+    Поддерживаются const:x, uniform:a,b, exp:mean, lognormal:mu,sigma
+    и pareto:alpha,scale.
+    """
+    name, _, params = spec.partition(":")
+    values = [float(v) for v in params.split(",") if v]
+    builders: Dict[str, Callable[..., Distribution]] = {
+        "const": lambda x: (lambda rng: x),
+        "uniform": lambda a, b: (lambda rng: rng.uniform(a, b)),
+        "exp": lambda mean: (lambda rng: rng.expovariate(1 / mean)),
+        "lognormal": lambda mu, sigma: (lambda rng: rng.lognormvariate(mu, sigma)),
+        "pareto": lambda alpha, scale: (lambda rng: scale * rng.paretovariate(alpha)),
+    }
+    if name not in builders:
+        raise ValueError(f"Unknown distribution: {name}")
+    try:
+        return builders[name](*values)
+    except TypeError:
+        raise ValueError(f"Wrong parameters for distribution {name}: {params}") from None
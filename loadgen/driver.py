@@ -0,0 +1,174 @@
+import logging
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, List, Optional
+from config import LOADGEN_CONFIG
+from core.utils.exceptions import DigitalRubleError
+from hotstuff_consensus.benchmark import percentile
+from .workload import OPERATIONS, Operation
+
+logger = logging.getLogger(__name__)
+
+class LoadDriver:
+    """Прогоняет нагрузку через CentralBank и Blockchain в открытом цикле.
+
+    Операция запускается в свое плановое время независимо от того,
+    успели ли завершиться предыдущие; задержка считается от планового
+    времени, поэтому отставание драйвера тоже попадает в задержку.
+    Через block_interval формируется блок из накопленных транзакций,
+    через reconcile_interval сверяются оффлайн-транзакции.
+    Отказы CentralBank (DigitalRubleError) считаются отклоненными
+    операциями; прочие исключения из потоков пула и Future эмиссий
+    записываются в журнал, и run() пробрасывает первое из них.
+    """
+
+    def __init__(self, central_bank, threads: int = 1, block_interval: Optional[float] = None,
+                 reconcile_interval: Optional[float] = None, offline_topup: Optional[float] = None):
+        self.central_bank = central_bank
+        self.threads = threads
+        self.block_interval = block_interval if block_interval is not None else LOADGEN_CONFIG['block_interval']
+        self.reconcile_interval = reconcile_interval if reconcile_interval is not None \
+            else LOADGEN_CONFIG['reconcile_interval']
+        self.offline_topup = offline_topup if offline_topup is not None else LOADGEN_CONFIG['offline_topup']
+
+        self._lock = threading.Condition()
+        self._outstanding = 0  # эмиссии, ожидающие проведения пачкой
+        self._latencies: Dict[str, List[float]] = {kind: [] for kind in OPERATIONS}
+        self._rejected: Dict[str, int] = {kind: 0 for kind in OPERATIONS}
+        self._errors: List[BaseException] = []  # непредвиденные исключения операций
+        self.blocks = 0
+
+    def _record(self, kind: str, scheduled: float, ok: bool):
+        latency = time.perf_counter() - scheduled
+        with self._lock:
+            if ok:
+                self._latencies[kind].append(latency)
+            else:
+                self._rejected[kind] += 1
+
+    def _fail(self, kind: str, error: BaseException):
+        logger.error("Операция %s завершилась непредвиденной ошибкой", kind, exc_info=error)
+        with self._lock:
+            self._errors.append(error)
+
+    def _emission_done(self, future: Future, scheduled: float):
+        error = future.exception()
+        if error is not None and not isinstance(error, DigitalRubleError):
+            self._fail("emission", error)
+        self._record("emission", scheduled, error is None)
+        with self._lock:
+            self._outstanding -= 1
+            self._lock.notify_all()
+
+    def _execute(self, operation: Operation, scheduled: float):
+        bank, params = self.central_bank, operation.params
+        try:
+            if operation.kind == "exchange":
+                bank.exchange(params["user"], params["bank"], params["amount"])
+            elif operation.kind == "online":
+                bank.transfer(params["sender"], params["receiver"], params["amount"])
+            elif operation.kind == "offline":
+                if bank.users[params["sender"]]["offline_balance"] < params["amount"]:
+                    bank.fund_offline_wallet(params["sender"], params["amount"] * self.offline_topup)
+                bank.submit_offline_transaction(params["sender"], params["receiver"], params["amount"])
+            elif operation.kind == "contract":
+                contract = bank.create_contract(params["sender"], params["receiver"], params["amount"])
+                bank.execute_contract(contract["contract_id"])
+            elif operation.kind == "emission":
+                # Эмиссия проводится пачкой; задержка фиксируется при разрешении Future
+                future = bank.submit_emission(params["bank"], params["amount"], "loadgen")
+                with self._lock:
+                    self._outstanding += 1
+                future.add_done_callback(lambda f: self._emission_done(f, scheduled))
+                return
+        except DigitalRubleError:
+            self._record(operation.kind, scheduled, False)
+            return
+        self._record(operation.kind, scheduled, True)
+
+    def _mine(self):
+        if self.central_bank.mine_pending() is not None:
+            self.blocks += 1
+
+    def run(self, operations: List[Operation], target_rate: Optional[float] = None) -> Dict:
+        """Выполняет операции по расписанию и возвращает отчет.
+
+        target_rate - запрошенная интенсивность, по которой строилось
+        расписание; в отчете она отделена от интенсивности самого расписания.
+        """
+        executor = ThreadPoolExecutor(max_workers=self.threads) if self.threads > 1 else None
+        futures: List[Future] = []
+        started = time.perf_counter()
+        last_block = last_reconcile = started
+        max_lag = 0.0
+
+        for operation in operations:
+            scheduled = started + operation.time
+            now = time.perf_counter()
+            if scheduled > now:
+                time.sleep(scheduled - now)
+            else:
+                max_lag = max(max_lag, now - scheduled)
+
+            if executor is not None:
+                futures.append(executor.submit(self._execute, operation, scheduled))
+            else:
+                try:
+                    self._execute(operation, scheduled)
+                except Exception as error:
+                    self._fail(operation.kind, error)
+
+            now = time.perf_counter()
+            if now - last_block >= self.block_interval:
+                self._mine()
+                last_block = now
+            if now - last_reconcile >= self.reconcile_interval:
+                self.central_bank.reconcile_offline()
+                last_reconcile = now
+
+        if executor is not None:
+            executor.shutdown(wait=True)
+            for future, operation in zip(futures, operations):
+                if future.exception() is not None:
+                    self._fail(operation.kind, future.exception())
+        with self._lock:
+            # Дожидаемся проведения оставшихся эмиссий
+            while self._outstanding:
+                self._lock.wait()
+        elapsed = time.perf_counter() - started
+        if self._errors:
+            raise self._errors[0]
+
+        self._mine()
+        self.central_bank.reconcile_offline()
+        return self.report(operations, elapsed, max_lag, target_rate)
+
+    def report(self, operations: List[Operation], elapsed: float, max_lag: float,
+               target_rate: Optional[float] = None) -> Dict:
+        """Собирает метрики прогона"""
+        all_latencies = [latency for values in self._latencies.values() for latency in values]
+        completed = len(all_latencies)
+        planned = operations[-1].time if operations else 0.0
+        return {
+            "operations": len(operations),
+            "completed": completed,
+            "rejected": sum(self._rejected.values()),
+            "target_rate": target_rate,
+            "scheduled_rate": round(len(operations) / planned, 2) if planned else None,
+            "achieved_tps": round(completed / elapsed, 2) if elapsed else 0.0,
+            "duration_s": round(elapsed, 3),
+            "max_schedule_lag_ms": round(max_lag * 1000, 3),
+            "latency_p50_ms": round(percentile(all_latencies, 50) * 1000, 3),
+            "latency_p99_ms": round(percentile(all_latencies, 99) * 1000, 3),
+            "blocks": self.blocks,
+            "by_operation": {
+                kind: {
+                    "completed": len(self._latencies[kind]),
+                    "rejected": self._rejected[kind],
+                    "latency_p50_ms": round(percentile(self._latencies[kind], 50) * 1000, 3),
+                    "latency_p99_ms": round(percentile(self._latencies[kind], 99) * 1000, 3),
+                }
+                for kind in OPERATIONS if self._latencies[kind] or self._rejected[kind]
+            }
+        }
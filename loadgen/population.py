@@ -0,0 +1,59 @@
+import random
+from typing import Dict, List, Optional
+from config import LOADGEN_CONFIG
+from .distributions import parse_distribution
+
+class Population:
+    """Синтетические банки и пользователи, зарегистрированные в центральном банке"""
+
+    def __init__(self, bank_ids: List[str], user_ids: List[str], home_bank: Dict[str, str]):
+        self.bank_ids = bank_ids
+        self.user_ids = user_ids
+        self.home_bank = home_bank  # пользователь: обслуживающий банк
+
+def build_population(central_bank, bank_count: int, user_count: int, seed: int = 0,
+                     user_cash: Optional[str] = None, bank_reserve: Optional[float] = None,
+                     digital_share: Optional[float] = None) -> Population:
+    """Создает банки с резервом цифровых рублей и пользователей с наличными.
+
+    Счета добавляются пачками в колоночные хранилища; резерв банков
+    выпускается одной пачкой эмиссий, а цифровые балансы пользователей
+    получаются обменом, поэтому стартовое состояние согласовано с
+    инвариантами денежной массы.
+    """
+    rng = random.Random(seed)
+    cash = parse_distribution(user_cash or LOADGEN_CONFIG['user_cash'])
+    reserve = bank_reserve if bank_reserve is not None else LOADGEN_CONFIG['bank_reserve']
+    digital_share = digital_share if digital_share is not None else LOADGEN_CONFIG['initial_digital_share']
+
+    bank_ids = [f"BANKLG{seed:04d}{i:06d}" for i in range(bank_count)]
+    central_bank.add_banks([{
+        "bank_id": bank_id,
+        "name": f"Нагрузочный банк {i}",
+        "bic": f"0445{i:05d}",
+        "status": "active",
+        "balance": 0.0,
+        "cash_balance": 0.0
+    } for i, bank_id in enumerate(bank_ids)])
+    if bank_ids and reserve > 0:
+        central_bank.settle_emissions([(bank_id, reserve, "loadgen reserve") for bank_id in bank_ids])
+
+    user_ids = [f"FLLG{seed:04d}{i:08d}" for i in range(user_count)]
+    home_bank = {user_id: rng.choice(bank_ids) for user_id in user_ids} if bank_ids else {}
+    central_bank.add_users([{
+        "user_id": user_id,
+        "user_type": "Физическое лицо",
+        "cash_balance": round(cash(rng), 2),
+        "digital_wallet_status": "Открыт",
+        "offline_wallet_status": "Открыт",
+        "digital_balance": 0.0,
+        "offline_balance": 0.0
+    } for user_id in user_ids])
+
+    # Часть наличных сразу обменивается в обслуживающем банке, чтобы было чем платить
+    if bank_ids and reserve > 0 and digital_share > 0:
+        for user_id in user_ids:
+            amount = round(central_bank.users[user_id]["cash_balance"] * digital_share, 2)
+            if amount > 0:
+                central_bank.exchange(user_id, home_bank[user_id], amount)
+    return Population(bank_ids, user_ids, home_bank)
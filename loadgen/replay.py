@@ -0,0 +1,32 @@
+import argparse
+import json
+import sys
+from typing import List, Optional
+from core.trace import TRACE_MODES, TraceReplayer
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay a recorded central bank operation trace")
+    parser.add_argument("trace", help="Файл трассы (NDJSON, .gz - сжатый)")
+    parser.add_argument("--mode", choices=TRACE_MODES, help="fast - без пауз, realtime - по записанным моментам")
+    parser.add_argument("--storage", choices=("memory", "sqlite"), help="Хранилище реестра")
+    parser.add_argument("--output", help="Файл для JSON-отчета (по умолчанию stdout)")
+    args = parser.parse_args(argv)
+
+    replayer = TraceReplayer(args.trace, args.mode, storage_backend=args.storage)
+    try:
+        report = replayer.replay()
+        report["supply_ok"] = replayer.central_bank.check_supply()["ok"]
+    finally:
+        if replayer.central_bank is not None:
+            replayer.central_bank.close()
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+    else:
+        json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+        sys.stdout.write("\n")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
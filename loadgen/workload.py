@@ -0,0 +1,106 @@
+import random
+from typing import Dict, Iterator, List, Optional
+from config import LOADGEN_CONFIG
+from .distributions import parse_distribution
+from .population import Population
+
+OPERATIONS = ("exchange", "online", "offline", "emission", "contract")
+ARRIVAL_PROCESSES = ("poisson", "bursty")
+
+class Operation:
+    """Операция нагрузки: плановое время от начала прогона и параметры"""
+
+    __slots__ = ("time", "kind", "params")
+
+    def __init__(self, time: float, kind: str, params: Dict):
+        self.time = time
+        self.kind = kind
+        self.params = params
+
+    def __repr__(self) -> str:
+        return f"Operation({self.time:.6f}, {self.kind!r}, {self.params!r})"
+
+def poisson_arrivals(rate: float, rng: random.Random) -> Iterator[float]:
+    """Моменты прихода пуассоновского потока с интенсивностью rate"""
+    t = 0.0
+    while True:
+        t += rng.expovariate(rate)
+        yield t
+
+def bursty_arrivals(rate: float, rng: random.Random, burst_factor: float,
+                    burst_fraction: float, cycle: float) -> Iterator[float]:
+    """Моменты прихода потока с чередованием всплесков и затиший.
+
+    Во всплеске интенсивность в burst_factor раз выше средней, доля
+    времени во всплесках - burst_fraction; интенсивность затишья
+    подобрана так, чтобы средняя оставалась равной rate.
+    """
+    if burst_factor * burst_fraction >= 1:
+        raise ValueError("burst_factor * burst_fraction must be below 1")
+    rates = (rate * burst_factor, rate * (1 - burst_factor * burst_fraction) / (1 - burst_fraction))
+    means = (cycle * burst_fraction, cycle * (1 - burst_fraction))
+
+    t, phase = 0.0, 1
+    while True:
+        phase_end = t + rng.expovariate(1 / means[phase])
+        while True:
+            # Пуассоновский поток без памяти можно начинать заново на границе фазы
+            t += rng.expovariate(rates[phase])
+            if t >= phase_end:
+                t = phase_end
+                break
+            yield t
+        phase = 1 - phase
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """Разбирает доли операций вида 'online=0.5,offline=0.2'"""
+    mix = {}
+    for item in spec.split(","):
+        if not item:
+            continue
+        kind, _, weight = item.partition("=")
+        if kind not in OPERATIONS:
+            raise ValueError(f"Unknown operation: {kind}")
+        mix[kind] = float(weight)
+    return mix
+
+def generate_workload(population: Population, count: int, rate: float, arrival: str = "poisson",
+                      mix: Optional[Dict[str, float]] = None, amounts: Optional[Dict[str, str]] = None,
+                      seed: int = 0, burst_factor: Optional[float] = None,
+                      burst_fraction: Optional[float] = None, burst_cycle: Optional[float] = None) -> List[Operation]:
+    """Порождает воспроизводимую (по seed) последовательность операций"""
+    if arrival not in ARRIVAL_PROCESSES:
+        raise ValueError(f"Unknown arrival process: {arrival}")
+    rng = random.Random(seed)
+    mix = mix or LOADGEN_CONFIG['mix']
+    amount_of = {kind: parse_distribution(spec)
+                 for kind, spec in {**LOADGEN_CONFIG['amounts'], **(amounts or {})}.items()}
+
+    if arrival == "poisson":
+        arrivals = poisson_arrivals(rate, rng)
+    else:
+        arrivals = bursty_arrivals(
+            rate, rng,
+            burst_factor or LOADGEN_CONFIG['burst_factor'],
+            burst_fraction or LOADGEN_CONFIG['burst_fraction'],
+            burst_cycle or LOADGEN_CONFIG['burst_cycle'])
+
+    kinds = [kind for kind in OPERATIONS if mix.get(kind)]
+    weights = [mix[kind] for kind in kinds]
+    users, banks = population.user_ids, population.bank_ids
+    operations = []
+
+    for _ in range(count):
+        time = next(arrivals)
+        kind = rng.choices(kinds, weights)[0]
+        amount = round(amount_of[kind](rng), 2) or 0.01
+        if kind == "emission":
+            params = {"bank": rng.choice(banks), "amount": amount}
+        elif kind == "exchange":
+            user = rng.choice(users)
+            params = {"user": user, "bank": population.home_bank[user], "amount": amount}
+        else:
+            sender, receiver = rng.sample(users, 2)
+            params = {"sender": sender, "receiver": receiver, "amount": amount}
+        operations.append(Operation(time, kind, params))
+    return operations
@@ -8,4 +8,7 @@ setup(
     install_requires=[
         'tk==0.1.0',
     ],
+    extras_require={
+        'numpy': ['numpy'],  # Векторные агрегаты в хранилище счетов
+    },
 )
@@ -0,0 +1,162 @@
+# tests/test_account_store.py
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from core.account_store import create_user_store
+from core.central_bank import CentralBank
+
+def _users(count):
+    return [{
+        "user_id": f"FL{i:06d}",
+        "user_type": "Физическое лицо",
+        "cash_balance": 10000,
+        "digital_wallet_status": "Закрыт" if i % 2 else "Открыт",
+        "offline_wallet_status": "Закрыт",
+        "digital_balance": float(i),
+        "offline_balance": 0,
+        "offline_activation_time": None
+    } for i in range(count)]
+
+def test_records_behave_like_dicts():
+    """Записи хранилища читаются и изменяются как словари"""
+    store = create_user_store()
+    store.add_accounts(_users(3))
+
+    user = store["FL000001"]
+    user["digital_balance"] -= 0.5
+    user["offline_wallet_status"] = "Открыт"
+
+    assert store["FL000001"]["digital_balance"] == 0.5
+    assert user.to_dict()["offline_wallet_status"] == "Открыт"
+    assert user["offline_activation_time"] is None
+    assert "name" not in user
+
+def test_bulk_aggregates():
+    """Массовые операции над колонками"""
+    store = create_user_store()
+    store.add_accounts(_users(10))
+
+    assert store.total("digital_balance") == sum(range(10))
+    store.credit_all("digital_balance", 1.0)
+    assert store.total("digital_balance") == sum(range(10)) + 10
+
+    counts, edges = store.histogram("digital_balance", bins=5)
+    assert sum(counts) == 10 and len(edges) == 6
+    assert store.count_by("digital_wallet_status") == {"Открыт": 5, "Закрыт": 5}
+
+def test_delete_keeps_store_dense():
+    """Удаление счета переносит последнюю строку на его место"""
+    store = create_user_store()
+    store.add_accounts(_users(3))
+    del store["FL000000"]
+
+    assert len(store) == 2
+    assert store["FL000002"]["digital_balance"] == 2.0
+    assert store.index_of("FL000002") == 0
+    with pytest.raises(ValueError):
+        store.add_accounts(_users(2))
+
+def test_reads_stay_consistent_during_structural_changes():
+    """Чтение поля не видит строку, перенесенную удалением другого счета"""
+    store = create_user_store()
+    store.add_accounts(_users(50))
+    stop = threading.Event()
+
+    def churn():
+        i = 0
+        while not stop.is_set():
+            victim = f"FL{i % 50:06d}"
+            record = store[victim].to_dict()
+            del store[victim]
+            store[victim] = record
+            i += 1
+
+    # Частое переключение потоков, чтобы гонка проявлялась без блокировки
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    worker = threading.Thread(target=churn)
+    worker.start()
+    try:
+        for i in range(100000):
+            account_id = f"FL{i % 50:06d}"
+            try:
+                balance = store.get_field(account_id, "digital_balance")
+            except KeyError:
+                continue  # счет удален и еще не добавлен обратно
+            assert balance == float(i % 50)
+    finally:
+        stop.set()
+        worker.join()
+        sys.setswitchinterval(interval)
+    assert len(store) == 50
+
+def test_field_access_does_not_take_store_lock():
+    """Чтение и запись поля не ждут структурной блокировки хранилища"""
+    store = create_user_store()
+    store.add_accounts(_users(2))
+    done = threading.Event()
+
+    def access():
+        store["FL000001"]["digital_balance"] += 1.0
+        done.set()
+
+    with store.lock:
+        worker = threading.Thread(target=access)
+        worker.start()
+        assert done.wait(5)
+    worker.join()
+    assert store["FL000001"]["digital_balance"] == 2.0
+
+def test_writes_stay_on_their_row_during_structural_changes():
+    """Запись поля не попадает в чужую строку, когда удаление переносит строку счета"""
+    store = create_user_store()
+    store.add_accounts(_users(4))
+    # Удаление одного из двух последних счетов переносит на его место другой
+    markers = {"FL000002": 1.0, "FL000003": 2.0}
+    stop = threading.Event()
+    errors = []
+
+    def write():
+        while not stop.is_set():
+            for account_id, marker in markers.items():
+                try:
+                    store.set_field(account_id, "offline_balance", marker)
+                except KeyError:
+                    pass  # счет удален и еще не добавлен обратно
+                except Exception as error:
+                    errors.append(error)
+                    return
+
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    worker = threading.Thread(target=write)
+    worker.start()
+    try:
+        for i in range(5000):
+            victim = list(markers)[i % 2]
+            record = store[victim].to_dict()
+            del store[victim]
+            record["offline_balance"] = 0
+            store[victim] = record
+            for account_id, marker in markers.items():
+                assert store.get_field(account_id, "offline_balance") in (0, marker)
+    finally:
+        stop.set()
+        worker.join()
+        sys.setswitchinterval(interval)
+    assert errors == []
+    assert store.get_field("FL000000", "offline_balance") == 0
+    assert store.get_field("FL000001", "offline_balance") == 0
+
+def test_central_bank_uses_account_store():
+    """CentralBank хранит банки и пользователей в колонках"""
+    cb = CentralBank()
+    user_id = cb.register_user("physical")["user_id"]
+
+    assert cb.users[user_id]["cash_balance"] == 10000
+    assert cb.get_all_users()[0]["user_id"] == user_id
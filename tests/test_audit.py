@@ -0,0 +1,76 @@
+# tests/test_audit.py
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from core.audit import AuditSink
+from core.central_bank import CentralBank
+
+def test_records_read_back_in_order_across_rotation(tmp_path):
+    """Записи читаются в порядке добавления, в том числе из архивных файлов"""
+    path = str(tmp_path / "audit.ndjson")
+    with AuditSink(path, max_bytes=2000, backup_count=20, queue_size=16) as sink:
+        for i in range(300):
+            sink.append({"type": "transfer", "seq": i})
+        records = list(sink.read())
+
+        assert [record["seq"] for record in records] == list(range(300))
+        assert sink.rotations > 0
+        assert all(Path(f).stat().st_size <= 2000 for f in sink.files())
+
+def test_old_backups_are_dropped(tmp_path):
+    path = str(tmp_path / "audit.ndjson")
+    with AuditSink(path, max_bytes=500, backup_count=2) as sink:
+        for i in range(200):
+            sink.append({"seq": i})
+        sink.flush()
+        assert len(sink.files()) == 3
+        records = list(sink.read())
+    assert records[-1]["seq"] == 199 and records[0]["seq"] > 0
+
+def test_concurrent_writers_with_backpressure(tmp_path):
+    """Ограниченная очередь не теряет записи при одновременных писателях"""
+    path = str(tmp_path / "audit.ndjson")
+    with AuditSink(path, queue_size=4) as sink:
+        def writer(n):
+            for i in range(500):
+                sink.append({"writer": n, "seq": i})
+        threads = [threading.Thread(target=writer, args=(n,)) for n in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert sum(1 for _ in sink.read()) == 2000
+
+def test_writer_error_is_reported(tmp_path):
+    """Ошибка потока записи не подвешивает flush и выбрасывается вызывающему"""
+    sink = AuditSink(str(tmp_path / "audit.ndjson"), max_bytes=100, queue_size=4)
+
+    def failing_rotate():
+        raise OSError("disk full")
+
+    sink._rotate = failing_rotate
+    with pytest.raises(OSError, match="disk full"):
+        for i in range(100):
+            sink.append({"seq": i, "padding": "x" * 50})
+        sink.flush(timeout=5)
+    with pytest.raises(OSError):
+        sink.append({"seq": -1})
+    with pytest.raises(OSError):
+        sink.flush(timeout=5)
+    with pytest.raises(OSError):
+        sink.close()
+
+def test_central_bank_writes_audit_file(tmp_path):
+    central_bank = CentralBank(audit_path=str(tmp_path / "audit.ndjson"))
+    bank_id = central_bank.register_bank({"name": "Bank", "bic": "044525000"})["bank_id"]
+    central_bank.banks[bank_id]["status"] = "active"
+    central_bank.process_emission(bank_id, 100.0, "credit")
+
+    events = [record["type"] for record in central_bank.audit_log]
+    assert events == ["bank_registration", "emission"]
+    central_bank.close()
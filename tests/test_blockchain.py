@@ -0,0 +1,111 @@
+# tests/test_blockchain.py
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import threading
+
+import pytest
+
+from core.blockchain.blockchain import Blockchain
+from core.central_bank import CentralBank
+from core.utils.exceptions import DigitalRubleError
+
+def _add_emission(blockchain):
+    blockchain.add_transaction("CENTRAL_BANK", "BANK1", 1000, "emission")
+
+def test_hotstuff_block_production():
+    """Блоки финализируются сертификатом кворума без proof-of-work"""
+    blockchain = Blockchain(consensus="hotstuff")
+    _add_emission(blockchain)
+    block = blockchain.mine_block()
+
+    assert block.nonce == 0
+    assert block.qc["block_hash"] == block.compute_hash()
+    assert blockchain.validate_chain()
+    assert blockchain.get_blockchain_info()["consensus"] == "hotstuff"
+
+def test_hotstuff_rejects_forged_qc():
+    """Подмена транзакций в финализированном блоке обнаруживается"""
+    blockchain = Blockchain(consensus="hotstuff")
+    _add_emission(blockchain)
+    block = blockchain.mine_block()
+    block.transactions[0]["amount"] = 10 ** 9
+
+    assert not blockchain.validate_chain()
+
+def test_hotstuff_without_quorum_discards_emission():
+    """Без кворума блок не добавляется, а эмиссия убирается из очереди и не зачисляется"""
+    bank = CentralBank()
+    bank_id = bank.register_bank({"name": "Bank", "bic": "000000001"})["bank_id"]
+    bank.banks[bank_id]["status"] = "active"
+    blockchain = bank.blockchain
+    blockchain.cluster.faulty.update(["node2", "node3"])
+
+    with pytest.raises(DigitalRubleError):
+        bank.process_emission(bank_id, 1000, "test")
+    assert len(blockchain.chain) == 1
+    assert all(tx["transaction_type"] != "emission" for tx in blockchain.current_transactions)
+    assert [tx["transaction_type"] for tx in blockchain.current_transactions] == ["bank_registration"]
+    assert bank.banks[bank_id]["balance"] == 0
+    assert bank.total_emitted == 0
+
+def test_hotstuff_recovers_after_failed_round():
+    """После раунда без кворума узлы переходят в новый вид и снова финализируют блоки"""
+    blockchain = Blockchain(consensus="hotstuff")
+    blockchain.cluster.faulty.update(["node2", "node3"])
+    _add_emission(blockchain)
+    assert blockchain.mine_block() is None
+
+    # Пока неисправны два узла из четырех, кворум для смены вида тоже не набирается
+    assert blockchain.mine_block() is None
+    assert blockchain.cluster.view_change_pending
+
+    blockchain.cluster.faulty.clear()
+    blockchain.add_transaction("BANK1", "BANK2", 10, "transfer")
+    block = blockchain.mine_block()
+
+    assert block is not None
+    assert [tx["transaction_type"] for tx in block.transactions] == ["emission", "transfer"]
+    assert blockchain.cluster.leader.consensus.view == 1
+    assert blockchain.validate_chain()
+
+    _add_emission(blockchain)
+    assert blockchain.mine_block().index == 2
+
+def test_pow_mode():
+    """Режим proof-of-work остается доступен"""
+    blockchain = Blockchain(consensus="pow")
+    _add_emission(blockchain)
+    block = blockchain.mine_block()
+
+    assert block.compute_hash().startswith("0" * blockchain.difficulty)
+    assert block.qc is None
+    assert blockchain.validate_chain()
+
+def test_discard_keeps_concurrently_added_transactions():
+    """Удаление из очереди не теряет транзакции, добавленные другим потоком во время просмотра"""
+    blockchain = Blockchain(consensus="pow")
+    producers = []
+
+    class ProducerOnScan(dict):
+        """Метаданные, которые во время просмотра очереди запускают параллельного производителя"""
+
+        def get(self, key, default=None):
+            if not producers:
+                producer = threading.Thread(target=blockchain.add_transaction,
+                                            args=("A", "B", 1.0, "transfer", {"transaction_id": "TX-LATE"}))
+                producers.append(producer)
+                producer.start()
+                producer.join(timeout=0.2)
+            return super().get(key, default)
+
+    blockchain.add_transaction("CB", "BANK", 1.0, "emission", ProducerOnScan(transaction_id="EM1"))
+    pool = blockchain.current_transactions
+    blockchain.discard_transactions(["EM1"])
+    producers[0].join()
+
+    # Очередь чистится на месте: список не подменяется между просмотром и присваиванием
+    assert blockchain.current_transactions is pool
+    assert [tx["metadata"]["transaction_id"] for tx in blockchain.current_transactions] == ["TX-LATE"]
@@ -0,0 +1,83 @@
+# tests/test_emission_batcher.py
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from core.central_bank import CentralBank
+from core.emission_batcher import EmissionBatcher
+from core.utils.exceptions import DigitalRubleError, ValidationError
+
+def _bank_with_active_banks(count):
+    central_bank = CentralBank()
+    bank_ids = []
+    for i in range(count):
+        bank_id = central_bank.register_bank({"name": f"Bank {i}", "bic": f"04452{i:04d}"})["bank_id"]
+        central_bank.banks[bank_id]["status"] = "active"
+        bank_ids.append(bank_id)
+    return central_bank, bank_ids
+
+def test_emissions_share_one_block():
+    """Пачка эмиссий проводится одним блоком, каждый Future получает свой ID"""
+    central_bank, bank_ids = _bank_with_active_banks(2)
+    central_bank._emission_batcher = EmissionBatcher(central_bank, batch_size=10, batch_window=5.0)
+    chain_length = len(central_bank.blockchain.chain)
+
+    futures = [central_bank.submit_emission(bank_ids[i % 2], 100.0, "credit") for i in range(10)]
+    transaction_ids = [future.result(timeout=5) for future in futures]
+
+    assert len(set(transaction_ids)) == 10
+    assert len(central_bank.blockchain.chain) == chain_length + 1
+    assert central_bank.banks[bank_ids[0]]["balance"] == 500.0
+    assert central_bank.total_emitted == 1000.0
+    assert central_bank.blockchain.validate_chain()
+    central_bank.close()
+
+def test_time_window_cuts_partial_batch():
+    """Неполная пачка проводится по истечении окна ожидания"""
+    central_bank, bank_ids = _bank_with_active_banks(1)
+    central_bank._emission_batcher = EmissionBatcher(central_bank, batch_size=100, batch_window=0.01)
+
+    future = central_bank.submit_emission(bank_ids[0], 50.0, "credit")
+    assert future.result(timeout=5).startswith("TX")
+    assert central_bank.emission_batcher.blocks_settled == 1
+    central_bank.close()
+
+def test_invalid_emission_rejected_on_submit():
+    central_bank, bank_ids = _bank_with_active_banks(1)
+    with pytest.raises(ValidationError):
+        central_bank.submit_emission(bank_ids[0], -1, "credit")
+
+def test_failed_block_fails_every_future():
+    """Без кворума все эмиссии пачки завершаются ошибкой и не зачисляются"""
+    central_bank, bank_ids = _bank_with_active_banks(1)
+    central_bank.blockchain.cluster.faulty.update(["node2", "node3"])
+    batcher = EmissionBatcher(central_bank, batch_size=100, batch_window=60.0)
+    central_bank._emission_batcher = batcher
+
+    futures = [central_bank.submit_emission(bank_ids[0], 10.0, "credit") for _ in range(3)]
+    batcher.close()
+
+    for future in futures:
+        with pytest.raises(DigitalRubleError):
+            future.result(timeout=5)
+    assert central_bank.banks[bank_ids[0]]["balance"] == 0.0
+    assert all(tx["transaction_type"] != "emission" for tx in central_bank.blockchain.current_transactions)
+
+def test_transactions_added_during_finalization_stay_pending():
+    """Транзакции, поставленные в очередь во время финализации блока, ждут следующего блока"""
+    central_bank, bank_ids = _bank_with_active_banks(1)
+    blockchain = central_bank.blockchain
+    finalize = blockchain.finalize_block
+
+    def finalize_with_concurrent_producer(block):
+        blockchain.add_transaction("USER1", "USER2", 5.0, "transfer", {"transaction_id": "TX-LATE"})
+        return finalize(block)
+
+    blockchain.finalize_block = finalize_with_concurrent_producer
+    central_bank.settle_emissions([(bank_ids[0], 10.0, "credit")])
+
+    assert [tx["metadata"].get("transaction_id") for tx in blockchain.current_transactions] == ["TX-LATE"]
+    central_bank.close()
@@ -0,0 +1,98 @@
+# tests/test_event_sourcing.py
+import math
+import random
+import sys
+import threading
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from core import event_sourcing
+from core.central_bank import CentralBank
+from core.event_sourcing import LedgerReplayer, diff_state, exact_partials
+
+def _busy_bank(seed=7):
+    rng = random.Random(seed)
+    central_bank = CentralBank()
+    bank_ids = []
+    for i in range(2):
+        bank_id = central_bank.register_bank({"name": f"Bank {i}", "bic": f"04452500{i}"})["bank_id"]
+        central_bank.banks[bank_id]["status"] = "active"
+        central_bank.process_emission(bank_id, 10_000.0, "credit")
+        bank_ids.append(bank_id)
+    user_ids = [central_bank.register_user("Физическое лицо")["user_id"] for _ in range(6)]
+    for user_id in user_ids:
+        central_bank.transfer(rng.choice(bank_ids), user_id, 1000.0)
+        central_bank.fund_offline_wallet(user_id, 200.0)
+    for _ in range(40):
+        sender, receiver = rng.sample(user_ids, 2)
+        central_bank.transfer(sender, receiver, round(rng.uniform(1, 50), 2))
+    for user_id in user_ids[:3]:
+        central_bank.submit_offline_transaction(user_id, user_ids[-1], 30.0)
+    central_bank.blockchain.mine_block()
+    central_bank.reconcile_offline()
+    return central_bank
+
+def test_rebuild_matches_live_balances():
+    """Состояние, восстановленное из цепочки, совпадает с живыми балансами"""
+    central_bank = _busy_bank()
+    state = central_bank.replay_ledger()
+
+    assert diff_state(central_bank, state) == []
+    assert state["total_emitted"] == central_bank.total_emitted
+
+def test_parallel_replay_equals_sequential(monkeypatch):
+    """Параллельное воспроизведение по разделам счетов дает тот же результат"""
+    monkeypatch.setattr(event_sourcing.os, "cpu_count", lambda: 3)  # пул и на одноядерной машине
+    central_bank = _busy_bank()
+    chain = central_bank.blockchain.chain
+
+    field_of = event_sourcing.UserFields(central_bank.users)
+
+    sequential = LedgerReplayer(partitions=1).replay_chain(chain, field_of)
+    parallel = LedgerReplayer(partitions=3, parallel_threshold=0).replay_chain(chain, field_of)
+    assert parallel == sequential
+
+def test_pool_does_not_fork_threaded_process(monkeypatch):
+    """Пока работают другие потоки, пул запускается без fork и дает тот же результат"""
+    monkeypatch.setattr(event_sourcing.os, "cpu_count", lambda: 2)
+    central_bank = _busy_bank()
+    chain = central_bank.blockchain.chain
+    field_of = event_sourcing.UserFields(central_bank.users)
+    stop = threading.Event()
+    worker = threading.Thread(target=stop.wait)
+    worker.start()
+    try:
+        assert event_sourcing._pool_context().get_start_method() != "fork"
+        parallel = LedgerReplayer(partitions=2, parallel_threshold=0).replay_chain(chain, field_of)
+    finally:
+        stop.set()
+        worker.join()
+    assert parallel == LedgerReplayer(partitions=1).replay_chain(chain, field_of)
+
+def test_partitions_own_disjoint_accounts():
+    """Каждый счет суммируется ровно в одном разделе"""
+    central_bank = _busy_bank()
+    transactions = [tx for block in central_bank.blockchain.chain for tx in block.transactions]
+    replayer = LedgerReplayer(partitions=3)
+
+    owned = [set(event_sourcing.aggregate(part, partition=(index, 3))[0])
+             for index, part in enumerate(replayer.split(transactions))]
+    keys = [key for part in owned for key in part]
+    assert len(keys) == len(set(keys)) == len(event_sourcing.aggregate(transactions)[0])
+
+def test_tampered_balance_detected():
+    central_bank = _busy_bank()
+    user_id = next(iter(central_bank.users))
+    central_bank.users[user_id]["digital_balance"] += 1.0
+
+    mismatches = diff_state(central_bank, central_bank.replay_ledger())
+    assert [(m["account_id"], m["field"]) for m in mismatches] == [(user_id, "digital_balance")]
+
+def test_range_partials_merge_exactly():
+    """Частичные суммы диапазонов сливаются в ту же сумму, что и все значения сразу"""
+    rng = random.Random(3)
+    values = [rng.uniform(-1e9, 1e9) * 10 ** rng.randint(-8, 8) for _ in range(3000)]
+    partials = [p for start in range(0, len(values), 700) for p in exact_partials(values[start:start + 700])]
+
+    assert math.fsum(partials) == math.fsum(values)
@@ -0,0 +1,89 @@
+# tests/test_expiry.py
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config import WALLET_CONFIG
+from core.central_bank import CentralBank
+from core.expiry import ExpiryScheduler
+from core.simulation import Simulator
+from core.utils.clock import VirtualClock
+from core.utils.exceptions import ValidationError
+from core.wallet import Wallet
+
+DAY = 24 * 3600
+
+def test_keys_fire_once_in_batches_never_early():
+    batches = []
+    scheduler = ExpiryScheduler(batches.append, resolution=1.0, clock=VirtualClock(0.0))
+    scheduler.schedule_many((f"W{i}", 10.5 + i % 3) for i in range(9))
+
+    assert scheduler.advance(10.9) == []
+    assert sorted(scheduler.advance(11.0)) == ["W0", "W3", "W6"]
+    assert sorted(scheduler.advance(20.0)) == ["W1", "W2", "W4", "W5", "W7", "W8"]
+    assert scheduler.advance(100.0) == []
+    assert [len(batch) for batch in batches] == [3, 6]
+    assert len(scheduler) == 0
+
+def test_cancel_and_reschedule():
+    scheduler = ExpiryScheduler(resolution=1.0)
+    scheduler.schedule("A", 5.0)
+    scheduler.schedule("B", 5.0)
+    scheduler.schedule("C", 5.0)
+    assert scheduler.cancel("B") and not scheduler.cancel("B")
+    scheduler.schedule("C", 50.0)
+
+    assert scheduler.deadline_of("C") == 50.0
+    assert scheduler.next_due() == 5.0
+    assert scheduler.advance(6.0) == ["A"]
+    assert scheduler.next_due() == 50.0
+    assert scheduler.advance(50.0) == ["C"]
+    assert scheduler.next_due() is None
+
+def test_expiry_cost_follows_expiring_keys():
+    scheduler = ExpiryScheduler(resolution=60.0)
+    scheduler.schedule_many((f"W{i}", 3600.0 + i) for i in range(200_000))
+    expired = scheduler.advance(3600.0 + 120)
+    assert len(expired) == 121 and "W0" in expired
+    assert len(scheduler) == 200_000 - 121
+
+def test_wallet_objects_expire_through_simulation():
+    simulator = Simulator(VirtualClock(1_700_000_000.0))
+    wallets = {}
+    for i in range(50):
+        wallet = Wallet(f"USER{i}", clock=simulator.clock)
+        wallets[wallet.wallet_id] = wallet
+        simulator.clock.advance(3600)
+
+    def close(wallet_ids):
+        for wallet_id in wallet_ids:
+            wallets[wallet_id].expire()
+
+    scheduler = ExpiryScheduler(close, clock=simulator.clock)
+    scheduler.schedule_many((w.wallet_id, w.expiry_time.timestamp()) for w in wallets.values())
+    simulator.every(60, scheduler.advance)
+    simulator.run_for(WALLET_CONFIG['expiry_days'] * DAY - 25 * 3600)
+
+    active = [w for w in wallets.values() if w.is_active]
+    assert len(active) == 24
+    simulator.run_for(3 * DAY)
+    assert not any(w.is_active for w in wallets.values())
+
+def test_central_bank_closes_expired_offline_wallets():
+    clock = VirtualClock(1_700_000_000.0)
+    central_bank = CentralBank(clock=clock)
+    user_ids = [central_bank.register_user("Физическое лицо")["user_id"] for _ in range(3)]
+    for user_id in user_ids[:2]:
+        central_bank.open_offline_wallet(user_id)
+    with pytest.raises(ValidationError):
+        central_bank.open_offline_wallet(user_ids[0])
+
+    clock.advance(WALLET_CONFIG['expiry_days'] * DAY - 10)
+    assert central_bank.expire_offline_wallets() == []
+    clock.advance(20)
+    assert sorted(central_bank.expire_offline_wallets()) == sorted(user_ids[:2])
+    assert [central_bank.users[u]["offline_wallet_status"] for u in user_ids] == ["Закрыт", "Закрыт", "CLOSED"]
+    assert central_bank.audit_log[-1]["type"] == "offline_wallet_expiry"
@@ -0,0 +1,32 @@
+import unittest
+from hotstuff_consensus.benchmark import run_scenario, run_suite, compare_results, percentile
+
+class TestBenchmark(unittest.TestCase):
+    def test_scenario_metrics(self):
+        result = run_scenario(node_count=4, batch_size=10, latency_ms=1.0, rounds=5)
+
+        self.assertEqual(result["committed_blocks"], 5)
+        self.assertEqual(result["committed_tx"], 50)
+        self.assertEqual(result["messages_per_commit"], 6)
+        self.assertGreaterEqual(result["latency_p50_ms"], 2.0)
+        self.assertGreater(result["tps"], 0)
+
+    def test_too_many_faulty_nodes(self):
+        result = run_scenario(node_count=4, batch_size=1, faulty_count=2, rounds=3)
+
+        self.assertEqual(result["committed_blocks"], 0)
+        self.assertIsNone(result["messages_per_commit"])
+
+    def test_compare_detects_regression(self):
+        baseline = run_suite([4], [10], [0.0], [0], rounds=3)
+        current = {"results": [dict(baseline["results"][0], tps=0.0)]}
+
+        regressions = compare_results(current, baseline)
+        self.assertEqual([r["metric"] for r in regressions], ["tps"])
+
+    def test_percentile(self):
+        self.assertEqual(percentile([3, 1, 2, 4], 50), 2)
+        self.assertEqual(percentile([], 99), 0.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,36 +1,37 @@
 import unittest
-from datetime import datetime
 from hotstuff_consensus.block import Block
-from core.transaction import Transaction
 
 class TestBlock(unittest.TestCase):
+    def setUp(self):
+        self.transactions = [
+            {"sender": "user1", "recipient": "user2", "amount": 100},
+            {"sender": "user2", "recipient": "user3", "amount": 200}
+        ]
+
     def test_block_creation(self):
-        tx1 = Transaction("user1", "user2", 100)
-        tx2 = Transaction("user2", "user3", 200)
-        block = Block(1, [tx1, tx2], "genesis")
+        block = Block(1, self.transactions, 1700000000.0, "genesis", "node0")
 
-        self.assertEqual(block.height, 1)
+        self.assertEqual(block.index, 1)
         self.assertEqual(len(block.transactions), 2)
-        self.assertEqual(block.parent_hash, "genesis")
-        self.assertIsInstance(block.timestamp, datetime)
-        self.assertIsNotNone(block.hash)
+        self.assertEqual(block.previous_hash, "genesis")
+        self.assertEqual(block.proposer, "node0")
+        self.assertIsNotNone(block.compute_hash())
 
     def test_block_hash(self):
-        tx = Transaction("user1", "user2", 100)
-        block1 = Block(1, [tx], "genesis")
-        block2 = Block(1, [tx], "genesis")
+        block1 = Block(1, self.transactions, 1700000000.0, "genesis", "node0")
+        block2 = Block(1, self.transactions, 1700000000.0, "genesis", "node0")
 
-        self.assertEqual(block1.hash, block2.hash)
+        self.assertEqual(block1.compute_hash(), block2.compute_hash())
 
     def test_block_to_dict(self):
-        tx = Transaction("user1", "user2", 100)
-        block = Block(1, [tx], "genesis")
+        block = Block(1, self.transactions[:1], 1700000000.0, "genesis", "node0")
         block_dict = block.to_dict()
 
-        self.assertEqual(block_dict['height'], 1)
+        self.assertEqual(block_dict['index'], 1)
         self.assertEqual(len(block_dict['transactions']), 1)
-        self.assertEqual(block_dict['parent_hash'], "genesis")
-        self.assertEqual(block_dict['hash'], block.hash)
+        self.assertEqual(block_dict['previous_hash'], "genesis")
+        self.assertEqual(block_dict['hash'], block.compute_hash())
+        self.assertEqual(Block.from_dict(block_dict).compute_hash(), block.compute_hash())
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,50 @@
+import unittest
+from hotstuff_consensus.block_cache import BlockCache
+
+def make_block(index, name):
+    return {"index": index, "hash": f"{name}{index}", "transactions": []}
+
+class TestBlockCache(unittest.TestCase):
+    def test_uncommitted_blocks_are_pinned(self):
+        cache = BlockCache(capacity=2)
+        for i in range(1, 5):
+            cache.add(make_block(i, "a"))
+
+        self.assertEqual(len(cache), 4)
+        self.assertEqual(cache.pinned_count, 4)
+
+    def test_commit_hands_off_and_evicts(self):
+        stored = []
+        cache = BlockCache(capacity=2, on_commit=stored.append)
+        for i in range(1, 5):
+            cache.add(make_block(i, "a"))
+            cache.commit(f"a{i}")
+
+        self.assertEqual([b["index"] for b in stored], [1, 2, 3, 4])
+        self.assertEqual(len(cache), 2)
+        self.assertNotIn("a1", cache)
+        self.assertIn("a4", cache)
+
+    def test_orphaned_blocks_become_evictable(self):
+        cache = BlockCache(capacity=1)
+        cache.add(make_block(1, "a"))
+        cache.add(make_block(1, "b"))
+        cache.add(make_block(2, "a"))
+        cache.commit("a1")
+
+        self.assertNotIn("b1", cache)
+        self.assertIn("a2", cache)
+        self.assertEqual(cache.pinned_count, 1)
+
+    def test_locked_block_survives_commit_of_sibling(self):
+        cache = BlockCache(capacity=0)
+        cache.add(make_block(1, "a"))
+        cache.add(make_block(1, "b"))
+        cache.lock("b1")
+        cache.commit("a1")
+
+        self.assertIn("b1", cache)
+        self.assertNotIn("a1", cache)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import json
+import unittest
+from core.utils.clock import VirtualClock
+from hotstuff_consensus.cluster import LocalCluster
+from hotstuff_consensus.dissemination import DisseminationLayer
+
+def make_batch(start, memo_size):
+    return [{"sender": "user1", "recipient": "user2", "amount": i, "memo": "x" * memo_size}
+            for i in range(start, start + 10)]
+
+class TestDissemination(unittest.TestCase):
+    def setUp(self):
+        self.clock = VirtualClock(1700000000.0)
+        self.layer = DisseminationLayer(worker_count=4, clock=self.clock)
+        self.cluster = LocalCluster(4)
+
+    def test_proposal_size_does_not_depend_on_payload(self):
+        sizes = []
+        for memo_size in (10, 10000):
+            self.layer.broadcast(make_batch(0, memo_size))
+            block = self.layer.next_block(1, "0", self.cluster.leader_id)
+            sizes.append(len(json.dumps(block["transactions"])))
+
+        self.assertEqual(sizes[0], sizes[1])
+
+    def test_block_time_comes_from_clock(self):
+        self.layer.broadcast(make_batch(0, 5))
+        self.clock.advance(2.5)
+        block = self.layer.next_block(1, "0", self.cluster.leader_id)
+        self.assertEqual(block["timestamp"], 1700000002.5)
+
+    def test_ordered_digests_resolve_to_transactions(self):
+        batches = [make_batch(i * 10, 5) for i in range(3)]
+        for batch in batches:
+            self.assertIsNotNone(self.layer.broadcast(batch))
+
+        result = self.layer.order(self.cluster, 1, "0")
+        self.assertEqual(result["status"], "success")
+        self.assertEqual(self.layer.resolve(result["block"]), [tx for b in batches for tx in b])
+
+    def test_batch_without_quorum_is_not_certified(self):
+        layer = DisseminationLayer(worker_count=4, faulty_count=2)
+
+        self.assertIsNone(layer.broadcast(make_batch(0, 5)))
+        self.assertIsNone(layer.next_block(1, "0", "node0"))
+
+    def test_forged_certificate_is_rejected(self):
+        certificate = self.layer.broadcast(make_batch(0, 5))
+        forged = dict(certificate, digest="0" * 64)
+
+        self.assertFalse(self.layer.verify_availability(forged))
+
+    def test_invalid_block_requeues_available_batches(self):
+        first = self.layer.broadcast(make_batch(0, 5))
+        self.layer.certified.append(dict(first, digest="0" * 64))
+        last = self.layer.broadcast(make_batch(10, 5))
+
+        result = self.layer.order(self.cluster, 1, "0")
+        self.assertEqual(result["status"], "error")
+        self.assertEqual(result["dropped"], ["0" * 64])
+        self.assertEqual(list(self.layer.certified), [first, last])
+
+        result = self.layer.order(self.cluster, 1, "0")
+        self.assertEqual(result["status"], "success")
+        self.assertEqual(len(self.layer.resolve(result["block"])), 20)
+
+if __name__ == '__main__':
+    unittest.main()
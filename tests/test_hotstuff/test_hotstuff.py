@@ -1,47 +1,59 @@
 import unittest
-from hotstuff_consensus.hotstuff import HotStuff
-from hotstuff_consensus.node import Node
+from hotstuff_consensus.hotstuff import HotStuffConsensus
 from hotstuff_consensus.block import Block
-from core.transaction import Transaction
 
 class TestHotStuff(unittest.TestCase):
     def setUp(self):
-        self.nodes = [Node(i, is_leader=(i==0)) for i in range(4)]
-        self.hotstuff = HotStuff(self.nodes)
+        self.hotstuff = HotStuffConsensus("node0")
+        for i in range(4):
+            self.hotstuff.add_node(f"node{i}")
+        self.hotstuff.set_leader("node0")
+        self.block = Block(1, [{"sender": "user1", "recipient": "user2", "amount": 100}],
+                           1700000000.0, "genesis", "node0").to_dict()
 
     def test_initial_state(self):
         self.assertEqual(len(self.hotstuff.nodes), 4)
-        self.assertEqual(self.hotstuff.current_leader, 0)
-        self.assertEqual(len(self.hotstuff.blockchain), 0)
+        self.assertEqual(self.hotstuff.leader, "node0")
+        self.assertEqual(self.hotstuff.quorum, 3)
 
-    def test_leader_rotation(self):
-        initial_leader = self.hotstuff.current_leader
-        new_leader = self.hotstuff.rotate_leader()
-        self.assertNotEqual(initial_leader, new_leader)
-        self.assertEqual(new_leader, 1)
+    def test_only_leader_proposes(self):
+        follower = HotStuffConsensus("node1")
+        follower.add_node("node0")
+        follower.add_node("node1")
+        follower.set_leader("node0")
+
+        result = follower.propose(self.block)
+        self.assertEqual(result["status"], "error")
 
     def test_propose_block(self):
-        tx = Transaction("user1", "user2", 100)
-        block = Block(1, [tx], "genesis")
-        self.hotstuff.propose_block(block)
+        result = self.hotstuff.propose(self.block)
 
-        self.assertEqual(len(self.hotstuff.pending_blocks), 1)
-        self.assertEqual(self.hotstuff.pending_blocks[0].hash, block.hash)
+        self.assertEqual(result["status"], "success")
+        self.assertEqual(self.hotstuff.proposed_block["hash"], self.block["hash"])
 
     def test_commit_block(self):
-        tx = Transaction("user1", "user2", 100)
-        block = Block(1, [tx], "genesis")
-        self.hotstuff.propose_block(block)
-
-        # Симулируем голосование
-        for node in self.nodes:
-            node.vote(block)
-
-        result = self.hotstuff.commit_block(block)
-        self.assertTrue(result)
-        self.assertEqual(len(self.hotstuff.blockchain), 1)
-        self.assertEqual(self.hotstuff.blockchain[0].hash, block.hash)
-        self.assertNotEqual(self.hotstuff.current_leader, 0)  # Лидер должен поменяться
+        self.hotstuff.propose(self.block)
+
+        results = [self.hotstuff.vote(self.block["hash"], f"node{i}", self._signature(f"node{i}"))
+                   for i in range(1, 3)]
+        results.append(self.hotstuff.vote(self.block["hash"], "node0"))
+        self.assertEqual(results[0]["status"], "pending")
+        self.assertEqual(results[-1]["status"], "success")
+
+    def _signature(self, node_id):
+        return self.hotstuff.validators.sign(node_id, self.block["hash"], self.hotstuff.view)
+
+    def test_unsigned_vote_from_other_node_is_rejected(self):
+        self.hotstuff.propose(self.block)
+
+        for i in range(1, 4):
+            result = self.hotstuff.vote(self.block["hash"], f"node{i}")
+            self.assertEqual(result["status"], "error")
+        self.assertEqual(self.hotstuff.votes[self.block["hash"]], set())
+
+    def test_vote_unknown_block(self):
+        result = self.hotstuff.vote("unknown", "node1")
+        self.assertEqual(result["status"], "error")
 
 if __name__ == '__main__':
     unittest.main()
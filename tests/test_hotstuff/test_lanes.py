@@ -0,0 +1,68 @@
+import sys
+import unittest
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+from core.blockchain.blockchain import Blockchain
+from core.utils.clock import VirtualClock
+from hotstuff_consensus.lanes import ConsensusLanes
+
+class TestConsensusLanes(unittest.TestCase):
+    def setUp(self):
+        self.clock = VirtualClock(1700000000.0)
+        self.lanes = ConsensusLanes(lane_count=3, nodes_per_lane=4, batch_size=5, clock=self.clock)
+        self.transactions = [
+            {"sender": f"BANK{i % 7}", "recipient": "CB", "amount": i} for i in range(40)
+        ]
+        for tx in self.transactions:
+            self.lanes.submit(tx)
+
+    def test_sender_stays_on_one_lane(self):
+        lanes = {self.lanes.lane_for(tx["sender"]) for tx in self.transactions if tx["sender"] == "BANK3"}
+        self.assertEqual(len(lanes), 1)
+
+    def test_merge_is_deterministic(self):
+        outputs = self.lanes.commit_round()
+        self.assertEqual({o["block"]["timestamp"] for o in outputs}, {self.clock.time()})
+
+        self.assertEqual(outputs, ConsensusLanes.merge(list(reversed(outputs))))
+        self.assertEqual([o["lane"] for o in outputs], sorted(o["lane"] for o in outputs))
+
+    def test_all_transactions_reach_global_ledger(self):
+        blockchain = Blockchain(consensus="hotstuff", lane_verifier=self.lanes.verify_certificates)
+        while self.lanes.pending_count():
+            self.lanes.merge_into(blockchain, self.lanes.commit_round())
+
+        committed = [tx for block in blockchain.chain for tx in block.transactions]
+        self.assertEqual(sorted(tx["amount"] for tx in committed), list(range(40)))
+        for sender in {tx["sender"] for tx in self.transactions}:
+            amounts = [tx["amount"] for tx in committed if tx["sender"] == sender]
+            self.assertEqual(amounts, sorted(amounts))
+        self.assertTrue(blockchain.validate_chain())
+
+        blockchain.chain[-1].qc["lanes"][0]["qc"]["signature"] = "00" * 32
+        self.assertFalse(blockchain.validate_chain())
+
+    def test_merge_requires_lane_verifier(self):
+        with self.assertRaises(ValueError):
+            self.lanes.merge_into(Blockchain(consensus="hotstuff"), self.lanes.commit_round())
+
+    def test_tampered_merged_transactions_are_rejected(self):
+        blockchain = Blockchain(consensus="hotstuff", lane_verifier=self.lanes.verify_certificates)
+        self.lanes.merge_into(blockchain, self.lanes.commit_round())
+        self.assertTrue(blockchain.validate_chain())
+
+        transactions = blockchain.chain[-1].transactions
+        amount = transactions[0]["amount"]
+        transactions[0]["amount"] = 10 ** 9
+        self.assertFalse(blockchain.validate_chain())
+
+        # Перестановка транзакций между блоками линий тоже меняет их хэши
+        transactions[0]["amount"] = amount
+        self.assertTrue(blockchain.validate_chain())
+        transactions[0], transactions[-1] = transactions[-1], transactions[0]
+        self.assertFalse(blockchain.validate_chain())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,38 +1,66 @@
 import unittest
-from hotstuff_consensus.node import Node
+from hotstuff_consensus.node import HotStuffNode
 from hotstuff_consensus.block import Block
-from core.transaction import Transaction
 
 class TestNode(unittest.TestCase):
     def setUp(self):
-        self.node = Node(0, is_leader=True)
-        self.tx = Transaction("user1", "user2", 100)
-        self.block = Block(1, [self.tx], "genesis")
+        self.node = HotStuffNode("node0")
+        for i in range(4):
+            self.node.consensus.add_node(f"node{i}")
+        self.node.consensus.set_leader("node0")
+        self.block = Block(1, [{"sender": "user1", "recipient": "user2", "amount": 100}],
+                           1700000000.0, "genesis", "node0").to_dict()
 
     def test_node_creation(self):
-        self.assertEqual(self.node.node_id, 0)
-        self.assertTrue(self.node.is_leader)
-        self.assertIsNone(self.node.current_block)
+        self.assertEqual(self.node.node_id, "node0")
+        self.assertEqual(self.node.get_status()["received_blocks"], 0)
 
     def test_receive_proposal(self):
-        self.node.receive_proposal(self.block)
-        self.assertEqual(self.node.current_block.hash, self.block.hash)
+        proposal = self.node.propose_block(self.block)
+        result = self.node.receive_proposal(proposal)
+
+        self.assertEqual(result["status"], "success")
+        self.assertEqual(result["block_hash"], self.block["hash"])
 
     def test_vote(self):
-        self.node.receive_proposal(self.block)
-        result = self.node.vote(self.block)
-        self.assertTrue(result)
+        self.node.receive_proposal(self.node.propose_block(self.block))
+
+        signature = self.node.consensus.validators.sign("node1", self.block["hash"], self.node.consensus.view)
+        result = self.node.receive_vote("node1", self.block["hash"], signature)
+        self.assertEqual(result["status"], "pending")
+        self.assertEqual(self.node.receive_vote("node2", self.block["hash"])["status"], "error")
+
+    def test_committed_chain_is_bounded(self):
+        node = HotStuffNode("node0", sync_window=3)
+        previous_hash = "genesis"
+        for index in range(1, 6):
+            block = Block(index, [], float(index), previous_hash, "node0").to_dict()
+            node.received_blocks.add(block)
+            node.commit_block(block["hash"])
+            previous_hash = block["hash"]
+
+        self.assertEqual([entry["block"]["index"] for entry in node.committed_chain], [3, 4, 5])
+        self.assertEqual(node.committed_tip["index"], 5)
+        self.assertEqual([entry["block"]["index"] for entry in node.get_committed_blocks(4, 10)], [4, 5])
+        self.assertEqual(node.get_committed_blocks(1, 10), [])
 
-        # Проверка повторного голосования
-        result = self.node.vote(self.block)
-        self.assertFalse(result)
+    def test_commit_prunes_vote_state(self):
+        """После коммита голоса и сборщики сертификатов по блоку не хранятся"""
+        self.node.receive_proposal(self.node.propose_block(self.block))
+        view = self.node.consensus.view
+        for voter in ("node0", "node1", "node2"):
+            signature = None if voter == "node0" else \
+                self.node.consensus.validators.sign(voter, self.block["hash"], view)
+            result = self.node.receive_vote(voter, self.block["hash"], signature)
 
-    def test_leader_change(self):
-        self.node.become_follower()
-        self.assertFalse(self.node.is_leader)
+        self.assertEqual(result["status"], "success")
+        self.assertEqual(self.node.consensus.votes, {})
+        self.assertEqual(self.node.consensus.qc_builders, {})
+        self.assertEqual(self.node.consensus.proposal_heights, {})
 
-        self.node.become_leader()
-        self.assertTrue(self.node.is_leader)
+    def test_vote_unknown_block(self):
+        result = self.node.receive_vote("node1", "unknown")
+        self.assertEqual(result["status"], "error")
 
 if __name__ == '__main__':
     unittest.main()
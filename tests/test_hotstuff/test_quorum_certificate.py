@@ -0,0 +1,61 @@
+import unittest
+from hotstuff_consensus.cluster import LocalCluster
+from hotstuff_consensus.block import Block
+from hotstuff_consensus.quorum_certificate import QuorumCertificate
+
+class TestQuorumCertificate(unittest.TestCase):
+    def setUp(self):
+        self.cluster = LocalCluster(7)
+        self.consensus = self.cluster.leader.consensus
+
+    def _commit(self, index, previous_hash="0"):
+        block = Block(index, [], float(index), previous_hash, self.cluster.leader_id).to_dict()
+        result = self.cluster.run_round(block)
+        self.assertEqual(result["status"], "success")
+        return block, QuorumCertificate.from_dict(result["qc"])
+
+    def test_qc_is_compact_and_valid(self):
+        block, qc = self._commit(1)
+
+        self.assertEqual(qc.block_hash, block["hash"])
+        self.assertEqual(qc.signer_count, self.consensus.quorum)
+        self.assertNotIn("votes", qc.to_dict())
+        self.assertTrue(self.consensus.verify_qc(qc))
+
+    def test_tampered_qc_is_rejected(self):
+        _, qc = self._commit(1)
+
+        forged = QuorumCertificate(qc.block_hash, qc.view, qc.signers, bytes(len(qc.signature)))
+        self.assertFalse(self.consensus.verify_qc(forged))
+        too_few = QuorumCertificate(qc.block_hash, qc.view, 1, qc.signature)
+        self.assertFalse(self.consensus.verify_qc(too_few))
+
+    def test_batch_verification(self):
+        block1, qc1 = self._commit(1)
+        _, qc2 = self._commit(2, block1["hash"])
+
+        self.assertTrue(self.consensus.verify_qcs([qc1, qc2]))
+        swapped = QuorumCertificate(qc2.block_hash, qc2.view, qc2.signers, qc1.signature)
+        self.assertFalse(self.consensus.verify_qcs([qc1, swapped]))
+
+        # Подписи двух верных сертификатов переставлены: XOR пачки тот же, но каждый неверен
+        exchanged = [QuorumCertificate(qc1.block_hash, qc1.view, qc1.signers, qc2.signature),
+                     QuorumCertificate(qc2.block_hash, qc2.view, qc2.signers, qc1.signature)]
+        self.assertFalse(self.consensus.verify_qcs(exchanged))
+
+    def test_qc_attached_to_next_proposal(self):
+        block1, qc1 = self._commit(1)
+        block2 = Block(2, [], 2.0, block1["hash"], self.cluster.leader_id).to_dict()
+
+        proposal = self.consensus.propose(block2)
+        self.assertEqual(proposal["justify"]["block_hash"], qc1.block_hash)
+
+        follower = self.cluster.nodes["node1"]
+        self.assertEqual(follower.receive_proposal(proposal)["status"], "success")
+        self.assertEqual(follower.consensus.locked_block["hash"], block1["hash"])
+
+        proposal["justify"]["signature"] = "00" * 32
+        self.assertEqual(follower.receive_proposal(proposal)["status"], "error")
+
+if __name__ == '__main__':
+    unittest.main()
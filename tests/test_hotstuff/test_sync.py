@@ -0,0 +1,74 @@
+import unittest
+from hotstuff_consensus.cluster import LocalCluster
+from hotstuff_consensus.block import Block
+from hotstuff_consensus.sync import SyncClient, SyncError
+
+class TestSync(unittest.TestCase):
+    def setUp(self):
+        self.cluster = LocalCluster(4)
+        self.previous_hash = "0"
+        self.index = 0
+
+    def _run_rounds(self, count):
+        for _ in range(count):
+            self.index += 1
+            block = Block(self.index, [{"amount": self.index}], float(self.index),
+                          self.previous_hash, self.cluster.leader_id).to_dict()
+            result = self.cluster.run_round(block)
+            self.assertEqual(result["status"], "success")
+            self.previous_hash = block["hash"]
+
+    def test_lagging_node_catches_up_and_rejoins(self):
+        self._run_rounds(2)
+        self.cluster.offline.add("node3")
+        self._run_rounds(10)
+
+        lagging = self.cluster.nodes["node3"]
+        self.assertEqual(lagging.committed_tip["index"], 2)
+
+        peers = [self.cluster.nodes["node0"], self.cluster.nodes["node1"]]
+        stats = SyncClient(lagging, peers, chunk_size=3, max_chunk_bytes=200,
+                           pipeline_depth=2).catch_up()
+
+        self.assertEqual(stats["blocks"], 10)
+        self.assertEqual(stats["height"], 12)
+        self.assertGreater(stats["blocks_per_second"], 0)
+        self.assertEqual(lagging.committed_tip["hash"], self.previous_hash)
+
+        self.cluster.offline.clear()
+        self._run_rounds(1)
+        self.assertEqual(lagging.committed_tip["index"], 13)
+
+    def test_failed_chunk_is_retried_on_another_peer(self):
+        self.cluster.offline.add("node3")
+        self._run_rounds(4)
+
+        # Первый пир отстал и отвечает пустыми отрезками
+        stale = LocalCluster(4).nodes["node0"]
+        served = []
+        peer = self.cluster.nodes["node1"]
+        get_committed_blocks = peer.get_committed_blocks
+
+        def serve(start_height, max_blocks, max_bytes=None):
+            served.append(start_height)
+            return get_committed_blocks(start_height, max_blocks, max_bytes)
+
+        peer.get_committed_blocks = serve
+        stats = SyncClient(self.cluster.nodes["node3"], [stale, peer], chunk_size=1,
+                           pipeline_depth=2).catch_up(target_height=4)
+
+        self.assertEqual(stats["height"], 4)
+        self.assertEqual(sorted(served), [1, 2, 3, 4])
+
+    def test_tampered_chain_is_rejected(self):
+        self.cluster.offline.add("node3")
+        self._run_rounds(3)
+
+        peer = self.cluster.nodes["node0"]
+        peer.committed_chain[1]["qc"] = peer.committed_chain[0]["qc"]
+
+        with self.assertRaises(SyncError):
+            SyncClient(self.cluster.nodes["node3"], [peer]).catch_up()
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+import os
+import tempfile
+import threading
+import unittest
+from unittest import mock
+from hotstuff_consensus.hotstuff import HotStuffConsensus
+from hotstuff_consensus.wal import ConsensusWAL, WALError
+
+class TestConsensusWAL(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "consensus.wal")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _consensus(self, wal):
+        consensus = HotStuffConsensus("node0", wal)
+        for i in range(4):
+            consensus.add_node(f"node{i}")
+        consensus.set_leader("node0")
+        return consensus
+
+    def test_state_survives_restart(self):
+        wal = ConsensusWAL(self.path)
+        consensus = self._consensus(wal)
+        block = {"index": 1, "hash": "h1"}
+        consensus.propose(block)
+        consensus.vote("h1", "node0")
+        for i in range(1, 3):
+            consensus.vote("h1", f"node{i}", consensus.validators.sign(f"node{i}", "h1", consensus.view))
+        wal.close()
+
+        restarted = self._consensus(ConsensusWAL(self.path))
+        self.assertEqual(restarted.locked_block, block)
+        self.assertEqual(restarted.high_qc.block_hash, "h1")
+        self.assertEqual(restarted.last_vote["block"], "h1")
+        self.assertEqual(restarted.cast_vote("h1-conflict", 1)["status"], "error")
+        self.assertEqual(restarted.cast_vote("h2", 2)["status"], "success")
+
+    def test_group_commit_shares_fsync(self):
+        wal = ConsensusWAL(self.path, durability="group")
+        threads = [threading.Thread(target=lambda i=i: [wal.append({"t": "view", "view": i * 100 + j})
+                                                         for j in range(50)])
+                   for i in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        with wal.batch():
+            for j in range(10):
+                wal.append({"t": "view", "view": j})
+        wal.close()
+
+        self.assertEqual(len(list(ConsensusWAL.read(self.path))), 410)
+        self.assertLess(wal.fsync_count, 402)
+
+    def test_fsync_failure_reaches_every_waiter(self):
+        wal = ConsensusWAL(self.path, durability="group")
+        entered, release = threading.Event(), threading.Event()
+
+        def failing_fsync(fd):
+            entered.set()
+            release.wait(5)
+            raise OSError("disk failure")
+
+        errors = []
+
+        def append(view):
+            try:
+                wal.append({"t": "view", "view": view})
+            except WALError as error:
+                errors.append(error)
+
+        with mock.patch("hotstuff_consensus.wal.os.fsync", failing_fsync):
+            first = threading.Thread(target=append, args=(1,))
+            first.start()
+            entered.wait(5)
+            second = threading.Thread(target=append, args=(2,))
+            second.start()
+            while wal._appended_seq < 2:
+                pass
+            with wal._cond:  # второй поток ждет fsync первого
+                release.set()
+            first.join(5)
+            second.join(5)
+
+        self.assertEqual(len(errors), 2)
+        self.assertIsInstance(errors[0].__cause__, OSError)
+        self.assertEqual(wal.fsync_count, 0)
+        self.assertEqual(wal._durable_seq, 0)
+        with self.assertRaises(WALError):
+            wal.append({"t": "view", "view": 3})
+        with self.assertRaises(WALError):
+            wal.close()
+
+    def test_torn_tail_is_truncated(self):
+        with ConsensusWAL(self.path, durability="none") as wal:
+            wal.append({"t": "view", "view": 1})
+            wal.append({"t": "view", "view": 2})
+        with open(self.path, "ab") as f:
+            f.write(b"\x10\x00\x00\x00garbage")
+
+        wal = ConsensusWAL(self.path, durability="async", flush_interval=0.001)
+        wal.append({"t": "view", "view": 3})
+        wal.close()
+        self.assertEqual([r["view"] for r in ConsensusWAL.read(self.path)], [1, 2, 3])
+
+    def test_checkpoint_compacts_log(self):
+        wal = ConsensusWAL(self.path, durability="none")
+        consensus = self._consensus(wal)
+        for height in range(1, 20):
+            consensus.cast_vote(f"h{height}", height)
+        consensus.checkpoint()
+        wal.close()
+
+        records = list(ConsensusWAL.read(self.path))
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records[-1]["height"], 19)
+
+if __name__ == '__main__':
+    unittest.main()
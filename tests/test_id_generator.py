@@ -0,0 +1,55 @@
+# tests/test_id_generator.py
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from core.utils.helpers import generate_id
+from core.utils.id_generator import IdGenerator, SLOT_COUNT, decode_id, encode_id
+
+def test_ids_are_monotonic_and_sortable():
+    """Числовые и строковые ID одного потока строго возрастают"""
+    generator = IdGenerator(node_id=3)
+    values = [generator.next_int() for _ in range(20000)]
+    assert values == sorted(values) and len(set(values)) == len(values)
+
+    strings = [encode_id(value) for value in values]
+    assert strings == sorted(strings)
+    assert decode_id(strings[-1]) == values[-1]
+
+def test_ids_unique_across_threads_beyond_slot_count():
+    """Потоки сверх числа слотов переходят на общий слот без коллизий"""
+    generator = IdGenerator()
+    results = []
+    barrier = threading.Barrier(SLOT_COUNT + 8)
+
+    def worker():
+        barrier.wait()
+        ids = [generator.next_int() for _ in range(2000)]
+        barrier.wait()  # держим слоты занятыми, пока все не закончат
+        results.append(ids)
+
+    threads = [threading.Thread(target=worker) for _ in range(SLOT_COUNT + 8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    all_ids = [value for ids in results for value in ids]
+    assert len(set(all_ids)) == len(all_ids)
+
+def test_timestamp_embedded():
+    generator = IdGenerator()
+    assert abs(generator.timestamp_of(generator.next_int()) - time.time()) < 1
+
+def test_generate_id_keeps_prefix():
+    first, second = generate_id("BANK"), generate_id("BANK")
+    assert first.startswith("BANK") and first < second
+
+def test_node_id_range_checked():
+    with pytest.raises(ValueError):
+        IdGenerator(node_id=32)
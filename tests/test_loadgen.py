@@ -0,0 +1,92 @@
+# tests/test_loadgen.py
+import json
+import sys
+from concurrent.futures import Future
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from core.central_bank import CentralBank
+from loadgen import LoadDriver, build_population, generate_workload, parse_distribution
+from loadgen.cli import main
+from loadgen.workload import bursty_arrivals
+import random
+
+def test_workload_is_reproducible():
+    """Одинаковый seed дает одинаковую нагрузку"""
+    workloads = []
+    for _ in range(2):
+        central_bank = CentralBank()
+        population = build_population(central_bank, 2, 50, seed=3)
+        workloads.append([repr(op) for op in generate_workload(population, 200, 1000.0, "bursty", seed=3)])
+    assert workloads[0] == workloads[1]
+
+def test_bursty_arrivals_keep_mean_rate():
+    arrivals = bursty_arrivals(100.0, random.Random(1), burst_factor=5, burst_fraction=0.1, cycle=1.0)
+    times = [next(arrivals) for _ in range(20000)]
+    assert times == sorted(times)
+    assert 80 < len(times) / times[-1] < 120
+
+def test_driver_pushes_all_operations_and_keeps_invariants():
+    central_bank = CentralBank()
+    population = build_population(central_bank, 3, 40, seed=1, user_cash="const:100000")
+    operations = generate_workload(population, 300, 5000.0, seed=1)
+
+    report = LoadDriver(central_bank, threads=4, block_interval=0.01).run(operations)
+
+    assert report["completed"] + report["rejected"] == 300
+    assert report["completed"] > 250
+    assert report["achieved_tps"] > 0 and report["blocks"] > 0
+    assert central_bank.check_supply()["ok"]
+    central_bank.close()
+
+@pytest.mark.parametrize("threads", [1, 4])
+def test_unexpected_errors_are_raised(threads, caplog):
+    """Непредвиденные исключения операций не теряются в потоках пула"""
+    central_bank = CentralBank()
+    population = build_population(central_bank, 2, 20, seed=2)
+    operations = [op for op in generate_workload(population, 100, 5000.0, seed=2) if op.kind == "online"]
+
+    def broken_transfer(*args, **kwargs):
+        raise RuntimeError("transfer bug")
+
+    central_bank.transfer = broken_transfer
+    with pytest.raises(RuntimeError, match="transfer bug"):
+        LoadDriver(central_bank, threads=threads).run(operations)
+    assert "online" in caplog.text
+    central_bank.close()
+
+def test_unexpected_emission_error_is_raised():
+    """Исключение из Future пакетной эмиссии, кроме отказа CentralBank, пробрасывается"""
+    central_bank = CentralBank()
+    population = build_population(central_bank, 2, 20, seed=2)
+    operations = [op for op in generate_workload(population, 200, 5000.0, seed=2) if op.kind == "emission"]
+    assert operations
+
+    def broken_emission(*args, **kwargs):
+        future = Future()
+        future.set_exception(RuntimeError("batcher bug"))
+        return future
+
+    central_bank.submit_emission = broken_emission
+    with pytest.raises(RuntimeError, match="batcher bug"):
+        LoadDriver(central_bank).run(operations)
+    central_bank.close()
+
+def test_cli_writes_report(tmp_path):
+    output = tmp_path / "load.json"
+    assert main(["--banks", "2", "--users", "20", "--count", "50", "--rate", "5000",
+                 "--output", str(output)]) == 0
+    report = json.loads(output.read_text(encoding="utf-8"))
+    assert report["operations"] == 50 and report["supply_ok"]
+    assert report["target_rate"] == 5000.0 and report["scheduled_rate"] > 0
+
+def test_zero_offline_topup_is_kept():
+    """Нулевое пополнение оффлайн-кошелька не подменяется значением по умолчанию"""
+    assert LoadDriver(CentralBank(), offline_topup=0.0).offline_topup == 0.0
+
+def test_unknown_distribution_rejected():
+    with pytest.raises(ValueError):
+        parse_distribution("gamma:1,2")
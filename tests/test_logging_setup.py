@@ -0,0 +1,68 @@
+# tests/test_logging_setup.py
+import logging
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from core.utils.logging_setup import read_binary_log, setup_logging, shutdown_logging
+from core.wallet import Wallet
+
+class _Counted:
+    """Аргумент, считающий собственные форматирования"""
+
+    def __init__(self):
+        self.formatted = 0
+
+    def __str__(self):
+        self.formatted += 1
+        return "counted"
+
+@pytest.fixture
+def log_paths(tmp_path):
+    shutdown_logging()
+    text_path, binary_path = tmp_path / "app.log", tmp_path / "app.bin"
+    setup_logging(level="INFO", path=str(text_path), binary_path=str(binary_path), console=False)
+    yield text_path, binary_path
+    shutdown_logging()
+
+def test_wallet_records_reach_text_and_binary_logs(log_paths):
+    text_path, binary_path = log_paths
+    wallet = Wallet("USER1")
+    wallet.add_funds(150.0)
+    wallet.withdraw_funds(1_000_000.0)
+    shutdown_logging()
+
+    text = text_path.read_text(encoding="utf-8")
+    assert f"Кошелёк {wallet.wallet_id} пополнен на 150.0" in text
+    assert "WARNING" in text
+
+    records = [r for r in read_binary_log(str(binary_path)) if r["name"] == "core.wallet"]
+    assert records[0]["msg"] == "Кошелёк %s пополнен на %s. Новый баланс: %s"
+    assert records[0]["args"] == [wallet.wallet_id, 150.0, 150.0]
+    assert records[1]["level"] == "WARNING"
+
+def test_disabled_levels_are_not_formatted(log_paths):
+    counted = _Counted()
+    logging.getLogger("test").debug("value %s", counted)
+    assert counted.formatted == 0
+    logging.getLogger("test").info("value %s", counted)
+    shutdown_logging()
+    assert "value counted" in log_paths[0].read_text(encoding="utf-8")
+
+def test_setup_is_idempotent(log_paths):
+    listener = setup_logging()
+    assert setup_logging() is listener
+    assert sum(1 for h in logging.getLogger().handlers if type(h).__name__ == "DeferredQueueHandler") == 1
+
+def test_text_log_rotates_by_size(tmp_path):
+    shutdown_logging()
+    path = tmp_path / "rotating.log"
+    setup_logging(path=str(path), max_bytes=2000, backup_count=2)
+    for i in range(200):
+        logging.getLogger("rotation").warning("record %d with some padding text", i)
+    shutdown_logging()
+    assert (tmp_path / "rotating.log.1").exists() and (tmp_path / "rotating.log.2").exists()
+    assert not (tmp_path / "rotating.log.3").exists()
@@ -0,0 +1,103 @@
+# tests/test_reconciliation.py
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+import pytest
+
+from core.central_bank import CentralBank
+from core.reconciliation import BloomFilter, ReconciliationEngine
+from core.utils.exceptions import ValidationError
+
+def _bank_with_offline_wallets(count, offline_balance=100.0):
+    central_bank = CentralBank()
+    user_ids = [central_bank.register_user("Физическое лицо")["user_id"] for _ in range(count)]
+    for user_id in user_ids:
+        central_bank.users[user_id]["offline_balance"] = offline_balance
+    return central_bank, user_ids
+
+def test_reconnection_settles_in_batches():
+    """Ожидающие транзакции проводятся пачками и меняют балансы"""
+    central_bank, (alice, bob, carol) = _bank_with_offline_wallets(3)
+    central_bank._reconciliation = ReconciliationEngine(central_bank, batch_size=2)
+    for _ in range(3):
+        central_bank.submit_offline_transaction(alice, bob, 10.0)
+    central_bank.submit_offline_transaction(carol, bob, 5.0)
+    chain_length = len(central_bank.blockchain.chain)
+
+    stats = central_bank.reconcile_offline()
+
+    assert stats["settled"] == 4 and stats["blocks"] == 2
+    assert len(central_bank.blockchain.chain) == chain_length + 2
+    assert central_bank.users[alice]["offline_balance"] == 70.0
+    assert central_bank.users[bob]["digital_balance"] == 35.0
+    assert all(tx["status"] == "ПРОВЕДЕНО" for tx in central_bank.offline_transactions)
+
+def test_overspend_rejected_in_sequence_order():
+    """Траты сверх оффлайн-баланса отклоняются в порядке счетчика устройства"""
+    central_bank, (alice, bob) = _bank_with_offline_wallets(2, offline_balance=50.0)
+    central_bank.submit_offline_transaction(alice, bob, 30.0, sequence=1)
+    central_bank.submit_offline_transaction(alice, bob, 30.0, sequence=0)
+
+    stats = central_bank.reconcile_offline()
+
+    rejected = [tx for tx in central_bank.offline_transactions if tx["status"] == "ОТКЛОНЕНО"]
+    assert stats["settled"] == 1 and [tx["sequence"] for tx in rejected] == [1]
+    assert rejected[0]["reject_reason"] == "insufficient_offline_balance"
+
+def test_replayed_and_reused_sequence_are_double_spends():
+    central_bank, (alice, bob) = _bank_with_offline_wallets(2)
+    original = central_bank.submit_offline_transaction(alice, bob, 10.0)
+    central_bank.reconcile_offline([alice])
+
+    # Повторное предъявление той же транзакции и клон устройства с тем же счетчиком
+    central_bank.offline_transactions.append({**original, "status": "ОФФЛАЙН"})
+    central_bank.submit_offline_transaction(alice, bob, 10.0, sequence=original["sequence"])
+
+    stats = central_bank.reconcile_offline([alice])
+    assert stats["double_spends"] == 2 and stats["settled"] == 0
+    assert central_bank.users[alice]["offline_balance"] == 90.0
+
+def test_pending_offline_spends_are_reserved():
+    """Неподтвержденные оффлайн-транзакции уменьшают доступный остаток до сверки"""
+    central_bank, (alice, bob) = _bank_with_offline_wallets(2, offline_balance=50.0)
+    central_bank.submit_offline_transaction(alice, bob, 30.0, check_balance=True)
+
+    assert central_bank.offline_available(alice) == 20.0
+    with pytest.raises(ValidationError):
+        central_bank.submit_offline_transaction(alice, bob, 30.0, check_balance=True)
+
+    central_bank.reconcile_offline()
+    assert central_bank.users[alice]["offline_balance"] == 20.0
+    assert central_bank.offline_available(alice) == 20.0
+    central_bank.submit_offline_transaction(alice, bob, 20.0, check_balance=True)
+
+def test_failed_settlement_block_is_requeued():
+    """Ошибка при проведении блока не теряет транзакции: они остаются в очереди сверки"""
+    central_bank, (alice, bob) = _bank_with_offline_wallets(2)
+    central_bank.submit_offline_transaction(alice, bob, 10.0)
+    mine_block = central_bank.blockchain.mine_block
+
+    def failing_mine_block():
+        raise RuntimeError("consensus unavailable")
+
+    central_bank.blockchain.mine_block = failing_mine_block
+    stats = central_bank.reconcile_offline()
+    assert stats["failed"] == 1 and stats["settled"] == 0
+    assert central_bank.offline_transactions[0]["status"] == "ОФФЛАЙН"
+    assert all(tx["transaction_type"] != "offline_settlement"
+               for tx in central_bank.blockchain.current_transactions)
+    assert central_bank.offline_available(alice) == 90.0
+
+    central_bank.blockchain.mine_block = mine_block
+    assert central_bank.reconcile_offline()["settled"] == 1
+    assert central_bank.users[alice]["offline_balance"] == 90.0
+
+def test_bloom_filter_has_no_false_negatives():
+    bloom = BloomFilter(1000, 0.01)
+    keys = [f"TX{i}" for i in range(1000)]
+    for key in keys:
+        bloom.add(key)
+    assert all(key in bloom for key in keys)
+    assert sum(f"OTHER{i}" in bloom for i in range(1000)) < 50
@@ -0,0 +1,126 @@
+# tests/test_simulation.py
+import sys
+import time
+from datetime import timedelta
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from config import WALLET_CONFIG
+from core.blockchain.blockchain import Blockchain
+from core.central_bank import CentralBank
+from core.simulation import Simulator
+from core.utils.clock import Clock, VirtualClock, get_clock, system_clock, use_clock
+from core.utils.helpers import generate_id
+from core.utils.id_generator import IdGenerator, decode_id
+from core.wallet import Wallet
+
+DAY = 24 * 3600
+
+def test_events_run_in_time_order():
+    simulator = Simulator(VirtualClock(1000.0))
+    seen = []
+    simulator.schedule(5, seen.append, "b")
+    simulator.schedule(1, seen.append, "a")
+    simulator.schedule(5, seen.append, "c")
+    cancelled = simulator.schedule(3, seen.append, "x")
+    simulator.cancel(cancelled)
+
+    assert simulator.run() == 3
+    assert seen == ["a", "b", "c"]
+    assert simulator.now() == 1005.0
+
+def test_cancelled_series_stops_after_first_tick():
+    """Номер, выданный every(), отменяет серию и после первых вызовов"""
+    simulator = Simulator(VirtualClock(0.0))
+    ticks = []
+    series = simulator.every(10, lambda: ticks.append(simulator.now()))
+    fired = simulator.schedule(5, lambda: None)
+
+    simulator.run(until=25)
+    simulator.cancel(series)
+    simulator.cancel(fired)  # уже наступило: отмена ничего не оставляет
+    simulator.run(until=100)
+
+    assert ticks == [10.0, 20.0]
+    assert simulator.pending() == 0 and not simulator._cancelled
+
+def test_offline_wallets_expire_in_simulated_time():
+    """14-дневный срок оффлайн-кошелька моделируется без ожидания"""
+    simulator = Simulator()
+    start = simulator.now()
+    hourly = []
+    simulator.every(3600, lambda: hourly.append(get_clock().time()))
+
+    with use_clock(simulator.clock):
+        wallets = [Wallet(f"USER{i}") for i in range(100)]
+    for wallet in wallets:
+        simulator.schedule_at(wallet.expiry_time.timestamp() + 1, wallet.check_expiry)
+
+    simulator.run(until=start + 13 * DAY)
+    assert all(wallet.is_active for wallet in wallets)
+
+    simulator.run_for(2 * DAY)
+    assert not any(wallet.is_active for wallet in wallets)
+    assert len(hourly) == 15 * 24
+    assert wallets[0].expiry_time - wallets[0].open_time == timedelta(days=WALLET_CONFIG['expiry_days'])
+    assert get_clock() is system_clock
+
+def test_blocks_and_ids_follow_simulated_time():
+    clock = VirtualClock(1_750_000_000.0)
+    simulator = Simulator(clock)
+    central_bank = CentralBank(clock=clock)
+    user_id = central_bank.register_user("Физическое лицо")["user_id"]
+    central_bank.users[user_id]["digital_balance"] = 100.0
+    other_id = central_bank.register_user("Физическое лицо")["user_id"]
+
+    def pay():
+        central_bank.transfer(user_id, other_id, 1.0)
+        central_bank.mine_pending()
+
+    simulator.every(DAY, pay)
+    simulator.run_for(30 * DAY)
+
+    blocks = central_bank.blockchain.chain[1:]
+    assert len(blocks) == 30
+    assert [block.timestamp for block in blocks] == [1_750_000_000.0 + DAY * (i + 1) for i in range(30)]
+
+    generator = IdGenerator(clock=clock)
+    assert generator.timestamp_of(generator.next_int()) == clock.time()
+
+def test_default_clock_drives_generate_id():
+    clock = VirtualClock(3_000_000_000.0)
+    with use_clock(clock):
+        tx_id = generate_id("TX")
+        blockchain = Blockchain()
+    assert IdGenerator().timestamp_of(decode_id(tx_id[2:])) >= clock.time()
+    assert blockchain.chain[0].timestamp == clock.time()
+
+    # Модельное время не сдвигает ID реального времени
+    real_id = generate_id("TX")
+    assert IdGenerator().timestamp_of(decode_id(real_id[2:])) <= time.time() + 1
+    assert real_id < tx_id
+
+def test_clock_requires_time_and_sleep():
+    """Часы без time() или sleep() не создаются"""
+    class NoSleep(Clock):
+        def time(self) -> float:
+            return 0.0
+
+    with pytest.raises(TypeError):
+        Clock()
+    with pytest.raises(TypeError):
+        NoSleep()
+
+def test_many_events_per_run():
+    simulator = Simulator()
+    counter = [0]
+
+    def tick():
+        counter[0] += 1
+
+    for i in range(100_000):
+        simulator.schedule(i * 0.001, tick)
+    assert simulator.run() == 100_000 == counter[0]
@@ -0,0 +1,106 @@
+# tests/test_storage.py
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from core.central_bank import CentralBank
+from core.storage import SQLiteLedger, create_ledger
+
+START = datetime(2024, 1, 1)
+
+def _transactions(count):
+    return [{
+        "tx_id": f"TX{i + 1:06d}",
+        "sender": "CENTRAL_BANK" if i % 3 == 0 else f"FL{i:06d}",
+        "receiver": f"BANK{i % 2}",
+        "amount": float(i),
+        "type": "эмиссия" if i % 3 == 0 else "онлайн",
+        "timestamp": (START + timedelta(minutes=i)).isoformat(),
+        "status": "Выполнено"
+    } for i in range(count)]
+
+@pytest.fixture(params=["memory", "sqlite"])
+def ledger(request, tmp_path):
+    ledger = create_ledger(request.param, str(tmp_path / "ledger.db"), batch_size=7)
+    yield ledger
+    ledger.close()
+
+def test_backends_answer_queries_identically(ledger):
+    """Оба хранилища одинаково отвечают на запросы по банку, типу и времени"""
+    transactions = ledger["transactions"]
+    records = _transactions(50)
+    transactions.extend(records)
+
+    assert len(transactions) == 50
+    assert transactions[0] == records[0]
+    assert transactions[-1] == records[-1]
+    assert transactions[10:13] == records[10:13]
+    assert transactions[::-1] == records[::-1]
+    assert transactions[30:10:-3] == records[30:10:-3]
+    assert transactions[5:40:7] == records[5:40:7]
+    assert transactions[13:10] == []
+    assert list(transactions) == records
+
+    bank1 = transactions.query(party="BANK1")
+    assert bank1 == [r for r in records if r["receiver"] == "BANK1"]
+    assert transactions.query(party="CENTRAL_BANK", record_type="эмиссия", limit=3, offset=1) == \
+        [r for r in records if r["type"] == "эмиссия"][1:4]
+
+    window = transactions.query(start=START + timedelta(minutes=5), end=(START + timedelta(minutes=9)).isoformat())
+    assert [r["tx_id"] for r in window] == ["TX000006", "TX000007", "TX000008", "TX000009"]
+
+def test_sqlite_records_write_back_and_persist(tmp_path):
+    """Изменения записей сохраняются в базе и видны после переоткрытия"""
+    path = str(tmp_path / "ledger.db")
+    with SQLiteLedger(path, batch_size=100) as ledger:
+        requests = ledger["emission_requests"]
+        requests.append({"fo_id": "BANK1", "amount": 100.0, "status": "Ожидание",
+                         "timestamp": START.isoformat()})
+        requests[0]["status"] = "Одобрено"
+        requests[0].setdefault("reviewer", "CB")
+        requests[0].pop("timestamp")
+        requests[0]["details"] = {"limits": [1, 2]}
+        with pytest.raises(TypeError):
+            requests[0]["details"]["limits"].append(3)
+        ledger["transactions"].extend(_transactions(10))
+
+    with SQLiteLedger(path) as ledger:
+        request = ledger["emission_requests"][0]
+        assert request["status"] == "Одобрено"
+        assert request["reviewer"] == "CB" and "timestamp" not in request
+        assert request["details"] == {"limits": [1, 2]}
+        assert ledger["emission_requests"].query(party="BANK1")[0]["amount"] == 100.0
+        assert len(ledger["transactions"]) == 10
+        mode = ledger.connection.execute("PRAGMA journal_mode").fetchone()[0]
+        assert mode == "wal"
+
+def test_central_bank_history_filters_by_bank(tmp_path):
+    """История транзакций центрального банка фильтруется по банку"""
+    bank = CentralBank(storage_backend="sqlite", storage_path=str(tmp_path / "ledger.db"))
+    try:
+        bank.transactions.extend(_transactions(12))
+        assert len(bank.get_transaction_history()) == 12
+        assert all(tx["receiver"] == "BANK0" for tx in bank.get_transaction_history("BANK0"))
+        assert len(bank.get_transaction_history("BANK0")) == 6
+    finally:
+        bank.close()
+
+def test_unfiltered_history_is_a_view():
+    """История без фильтров не копирует реестр и видит новые записи"""
+    bank = CentralBank()
+    bank.transactions.extend(_transactions(3))
+    history = bank.get_transaction_history()
+
+    bank.transactions.extend(_transactions(2))
+    assert len(history) == 5
+    assert history[0] is bank.transactions[0]
+    assert list(history)[-1] is bank.transactions[-1]
+    assert not hasattr(history, "append")
+
+def test_unknown_backend_rejected():
+    with pytest.raises(ValueError):
+        create_ledger("redis")
@@ -0,0 +1,69 @@
+# tests/test_supply_check.py
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from core.central_bank import CentralBank
+
+def _economy():
+    central_bank = CentralBank()
+    bank_id = central_bank.register_bank({"name": "Bank", "bic": "044525000"})["bank_id"]
+    central_bank.banks[bank_id]["status"] = "active"
+    user_ids = [central_bank.register_user("Физическое лицо")["user_id"] for _ in range(3)]
+    central_bank.process_emission(bank_id, 1000.0, "credit")
+    return central_bank, bank_id, user_ids
+
+def test_consistent_operations_pass():
+    """Эмиссия, переводы и сверка оффлайн-транзакций сохраняют инварианты"""
+    central_bank, bank_id, (alice, bob, carol) = _economy()
+    central_bank.transfer(bank_id, alice, 300.0)
+    assert central_bank.check_supply()["ok"]
+
+    central_bank.transfer(alice, bob, 100.0)
+    central_bank.users[alice]["digital_balance"] -= 50.0
+    central_bank.users[alice]["offline_balance"] += 50.0
+    central_bank.submit_offline_transaction(alice, carol, 20.0)
+    report = central_bank.check_supply()
+    # Пополнение оффлайн-кошелька мимо блокчейна видно как изменение двух балансов
+    assert report["supply_difference"] == 0.0
+    assert {d["field"] for d in report["drifted"]} == {"digital_balance", "offline_balance"}
+
+    central_bank.reconcile_offline()
+    report = central_bank.check_supply()
+    assert report["ok"] and report["checked_transactions"] == 1
+
+def test_drifted_account_pinpointed_once():
+    central_bank, bank_id, (alice, bob, _) = _economy()
+    assert central_bank.check_supply()["ok"]
+
+    central_bank.users[bob]["digital_balance"] += 5.0  # деньги из ниоткуда
+    report = central_bank.check_supply()
+
+    assert not report["ok"] and report["supply_difference"] == 5.0
+    assert report["drifted"] == [{"account_id": bob, "field": "digital_balance",
+                                  "expected_delta": 0.0, "actual_delta": 5.0}]
+    assert central_bank.check_supply()["drifted"] == []
+
+def test_pending_transfer_not_counted_twice():
+    """Перевод учитывается в очереди и не учитывается повторно после попадания в блок"""
+    central_bank, bank_id, (alice, _, _) = _economy()
+    central_bank.transfer(bank_id, alice, 10.0)
+    assert central_bank.check_supply()["ok"]
+
+    central_bank.blockchain.mine_block()
+    report = central_bank.check_supply()
+    assert report["ok"] and report["checked_transactions"] == 0
+
+def test_removed_account_does_not_shift_deltas():
+    """Удаление счета переносит последнюю строку, но изменения остаются за своими счетами"""
+    central_bank, bank_id, (alice, bob, carol) = _economy()
+    central_bank.transfer(bank_id, carol, 200.0)
+    assert central_bank.check_supply()["ok"]
+
+    del central_bank.users[alice]  # строка carol переезжает на место alice
+    central_bank.transfer(carol, bob, 50.0)
+    report = central_bank.check_supply()
+
+    assert report["ok"] and report["drifted"] == []
+    assert report["checked_transactions"] == 1
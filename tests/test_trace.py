@@ -0,0 +1,105 @@
+# tests/test_trace.py
+import gzip
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from core.central_bank import CentralBank
+from core.trace import TraceRecorder, TraceReplayer, iter_trace, state_digest
+from core.utils.clock import VirtualClock
+from core.utils.id_generator import IdGenerator
+from core.utils.exceptions import ValidationError
+from loadgen import LoadDriver, build_population, generate_workload
+from loadgen.replay import main
+
+def test_virtual_clock_ids_are_deterministic():
+    sequences = []
+    for _ in range(2):
+        clock = VirtualClock(1_720_000_000.0)
+        generator = IdGenerator(node_id=3, clock=clock)
+        ids = []
+        for step in range(50):
+            clock.advance(0.0004)
+            ids.append(generator.next_id("TX"))
+        sequences.append(ids)
+    assert sequences[0] == sequences[1]
+    assert len(set(sequences[0])) == 50
+
+def test_virtual_clock_does_not_go_back():
+    clock = VirtualClock(100.0)
+    clock.set(50.0)
+    clock.sleep(2.5)
+    assert clock.time() == 102.5
+    with pytest.raises(ValueError):
+        clock.advance(-1)
+
+def _record_workload(path, threads=1):
+    central_bank = CentralBank()
+    recorder = TraceRecorder(central_bank, str(path))
+    population = build_population(central_bank, 2, 30, seed=5, user_cash="const:50000")
+    operations = generate_workload(population, 200, 5000.0, seed=5)
+    LoadDriver(central_bank, threads=threads, block_interval=0.01).run(operations)
+    central_bank.close()
+    recorder.close()
+    return central_bank
+
+def test_replay_reproduces_recorded_state(tmp_path):
+    path = tmp_path / "load.ndjson.gz"
+    recorded_bank = _record_workload(path)
+
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        header = json.loads(f.readline())
+    assert header["trace"] == 1
+
+    reports = [TraceReplayer(str(path)).replay() for _ in range(2)]
+    assert reports[0]["outcome_mismatches"] == 0
+    assert reports[0]["state_digest"] == reports[1]["state_digest"] == state_digest(recorded_bank)
+    assert reports[0]["operations"] == sum(1 for _ in iter_trace(str(path))) - 1
+
+def test_replay_maps_issued_ids(tmp_path):
+    path = tmp_path / "ops.ndjson"
+    central_bank = CentralBank()
+    with TraceRecorder(central_bank, str(path)):
+        first = central_bank.register_user("Физическое лицо")["user_id"]
+        second = central_bank.register_user("Физическое лицо")["user_id"]
+        with pytest.raises(ValidationError):
+            central_bank.transfer(first, second, 10)
+
+    records = list(iter_trace(str(path)))[1:]
+    assert [r["op"] for r in records] == ["register_user", "register_user", "transfer"]
+    assert records[2]["e"] == "ValidationError"
+    # Обертки сняты после закрытия
+    assert "transfer" not in central_bank.__dict__
+
+    replayer = TraceReplayer(str(path))
+    report = replayer.replay()
+    assert report["outcome_mismatches"] == 0
+    assert len(replayer.central_bank.users) == 2
+    for recorded_id in (first, second):
+        assert replayer.id_map.get(recorded_id, recorded_id) in replayer.central_bank.users
+
+def test_realtime_replay_keeps_recorded_pace(tmp_path):
+    path = tmp_path / "slow.ndjson"
+    clock = VirtualClock(1_720_000_000.0)
+    central_bank = CentralBank(clock=clock)
+    with TraceRecorder(central_bank, str(path)):
+        central_bank.register_user("Физическое лицо")
+        clock.advance(0.2)
+        central_bank.register_user("Физическое лицо")
+
+    report = TraceReplayer(str(path), mode="realtime").replay()
+    assert report["operations"] == 2
+    assert report["duration_s"] >= 0.19
+    assert TraceReplayer(str(path), mode="fast").replay()["duration_s"] < 0.19
+
+def test_replay_cli(tmp_path):
+    path = tmp_path / "cli.ndjson.gz"
+    _record_workload(path)
+    output = tmp_path / "replay.json"
+    assert main([str(path), "--output", str(output)]) == 0
+    report = json.loads(output.read_text(encoding="utf-8"))
+    assert report["supply_ok"] and report["outcome_mismatches"] == 0
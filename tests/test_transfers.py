@@ -0,0 +1,79 @@
+# tests/test_transfers.py
+import random
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from core.account_locks import StripedLocks
+from core.central_bank import CentralBank
+from core.utils.exceptions import ValidationError
+
+def _bank_with_users(count, balance=1000.0):
+    central_bank = CentralBank()
+    user_ids = [central_bank.register_user("Физическое лицо")["user_id"] for _ in range(count)]
+    for user_id in user_ids:
+        central_bank.users[user_id]["digital_balance"] = balance
+    return central_bank, user_ids
+
+def test_parallel_transfers_conserve_total():
+    """Встречные параллельные переводы не теряют средств и не блокируют друг друга"""
+    central_bank, user_ids = _bank_with_users(8)
+
+    def worker(seed):
+        rng = random.Random(seed)
+        for _ in range(300):
+            sender, receiver = rng.sample(user_ids, 2)
+            try:
+                central_bank.transfer(sender, receiver, rng.randint(1, 50))
+            except ValidationError:
+                pass  # недостаточно средств
+
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30)
+        assert not thread.is_alive()
+
+    assert central_bank.users.total("digital_balance") == 8000.0
+    assert len(central_bank.transactions) > 0
+
+def test_transfer_between_user_and_bank():
+    central_bank, user_ids = _bank_with_users(1)
+    bank_id = central_bank.register_bank({"name": "Bank", "bic": "044525000"})["bank_id"]
+
+    result = central_bank.transfer(user_ids[0], bank_id, 250.0)
+
+    assert result["sender_balance"] == 750.0
+    assert central_bank.banks[bank_id]["balance"] == 250.0
+    assert central_bank.get_transaction_history(bank_id)[0]["tx_id"] == result["transaction_id"]
+
+def test_insufficient_funds_leaves_balances_untouched():
+    central_bank, (sender, receiver) = _bank_with_users(2, balance=10.0)
+    with pytest.raises(ValidationError):
+        central_bank.transfer(sender, receiver, 11.0)
+    assert central_bank.users[sender]["digital_balance"] == 10.0
+    assert central_bank.users[receiver]["digital_balance"] == 10.0
+
+def test_stripes_acquired_in_order():
+    """Полосы захватываются по возрастанию и освобождаются при выходе"""
+    locks = StripedLocks(16)
+    ids = [f"ACC{i}" for i in range(40)]
+    stripes = locks.stripes_for(*ids)
+    assert stripes == sorted(set(locks.stripe_for(a) for a in ids))
+
+    with locks.hold(*ids):
+        assert all(locks._locks[stripe].locked() for stripe in stripes)
+    assert not any(lock.locked() for lock in locks._locks)
+
+def test_transfer_is_queued_for_the_next_block():
+    """Перевод ставится в очередь блокчейна вместе с изменением балансов"""
+    central_bank, (alice, bob) = _bank_with_users(2)
+    transaction_id = central_bank.transfer(alice, bob, 10.0)["transaction_id"]
+
+    queued = central_bank.blockchain.current_transactions
+    assert [tx["metadata"]["transaction_id"] for tx in queued if tx["transaction_type"] == "transfer"] == [transaction_id]
@@ -0,0 +1,97 @@
+# tests/test_wallet.py
+import sys
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from core.transaction import Transaction
+from core.wallet import Wallet
+from core.wallet_history import HistoryStore
+
+def _wallet_with_pending(count, store=None, capacity=None):
+    wallet = Wallet("USER1", history_store=store)
+    if capacity is not None:
+        wallet.history_capacity = capacity
+    wallet.add_funds(count * 10.0)
+    transactions = [Transaction("USER1", "USER2", 1) for _ in range(count)]
+    for transaction in transactions:
+        assert wallet.add_offline_transaction(transaction)
+    return wallet, transactions
+
+def test_confirm_transaction_by_id():
+    wallet, transactions = _wallet_with_pending(3)
+    middle = transactions[1].id
+
+    assert wallet.confirm_transaction(middle, "HASH1")
+    assert wallet.get_transaction(middle)["status"] == "confirmed"
+    assert list(wallet.pending_transactions) == [transactions[0].id, transactions[2].id]
+    assert list(wallet.get_block_hashes()) == ["HASH1"]
+    assert not wallet.confirm_transaction("TX-UNKNOWN", "HASH1")
+
+def test_confirm_block_confirms_in_one_pass(tmp_path):
+    wallet, transactions = _wallet_with_pending(1000, HistoryStore(str(tmp_path)))
+    block_ids = [tx.id for tx in transactions[:600]] + ["TX-OTHER-WALLET"]
+
+    assert wallet.confirm_block("BLOCK1", block_ids) == 600
+    assert len(wallet.pending_transactions) == 400
+    assert next(iter(wallet.pending_transactions)) == transactions[600].id
+    assert all(wallet.get_transaction(tx.id)["block_hash"] == "BLOCK1" for tx in transactions[:600])
+    assert wallet.get_transaction(transactions[600].id)["status"] == "pending"
+    assert list(wallet.get_block_hashes()) == ["BLOCK1"]
+
+    assert wallet.confirm_block("BLOCK2", ["TX-OTHER-WALLET"]) == 0
+    assert list(wallet.get_block_hashes()) == ["BLOCK1"]
+
+def test_history_spills_to_disk_and_pages_lazily(tmp_path):
+    store = HistoryStore(str(tmp_path), shards=4)
+    wallet = Wallet("MERCHANT", history_store=store)
+    wallet.history_capacity = 50
+    for i in range(1, 301):
+        wallet.add_funds(float(i))
+
+    assert len(wallet.transaction_history) == 50
+    history = wallet.get_transaction_history()
+    assert len(history) == 300
+    assert [entry["amount"] for entry in history] == [float(i) for i in range(1, 301)]
+    assert history[0]["timestamp"] == next(iter(history))["timestamp"]
+    assert history[-1]["amount"] == 300.0 and history[120]["amount"] == 121.0
+
+    pages = list(history.pages(64))
+    assert [len(page) for page in pages] == [64, 64, 64, 64, 44]
+    assert (tmp_path / f"shard-{store.shard_of(wallet.wallet_id):03d}.ndjson").exists()
+
+def test_spilled_pending_transactions_can_be_confirmed(tmp_path):
+    wallet, transactions = _wallet_with_pending(30, HistoryStore(str(tmp_path)), capacity=10)
+    first = transactions[0].id
+
+    assert wallet.confirm_transaction(first, "BLOCK-OLD")
+    assert first not in wallet.pending_transactions
+    history = wallet.get_transaction_history()
+    spilled = next(entry for entry in history if entry.get("transaction_id") == first)
+    assert spilled["status"] == "confirmed" and spilled["block_hash"] == "BLOCK-OLD"
+
+    for i, transaction in enumerate(transactions[1:], 1):
+        assert wallet.confirm_block(f"BLOCK{i}", [transaction.id]) == 1
+    hashes = wallet.get_block_hashes()
+    assert len(wallet.block_hashes) == 10 and len(hashes) == 30
+    assert hashes[0] == "BLOCK-OLD" and hashes[-1] == "BLOCK29"
+    assert not wallet.pending_transactions
+    # Подтверждения вытесненных записей дописаны в шард, в памяти ничего не копится
+    assert not wallet._spilled_pending and len(wallet._history_index) == 10
+    assert all(entry["status"] == "confirmed" for entry in wallet.get_transaction_history()
+               if entry["type"] == "offline_transaction")
+
+def test_history_store_offsets_survive_reads_and_reopen(tmp_path):
+    """Смещения дописанных записей верны при чередовании с чтением и после переоткрытия"""
+    store = HistoryStore(str(tmp_path), shards=1)
+    offsets = [store.append("W", "history", {"n": 0})]
+    assert store.read("W", offsets) == [{"n": 0}]
+    offsets.append(store.append("W", "history", {"n": 1}))
+    store.close()
+
+    size = (tmp_path / "shard-000.ndjson").stat().st_size
+    reopened = HistoryStore(str(tmp_path), shards=1)
+    offsets.append(reopened.append("W", "history", {"n": 2}))
+    assert offsets[2] == size
+    assert reopened.read("W", offsets) == [{"n": 0}, {"n": 1}, {"n": 2}]
+    reopened.close()
@@ -0,0 +1,128 @@
+# tests/test_wallet_store.py
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.append(str(Path(__file__).parent.parent))
+
+from core import wallet_store
+from core.transaction import Transaction
+from core.wallet import Wallet
+from core.wallet_history import HistoryStore
+from core.wallet_store import WalletDirectory, decode_wallet, encode_wallet, load_wallets, save_wallets
+
+def _wallet(owner_id, store, pending=0, capacity=None):
+    wallet = Wallet(owner_id, history_store=store)
+    if capacity is not None:
+        wallet.history_capacity = capacity
+    wallet.add_funds(100.0)
+    for _ in range(pending):
+        transaction = Transaction(owner_id, "USER2", 1)
+        transaction.sign("KEY")
+        transaction.mark_as_offline()
+        wallet.add_offline_transaction(transaction)
+    return wallet
+
+def test_round_trip_keeps_pending_and_spilled_history(tmp_path):
+    store = HistoryStore(str(tmp_path / "history"), shards=2)
+    wallet = _wallet("USER1", store, pending=5, capacity=2)
+    first = next(iter(wallet.pending_transactions))
+    wallet.confirm_transaction(first, "HASH1")
+
+    restored = decode_wallet(encode_wallet(wallet), history_store=store)
+
+    assert restored.wallet_id == wallet.wallet_id
+    assert restored.balance == wallet.balance
+    assert restored.expiry_time == wallet.expiry_time
+    assert list(restored.pending_transactions) == list(wallet.pending_transactions)
+    transaction = next(iter(restored.pending_transactions.values()))
+    assert transaction.verify_signature("KEY") and transaction.is_offline
+    assert list(restored.get_transaction_history()) == list(wallet.get_transaction_history())
+    assert restored.get_transaction_history()[1]["status"] == "confirmed"
+
+    # Вытесненная ожидающая транзакция подтверждается и после загрузки
+    pending = next(iter(restored.pending_transactions))
+    assert restored.confirm_transaction(pending, "HASH2")
+    assert restored.get_transaction_history()[2]["status"] == "confirmed"
+    assert list(restored.get_block_hashes()) == ["HASH1", "HASH2"]
+    store.close()
+
+def test_bulk_save_and_load(tmp_path):
+    store = HistoryStore(str(tmp_path / "history"))
+    wallets = [_wallet(f"USER{i}", store, pending=i % 3) for i in range(200)]
+    path = str(tmp_path / "wallets.bin")
+
+    assert save_wallets(path, wallets, store) == 200
+    loaded = load_wallets(path, history_store=store)
+
+    assert [w.wallet_id for w in loaded] == [w.wallet_id for w in wallets]
+    assert [len(w.pending_transactions) for w in loaded] == [len(w.pending_transactions) for w in wallets]
+    store.close()
+
+def test_spilled_history_is_on_disk_before_wallet_file(tmp_path):
+    """Смещения в файле кошельков указывают на уже записанные строки шардов"""
+    store = HistoryStore(str(tmp_path / "history"), shards=1)
+    wallets = [_wallet(f"USER{i}", store, pending=4, capacity=1) for i in range(20)]
+    path = str(tmp_path / "wallets.bin")
+
+    save_wallets(path, wallets, store)
+    shard = (tmp_path / "history" / "shard-000.ndjson").read_bytes()  # мимо буфера хранилища
+    for wallet in load_wallets(path):
+        for offset in wallet.snapshot()["history_offsets"]:
+            assert json.loads(shard[offset:shard.index(b"\n", offset)])["w"] == wallet.wallet_id
+    store.close()
+
+def test_directory_loads_wallets_lazily(tmp_path):
+    store = HistoryStore(str(tmp_path / "history"))
+    wallets = [_wallet(f"USER{i}", store, pending=1) for i in range(50)]
+    directory = WalletDirectory(str(tmp_path / "wallets"), history_store=store)
+
+    assert directory.save(wallets, files=4) == 50
+    assert len(directory) == 50
+    wallet = directory.get(wallets[7].wallet_id)
+    assert wallet.owner_id == "USER7"
+    assert directory.get(wallets[7].wallet_id) is wallet
+    assert wallets[3].wallet_id in directory
+    assert directory.get("missing") is None and "missing" not in directory
+    assert sorted(w.wallet_id for w in directory.load_all()) == sorted(w.wallet_id for w in wallets)
+
+    # Повторное сохранение с меньшим числом файлов удаляет лишние
+    directory.save(wallets[:10], files=2)
+    assert len(directory) == 10
+    assert len(list((tmp_path / "wallets").glob("wallets-*.bin"))) == 2
+    directory.close()
+    store.close()
+
+def test_interrupted_save_keeps_previous_generation(tmp_path, monkeypatch):
+    """Сбой посреди save() не меняет каталог: манифест указывает на прежние файлы"""
+    store = HistoryStore(str(tmp_path / "history"))
+    wallets = [_wallet(f"USER{i}", store) for i in range(30)]
+    directory = WalletDirectory(str(tmp_path / "wallets"), history_store=store)
+    directory.save(wallets, files=3)
+
+    written = []
+    def failing_save(path, group, history_store=None):
+        if written:
+            raise OSError("disk full")
+        written.append(path)
+        return save_wallets(path, group, history_store)
+
+    monkeypatch.setattr(wallet_store, "save_wallets", failing_save)
+    with pytest.raises(OSError):
+        directory.save(wallets[:5], files=4)
+    monkeypatch.undo()
+
+    # Число файлов берется из манифеста, а не из содержимого каталога
+    reopened = WalletDirectory(str(tmp_path / "wallets"), history_store=store)
+    assert reopened.generation == 1 and len(reopened) == 30
+    assert all(reopened.get(w.wallet_id).owner_id == w.owner_id for w in wallets)
+
+    # Следующее удачное сохранение убирает остатки прерванного
+    reopened.save(wallets[:5], files=4)
+    assert reopened.generation == 2 and len(reopened) == 5
+    assert len(list((tmp_path / "wallets").glob("wallets-*"))) == 4
+    directory.close()
+    reopened.close()
+    store.close()